@@ -1,14 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import currency
+from api.services.executor import crew_executor
+from api.services.job_worker import job_worker
+from currency_analyst_crew.main import warm_up
+from currency_analyst_crew.tools.http_client import http_client, async_http_client
 import uvicorn
 
 
+# build the crew template once at startup so requests only pay for a copy,
+# and run the crew worker pool and the job worker for the lifetime of the app.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if crew_executor.kind == "thread":
+        warm_up()
+
+    crew_executor.start(initializer=warm_up)
+    job_worker.start()
+    yield
+    await job_worker.stop()
+    crew_executor.shutdown()
+    await async_http_client.aclose()
+    http_client.close()
+
+
 # initialize fastapi app.
 app = FastAPI(
     title="Currency Analyst API",
     description="Backend service for the CrewAI-powered Currency Analyst project.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # cors setup (allow the streamlit's frontend user interface to interact with this api).
@@ -1,25 +1,219 @@
-from fastapi import APIRouter, HTTPException
-from api.schemas.currency_schema import CurrencyAnalysisRequest, CurrencyAnalysisResponse
-from currency_analyst_crew.main import run
+import json
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from api.schemas.currency_schema import (
+    CurrencyAnalysisRequest,
+    CurrencyAnalysisResponse,
+    CrossRatesResponse,
+    BatchConversionRequest,
+    BatchConversionResponse,
+    JobResponse,
+    ReportResponse,
+)
+from api.services.analysis import analyze_query, stream_query
+from api.services.executor import ExecutorSaturated, ExecutorUnavailable
+from api.services.job_worker import job_worker
+from api.services.report_store import ReportTooLarge, report_store
+from currency_analyst_crew.tools.exchange_rate_api import aget_rate_matrix, convert_batch
 
 
 # define the router.
 router = APIRouter(prefix="/currency", tags=["Currency Analysis"])
 
+# keep a result in the report store; results over the report size limit are returned without an id.
+async def _store_report(result: str) -> str | None:
+    try:
+        return await run_in_threadpool(report_store.put, result)
+    except ReportTooLarge:
+        return None
+
+
 # define the analyze endpoint.
 @router.post("/analyze", response_model=CurrencyAnalysisResponse)
-def analyze_currency(request: CurrencyAnalysisRequest):
+async def analyze_currency(request: CurrencyAnalysisRequest):
     """
     Endpoint for analyzing and Providing accurate and insightful information 
     about current exchange rates and relationships between currencies in real 
     time using CrewAI logic.
 
-    Accepts JSON input and returns an AI-generated insight.
+    Accepts JSON input and returns an AI-generated insight. Simple rate,
+    conversion and supported-codes lookups are answered straight from the
+    rate source without running the crew.
+
+    Crew runs go through a bounded worker pool: the request is rejected with
+    429 when the pool's queue is full, 503 when the pool is unavailable and
+    504 when the run exceeds its timeout.
+    """
+
+    try:
+        result = await analyze_query(request.query)
+        report_id = await _store_report(result)
+        return CurrencyAnalysisResponse(response=result, report_id=report_id)
+
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+    except ExecutorUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Analysis timed out.")
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+# format a server-sent event.
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# define the streaming analyze endpoint.
+@router.post("/analyze/stream")
+async def analyze_currency_stream(request: CurrencyAnalysisRequest):
+    """
+    Endpoint for analyzing currencies with the response streamed as
+    Server-Sent Events while the crew runs.
+
+    Emits `token` events ({"content"}) for LLM output, `tool` events
+    ({"tool", "arguments"}) for the agent's tool calls, then a single `done`
+    event ({"response", "report_id"}) with the final answer. Failures are reported as an
+    `error` event ({"status", "detail"}) using the same status codes as
+    `/currency/analyze`.
+    """
+
+    async def event_stream():
+        try:
+            async for event, data in stream_query(request.query):
+                if event == "done":
+                    data["report_id"] = await _store_report(data["response"])
+
+                yield _sse(event, data)
+
+        except ExecutorSaturated as e:
+            yield _sse("error", {"status": 429, "detail": str(e)})
+
+        except ExecutorUnavailable as e:
+            yield _sse("error", {"status": 503, "detail": str(e)})
+
+        except asyncio.TimeoutError:
+            yield _sse("error", {"status": 504, "detail": "Analysis timed out."})
+
+        except Exception as e:
+            yield _sse("error", {"status": 500, "detail": f"Analysis failed: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# define the cross-rates endpoint.
+@router.get("/cross-rates", response_model=CrossRatesResponse)
+async def cross_rates(codes: str = Query(..., examples=["USD,EUR,GBP,NGN"], description="Comma-separated currency codes.")):
+    """
+    Endpoint for returning the N×N cross-rate matrix between the requested
+    currencies, derived from a single base-currency snapshot without
+    calling the LLM.
+    """
+
+    # parse and de-duplicate the requested codes, keeping their order.
+    requested = list(dict.fromkeys(code.strip().upper() for code in codes.split(",") if code.strip()))
+
+    if not requested:
+        raise HTTPException(status_code=400, detail="At least one currency code is required.")
+
+    matrix = await aget_rate_matrix()
+
+    if matrix is None:
+        raise HTTPException(status_code=503, detail="Exchange rates are currently unavailable.")
+
+    unknown = [code for code in requested if code not in matrix]
+
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported currency codes: {', '.join(unknown)}")
+
+    return CrossRatesResponse(
+        base=matrix.base,
+        as_of=matrix.fetched_at,
+        codes=requested,
+        rates=matrix.cross_rates(requested).tolist(),
+    )
+
+
+
+# define the batch conversion endpoint.
+@router.post("/convert-batch", response_model=BatchConversionResponse)
+async def convert_currency_batch(request: BatchConversionRequest):
+    """
+    Endpoint for converting many (amount, from, to) items in one call.
+
+    Conversions are answered deterministically from cached exchange rates,
+    without going through the CrewAI pipeline. Items that cannot be converted
+    carry an error message instead of failing the whole batch.
     """
 
     try:
-        result = run({"query": request.query})
-        return CurrencyAnalysisResponse(response=result) 
+        # refresh the rate snapshot without blocking the event loop; the batch itself is cpu-bound.
+        await aget_rate_matrix()
+
+        items = [(item.amount, item.from_currency, item.to_currency) for item in request.items]
+        results = await run_in_threadpool(convert_batch, items)
+        return BatchConversionResponse(results=results)
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Conversion failed: {str(e)}")
+
+
+
+# define the job submission endpoint.
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_analysis_job(request: CurrencyAnalysisRequest):
+    """
+    Endpoint for submitting a currency analysis as a background job.
+
+    Returns immediately with the job id; poll `GET /currency/jobs/{job_id}`
+    for the status and result. Jobs are persisted, so results survive a
+    restart of the api process, and each result is also kept as a report.
+    """
+
+    job = await run_in_threadpool(job_worker.store.create, request.query)
+    job_worker.notify()
+
+    return JobResponse(**job)
+
+
+# define the job status endpoint.
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_analysis_job(job_id: str):
+    """
+    Endpoint for fetching the status and, once finished, the result of an
+    analysis job.
+    """
+
+    job = job_worker.store.get(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    return JobResponse(**job)
+
+
+
+# define the report endpoint.
+@router.get("/reports/{report_id}", response_model=ReportResponse)
+def get_report(report_id: str):
+    """
+    Endpoint for fetching a stored analysis report by the id returned from
+    `/currency/analyze` or `/currency/analyze/stream`.
+    """
+
+    report = report_store.get(report_id)
+
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found.")
+
+    return ReportResponse(**report)
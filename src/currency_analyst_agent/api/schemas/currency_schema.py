@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic import BaseModel, Field, field_validator
 
 class CurrencyAnalysisRequest(BaseModel):
@@ -28,4 +29,80 @@ class CurrencyAnalysisRequest(BaseModel):
 class CurrencyAnalysisResponse(BaseModel):
     """Schema for the AI analysis response."""
 
-    response: str
\ No newline at end of file
+    response: str
+    report_id: str | None = Field(None, description="Id of the stored report, fetch it with GET /currency/reports/{report_id}.")
+
+
+class CrossRatesResponse(BaseModel):
+    """Schema for a cross-rate matrix derived from one base-currency snapshot."""
+
+    base: str = Field(..., description="Base currency of the underlying snapshot.")
+    as_of: float = Field(..., description="Unix time at which the snapshot was fetched.")
+    codes: list[str] = Field(..., description="Currency codes labelling the matrix rows and columns.")
+    rates: list[list[float]] = Field(
+        ...,
+        description="rates[i][j] is the value of 1 unit of codes[i] in codes[j].",
+    )
+
+
+
+class ConversionItem(BaseModel):
+    """Schema for a single amount to convert between two currencies."""
+
+    amount: float = Field(1.0, ge=0, description="Amount of the source currency to convert.")
+    from_currency: str = Field(..., examples=["USD"], min_length=3, max_length=3, description="Source currency code.")
+    to_currency: str = Field(..., examples=["EUR"], min_length=3, max_length=3, description="Target currency code.")
+
+
+
+class BatchConversionRequest(BaseModel):
+    """Schema for converting many amounts in a single request."""
+
+    items: list[ConversionItem] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Conversions to perform, answered straight from exchange rates without the LLM.",
+    )
+
+
+
+class ConversionResult(BaseModel):
+    """Schema for the outcome of a single conversion."""
+
+    amount: float
+    from_currency: str
+    to_currency: str
+    rate: float | None = Field(None, description="Value of 1 unit of from_currency in to_currency.")
+    converted_amount: float | None = None
+    error: str | None = None
+
+
+
+class BatchConversionResponse(BaseModel):
+    """Schema for the batch conversion response."""
+
+    results: list[ConversionResult]
+
+
+
+class JobResponse(BaseModel):
+    """Schema for the state of an asynchronous analysis job."""
+
+    id: str = Field(..., description="Job id, used to poll GET /currency/jobs/{id}.")
+    query: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    result: str | None = Field(None, description="AI-generated insight, set once the job has succeeded.")
+    report_id: str | None = Field(None, description="Id of the stored report, fetch it with GET /currency/reports/{report_id}.")
+    error: str | None = Field(None, description="Failure reason, set once the job has failed.")
+    created_at: float
+    updated_at: float
+
+
+
+class ReportResponse(BaseModel):
+    """Schema for a stored analysis report."""
+
+    id: str
+    content: str = Field(..., description="Markdown report.")
+    created_at: float
@@ -0,0 +1,82 @@
+import asyncio
+from typing import AsyncIterator, Tuple
+from starlette.concurrency import run_in_threadpool
+from api.services.executor import crew_executor
+from currency_analyst_crew.main import run, run_streaming
+from currency_analyst_crew.query_router import answer_simple_query
+
+
+async def analyze_query(query: str) -> str:
+    """
+    Answer a currency query, using the fast path when possible.
+
+    Simple rate, conversion and supported-codes lookups are answered straight
+    from the rate source; everything else runs the crew on the bounded
+    worker pool.
+
+    Raises:
+        ExecutorSaturated: If the crew worker pool's queue is full.
+        ExecutorUnavailable: If the crew worker pool is not running.
+        asyncio.TimeoutError: If the crew run exceeds its timeout.
+    """
+
+    # fast path: answer simple lookups without an LLM round-trip.
+    result = await run_in_threadpool(answer_simple_query, query)
+
+    if result is not None:
+        return result
+
+    return await crew_executor.run(run, {"query": query})
+
+
+async def stream_query(query: str) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Answer a currency query as a stream of `(event, data)` pairs.
+
+    Yields "token" events with LLM text chunks and "tool" events with the
+    agent's tool calls while the crew runs, then a final "done" event holding
+    the complete response. Fast-path answers are yielded as a single token.
+    Raises the same errors as `analyze_query`.
+    """
+
+    result = await run_in_threadpool(answer_simple_query, query)
+
+    # chunks can only be forwarded from a thread in this process.
+    if result is None and crew_executor.kind == "process":
+        result = await crew_executor.run(run, {"query": query})
+
+    if result is not None:
+        yield "token", {"content": result}
+        yield "done", {"response": result}
+        return
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_event(event: str, data: dict) -> None:
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    crew_run = asyncio.ensure_future(crew_executor.run(run_streaming, {"query": query}, on_event))
+
+    try:
+        while True:
+            next_event = asyncio.ensure_future(events.get())
+            await asyncio.wait({next_event, crew_run}, return_when=asyncio.FIRST_COMPLETED)
+
+            if next_event.done():
+                yield next_event.result()
+                continue
+
+            next_event.cancel()
+
+            # flush events that arrived together with the end of the run.
+            while not events.empty():
+                yield events.get_nowait()
+
+            yield "done", {"response": crew_run.result()}
+            return
+
+    finally:
+        # the client went away or the run failed: stop waiting on (and cancel queued) work.
+        if not crew_run.done():
+            crew_run.cancel()
@@ -0,0 +1,136 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the waiting queue is full."""
+
+
+class ExecutorUnavailable(Exception):
+    """Raised when the executor has not been started or is shutting down."""
+
+
+class CrewExecutor:
+    """
+    Bounded worker pool for blocking crew runs.
+
+    At most `max_workers` runs execute at once and at most `max_queue` more
+    wait for a free worker; anything beyond that is rejected immediately with
+    `ExecutorSaturated` instead of piling up. Each run is awaited with a
+    timeout. A run that is still queued when it times out (or when the client
+    goes away) is cancelled; a run that has already started cannot be
+    interrupted, so its slot is only released once it actually finishes.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 16,
+        timeout_seconds: float = 110.0,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+
+        self._pool: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def from_env(cls) -> "CrewExecutor":
+        """
+        Build the executor from environment variables.
+
+        CREW_EXECUTOR: "thread" (default) or "process".
+        CREW_MAX_WORKERS: concurrent crew runs (default 4).
+        CREW_MAX_QUEUE: runs allowed to wait for a worker (default 16).
+        CREW_TIMEOUT_SECONDS: per-request timeout (default 110, below the frontend's 120).
+        """
+
+        return cls(
+            kind=os.getenv("CREW_EXECUTOR", "thread").lower(),
+            max_workers=int(os.getenv("CREW_MAX_WORKERS", "4")),
+            max_queue=int(os.getenv("CREW_MAX_QUEUE", "16")),
+            timeout_seconds=float(os.getenv("CREW_TIMEOUT_SECONDS", "110")),
+        )
+
+
+    @property
+    def pending(self) -> int:
+        """Number of runs currently executing or waiting for a worker."""
+        return self._pending
+
+
+    def start(self, initializer: Optional[Callable[[], Any]] = None) -> None:
+        """Create the worker pool; `initializer` runs once in every process worker."""
+
+        if self._pool is not None:
+            return
+
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=initializer)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crew")
+
+
+    def shutdown(self) -> None:
+        """Stop accepting work and drop every run that has not started yet."""
+
+        pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Run `fn(*args)` on the pool and await its result.
+
+        Raises:
+            ExecutorUnavailable: If the pool is not running.
+            ExecutorSaturated: If all workers are busy and the queue is full.
+            asyncio.TimeoutError: If the run does not finish within the timeout.
+        """
+
+        pool = self._pool
+
+        if pool is None:
+            raise ExecutorUnavailable("Crew executor is not running.")
+
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                raise ExecutorSaturated("Too many analyses in progress, please retry shortly.")
+            self._pending += 1
+
+        try:
+            future = pool.submit(fn, *args)
+        except RuntimeError as e:
+            self._release(None)
+            raise ExecutorUnavailable(str(e)) from e
+
+        # the slot is held until the work itself completes, not until we stop waiting.
+        future.add_done_callback(self._release)
+
+        # cancelling the wrapped future (timeout or client disconnect) also cancels queued work.
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future),
+            timeout=self.timeout_seconds if timeout is None else timeout,
+        )
+
+
+# shared executor used by the crew endpoints.
+crew_executor = CrewExecutor.from_env()
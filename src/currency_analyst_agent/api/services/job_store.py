@@ -0,0 +1,192 @@
+import os
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+# job lifecycle states.
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobStore:
+    """
+    SQLite-backed store for asynchronous analysis jobs.
+
+    Jobs survive restarts of the api process. A worker claims a job by taking
+    a lease on it; if the worker dies (or the process restarts) before
+    finishing, the lease expires and the job is claimed again, up to
+    `max_attempts` times. Only the current lease owner can finish or release
+    a job, so a worker whose lease expired cannot overwrite the outcome of
+    the worker that took the job over.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 150.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        # create the parent directory and the table if they don't exist.
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, query TEXT NOT NULL, status TEXT NOT NULL, "
+                "result TEXT, report_id TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                "lease_owner TEXT, lease_expires_at REAL, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+            # stores created by earlier versions get the newer columns added.
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column in ("lease_owner", "report_id"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+
+        # a short-lived connection per operation keeps the store safe to use from any thread.
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+    def create(self, query: str) -> dict:
+        """Insert a new queued job and return it."""
+
+        now = time.time()
+        job_id = uuid.uuid4().hex
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, query, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, query, QUEUED, now, now),
+            )
+
+        return self.get(job_id)
+
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job by id, or None if it does not exist."""
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        return dict(row) if row is not None else None
+
+
+    def claim_next(self, owner: str) -> Optional[dict]:
+        """
+        Atomically claim the oldest runnable job.
+
+        Runnable jobs are queued jobs and running jobs whose lease has expired
+        because their worker went away.
+
+        Args:
+            owner (str): Id of the claiming worker, needed to finish the job later.
+
+        Returns:
+            dict | None: The claimed job, or None when nothing is waiting.
+        """
+
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                # jobs that already used every attempt are given up on.
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+                    "WHERE status = ? AND lease_expires_at <= ? AND attempts >= ?",
+                    (FAILED, "Analysis was interrupted too many times.", now, RUNNING, now, self.max_attempts),
+                )
+
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? OR (status = ? AND lease_expires_at <= ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires_at = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (RUNNING, owner, now + self.lease_seconds, now, row["id"]),
+                    )
+
+                conn.execute("COMMIT")
+
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return self.get(row["id"]) if row is not None else None
+
+
+    def release(self, job_id: str, owner: str) -> bool:
+        """Put a claimed job back in the queue without counting the attempt."""
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, lease_owner = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (QUEUED, time.time(), job_id, RUNNING, owner),
+            )
+
+        return cursor.rowcount == 1
+
+
+    def complete(self, job_id: str, owner: str, result: str, report_id: Optional[str] = None) -> bool:
+        """
+        Mark a job as succeeded and store its result.
+
+        Args:
+            job_id (str): The job.
+            owner (str): Id of the worker holding the lease.
+            result (str): The analysis.
+            report_id (str): Id of the result in the report store, if it was stored.
+
+        Returns:
+            bool: False if the lease was lost to another worker, leaving the job untouched.
+        """
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, report_id = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (SUCCEEDED, result, report_id, time.time(), job_id, RUNNING, owner),
+            )
+
+        return cursor.rowcount == 1
+
+
+    def fail(self, job_id: str, owner: str, error: str) -> bool:
+        """
+        Mark a job as failed and store the error message.
+
+        Returns:
+            bool: False if the lease was lost to another worker, leaving the job untouched.
+        """
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (FAILED, error, time.time(), job_id, RUNNING, owner),
+            )
+
+        return cursor.rowcount == 1
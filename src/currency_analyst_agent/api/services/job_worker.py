@@ -0,0 +1,164 @@
+import os
+import uuid
+import asyncio
+import logging
+from typing import Optional
+from api.services.analysis import analyze_query
+from api.services.executor import crew_executor, ExecutorSaturated
+from api.services.job_store import JobStore
+from api.services.report_store import ReportStore, ReportTooLarge, report_store
+
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    Background consumer that runs queued analysis jobs.
+
+    A fixed number of asyncio tasks claim jobs from the store and run them
+    through the same path as `/currency/analyze`, keeping each result in the
+    report store like that endpoint does. Consumers wake up as soon as
+    a job is submitted in this process and otherwise poll the store, so jobs
+    submitted to other api processes (or left over from a restart) are picked
+    up as well. Store calls run in worker threads so the sqlite I/O never
+    blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        concurrency: int = 4,
+        poll_seconds: float = 1.0,
+        reports: Optional[ReportStore] = None,
+    ):
+        self.store = store
+        self.reports = reports
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: list = []
+
+
+    def start(self) -> None:
+        """Start the consumer tasks on the running event loop."""
+
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+
+
+    async def stop(self) -> None:
+        """Cancel the consumer tasks; interrupted jobs are re-claimed after their lease expires."""
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+    def notify(self) -> None:
+        """Wake an idle consumer after a job has been submitted; safe to call from any thread."""
+
+        if self._wakeup is None or self._loop.is_closed():
+            return
+
+        # asyncio events are not thread-safe, so the wakeup is handed to the worker's loop.
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+
+    async def _wait(self, seconds: float) -> None:
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+        self._wakeup.clear()
+
+
+    async def _consume(self) -> None:
+
+        # every consumer holds its leases under its own id.
+        owner = uuid.uuid4().hex
+
+        while True:
+            job = await asyncio.to_thread(self.store.claim_next, owner)
+
+            if job is None:
+                await self._wait(self.poll_seconds)
+                continue
+
+            try:
+                result = await analyze_query(job["query"])
+                report_id = await self._store_report(result)
+                finished = await asyncio.to_thread(self.store.complete, job["id"], owner, result, report_id)
+
+            except ExecutorSaturated:
+                # the pool is busy with direct requests; give the job back and retry later.
+                await asyncio.to_thread(self.store.release, job["id"], owner)
+                await asyncio.sleep(self.poll_seconds)
+                continue
+
+            except asyncio.TimeoutError:
+                finished = await asyncio.to_thread(self.store.fail, job["id"], owner, "Analysis timed out.")
+
+            except asyncio.CancelledError:
+                # shutting down: the expired lease will hand the job to the next worker.
+                raise
+
+            except Exception as e:
+                logger.exception("Analysis job %s failed", job["id"])
+                finished = await asyncio.to_thread(self.store.fail, job["id"], owner, f"Analysis failed: {str(e)}")
+
+            if not finished:
+                logger.warning("Lease on job %s expired before it finished; keeping the other worker's outcome", job["id"])
+
+
+    async def _store_report(self, result: str) -> Optional[str]:
+
+        if self.reports is None:
+            return None
+
+        try:
+            return await asyncio.to_thread(self.reports.put, result)
+        except ReportTooLarge as e:
+            # the job still succeeds; its result is only missing from the report store.
+            logger.warning("Job result not kept as a report: %s", e)
+            return None
+
+
+def build_job_worker() -> JobWorker:
+    """
+    Build the job store and worker from environment variables.
+
+    JOB_STORE_PATH: sqlite file holding the jobs (default output/jobs.db).
+    JOB_WORKERS: concurrent jobs per api process (default CREW_MAX_WORKERS).
+    """
+
+    store = JobStore(
+        os.getenv("JOB_STORE_PATH", "output/jobs.db"),
+        # a job still running past the crew timeout belongs to a dead worker.
+        lease_seconds=crew_executor.timeout_seconds + 30,
+    )
+
+    return JobWorker(
+        store,
+        concurrency=int(os.getenv("JOB_WORKERS", str(crew_executor.max_workers))),
+        reports=report_store,
+    )
+
+
+# shared job worker used by the job endpoints.
+job_worker = build_job_worker()
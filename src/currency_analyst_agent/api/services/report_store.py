@@ -0,0 +1,220 @@
+import os
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class ReportTooLarge(ValueError):
+    """Raised when a report exceeds the size a single report may take."""
+
+
+class ReportStore:
+    """
+    Content-addressed store for analysis reports.
+
+    Each report is identified by the hash of its markdown, so concurrent
+    requests never overwrite each other's output and identical reports are
+    stored once. Reports are kept in memory, bounded by count, total size and
+    age; when `directory` is set they are also written there as
+    `<report_id>.md` so they outlive the process, within the same limits.
+    A single report larger than `max_report_bytes` is rejected.
+    """
+
+    def __init__(
+        self,
+        max_reports: int = 1000,
+        max_bytes: int = 50 * 1024 * 1024,
+        retention_seconds: float = 86400.0,
+        directory: Optional[str] = None,
+        max_report_bytes: int = 1024 * 1024,
+    ):
+        self.max_reports = max_reports
+        self.max_bytes = max_bytes
+        self.max_report_bytes = min(max_report_bytes, max_bytes)
+        self.retention_seconds = retention_seconds
+        self.directory = directory
+
+        self._reports: "OrderedDict[str, dict]" = OrderedDict()
+        self._bytes = 0
+        self._puts = 0
+        self._unpruned_bytes = 0
+        self._lock = threading.Lock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+
+    @classmethod
+    def from_env(cls) -> "ReportStore":
+        """
+        Build the report store from environment variables.
+
+        REPORT_MAX_COUNT: reports kept in memory (default 1000).
+        REPORT_MAX_BYTES: total report size kept in memory and on disk (default 50 MiB).
+        REPORT_MAX_REPORT_BYTES: size of the largest report accepted (default 1 MiB).
+        REPORT_RETENTION_SECONDS: how long reports are kept (default one day).
+        REPORT_DIR: optional directory the reports are persisted to.
+        """
+
+        return cls(
+            max_reports=int(os.getenv("REPORT_MAX_COUNT", "1000")),
+            max_bytes=int(os.getenv("REPORT_MAX_BYTES", str(50 * 1024 * 1024))),
+            retention_seconds=float(os.getenv("REPORT_RETENTION_SECONDS", "86400")),
+            directory=os.getenv("REPORT_DIR") or None,
+            max_report_bytes=int(os.getenv("REPORT_MAX_REPORT_BYTES", str(1024 * 1024))),
+        )
+
+
+    @staticmethod
+    def report_id(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+
+    def _path(self, report_id: str) -> str:
+        return os.path.join(self.directory, f"{report_id}.md")
+
+
+    def put(self, content: str) -> str:
+        """
+        Store a report and return its id.
+
+        Raises:
+            ReportTooLarge: If the report is larger than `max_report_bytes`.
+        """
+
+        size = len(content.encode("utf-8"))
+
+        if size > self.max_report_bytes:
+            raise ReportTooLarge(f"Report of {size} bytes exceeds the {self.max_report_bytes} byte limit.")
+
+        report_id = self.report_id(content)
+        now = time.time()
+
+        with self._lock:
+            previous = self._reports.pop(report_id, None)
+            if previous is not None:
+                self._bytes -= previous["size"]
+
+            self._reports[report_id] = {"id": report_id, "content": content, "created_at": now, "size": size}
+            self._bytes += size
+            self._puts += 1
+            self._unpruned_bytes += size
+
+            self._evict(now)
+
+            # the directory is pruned every 100 reports, or sooner once a tenth of the size limit was written.
+            prune_disk = self.directory and (self._puts % 100 == 0 or self._unpruned_bytes > self.max_bytes // 10)
+            if prune_disk:
+                self._unpruned_bytes = 0
+
+        if self.directory:
+            self._write(report_id, content)
+
+            if prune_disk:
+                self._prune_directory(now)
+
+        return report_id
+
+
+    def get(self, report_id: str) -> Optional[dict]:
+        """Return `{"id", "content", "created_at"}` for a stored report, or None."""
+
+        now = time.time()
+
+        with self._lock:
+            self._evict(now)
+            report = self._reports.get(report_id)
+
+        if report is not None:
+            return {key: report[key] for key in ("id", "content", "created_at")}
+
+        if not self.directory:
+            return None
+
+        # reject anything that is not a report id before touching the filesystem.
+        if len(report_id) != 32 or any(c not in "0123456789abcdef" for c in report_id):
+            return None
+
+        path = self._path(report_id)
+
+        try:
+            created_at = os.path.getmtime(path)
+            if now - created_at > self.retention_seconds:
+                return None
+
+            with open(path, "r", encoding="utf-8") as f:
+                return {"id": report_id, "content": f.read(), "created_at": created_at}
+
+        except FileNotFoundError:
+            return None
+
+
+    def _evict(self, now: float) -> None:
+
+        # caller must hold the lock; reports are ordered oldest first.
+        while self._reports:
+            oldest = next(iter(self._reports.values()))
+
+            expired = now - oldest["created_at"] > self.retention_seconds
+            over_limit = len(self._reports) > self.max_reports or self._bytes > self.max_bytes
+
+            if not (expired or over_limit):
+                break
+
+            self._reports.popitem(last=False)
+            self._bytes -= oldest["size"]
+
+
+    def _write(self, report_id: str, content: str) -> None:
+
+        path = self._path(report_id)
+
+        # same id means same content, so an existing file only needs its age refreshed.
+        if os.path.exists(path):
+            os.utime(path)
+            return
+
+        # write to a temporary file first so readers never see a partial report.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+
+        os.replace(tmp_path, path)
+
+
+    def _prune_directory(self, now: float) -> None:
+
+        entries = []
+
+        for name in os.listdir(self.directory):
+            if not name.endswith(".md"):
+                continue
+
+            path = os.path.join(self.directory, name)
+
+            try:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except FileNotFoundError:
+                continue
+
+        entries.sort(reverse=True)
+        total = 0
+
+        # keep the newest reports within the count and size limits and the retention window.
+        for i, (mtime, size, path) in enumerate(entries):
+            total += size
+
+            if i >= self.max_reports or total > self.max_bytes or now - mtime > self.retention_seconds:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+# shared report store used by the analysis endpoints.
+report_store = ReportStore.from_env()
@@ -1,4 +1,5 @@
 import os
+import json
 import streamlit as st
 import requests
 import time
@@ -7,12 +8,22 @@ import random
 # configure the streamlit page.
 st.set_page_config(page_title="💱 Currency Analyst AI", page_icon="💹", layout="centered")
 
-# backend analyze endpoint (override in Docker / Compose via CURRENCY_API_URL).
-api_url = os.getenv(
-    "CURRENCY_API_URL",
-    "http://localhost:8000/currency/analyze",
+# backend streaming endpoint (override in Docker / Compose via CURRENCY_STREAM_URL).
+stream_url = os.getenv(
+    "CURRENCY_STREAM_URL",
+    "http://localhost:8000/currency/analyze/stream",
 )
 
+# backend job endpoint (override in Docker / Compose via CURRENCY_JOBS_URL).
+jobs_url = os.getenv(
+    "CURRENCY_JOBS_URL",
+    "http://localhost:8000/currency/jobs",
+)
+
+# how often to poll a submitted job, and how long to wait for it overall.
+poll_interval_seconds = 1.0
+job_deadline_seconds = 300
+
 # initialize session state page.
 if "page" not in st.session_state:
     st.session_state.page = "home"
@@ -22,14 +33,92 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
 
 
-# define a function to simulate streaming responses.
-def stream_response(text: str):
-    """Simulate a streaming effect for AI responses."""
+# define a function to read server-sent events from the streaming endpoint.
+def read_events(query: str):
+    """Yield (event, data) pairs as the backend produces them."""
+
+    with requests.post(
+        stream_url,
+        json={"query": query},
+        headers={"Content-Type": "application/json", "Accept": "text/event-stream"},
+        stream=True,
+        timeout=(10, 120),
+    ) as http_response:
+        http_response.raise_for_status()
+
+        event = "message"
+        for line in http_response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+
+            elif line.startswith("data:"):
+                yield event, json.loads(line[len("data:"):].strip())
+
+
+# define a function to render the analysis as it streams in.
+def stream_analysis(query: str, placeholder) -> str:
+    """
+    Render tokens and tool steps in `placeholder` as they arrive and return the
+    final response. Falls back to the job api if the stream cannot be opened.
+    """
+
+    streamed = ""
+
+    try:
+        for event, data in read_events(query):
+            if event == "token":
+                streamed += data["content"]
+                placeholder.markdown(streamed + "▌")
+
+            elif event == "tool":
+                placeholder.markdown(streamed + f"\n\n_🔧 Using {data['tool']}..._")
+
+            elif event == "done":
+                return data["response"]
+
+            elif event == "error":
+                return f"⚠️ API Error ({data['status']}): {data['detail']}"
 
-    for word in text.split():
-        yield word + " "
+    except requests.RequestException:
+        # nothing shown yet: the job api can still answer the question.
+        if streamed:
+            raise
 
-        time.sleep(0.05) 
+        with st.spinner("Analyzing..."):
+            return fetch_analysis(query)
+
+    return streamed
+
+
+# define a function to run an analysis as a background job and wait for its result.
+def fetch_analysis(query: str) -> str:
+    """Submit the query as a job, then poll it with short requests until it finishes."""
+
+    http_response = requests.post(
+        jobs_url,
+        json={"query": query},
+        headers={"Content-Type": "application/json"},
+        timeout=10,
+    )
+    http_response.raise_for_status()
+    job = http_response.json()
+
+    deadline = time.monotonic() + job_deadline_seconds
+
+    while job["status"] in ("queued", "running"):
+        if time.monotonic() > deadline:
+            return "⚠️ The analysis is taking longer than expected. Please try again."
+
+        time.sleep(poll_interval_seconds)
+
+        http_response = requests.get(f"{jobs_url}/{job['id']}", timeout=10)
+        http_response.raise_for_status()
+        job = http_response.json()
+
+    if job["status"] == "failed":
+        return f"⚠️ {job.get('error') or 'The analysis failed.'}"
+
+    return job.get("result") or ""
 
 
 # define function to render the home page.
@@ -88,17 +177,11 @@ def chat_page():
 
         # fetch ai agent response by sending a request to the backend (api url).
         with st.chat_message("assistant"):
+            placeholder = st.empty()
+
             try:
-                http_response = requests.post(
-                    api_url,
-                    json={"query": user_prompt},
-                    headers={"Content-Type": "application/json"},
-                    timeout=120,
-                )
-                http_response.raise_for_status()
-
-                payload = http_response.json()
-                ai_text = payload.get("response")
+                ai_text = stream_analysis(user_prompt, placeholder)
+
                 if not ai_text:
                     ai_text = (
                         "⚠️ The AI agent didn't return any analysis. Please try again."
@@ -121,8 +204,9 @@ def chat_page():
                 ]
                 ai_text = random.choice(fallback_responses) + f"\n\n(Backend error: {e})"
 
-            # simulated streaming output.
-            response_text = st.write_stream(stream_response(ai_text))
+            # replace the streamed draft with the final response.
+            placeholder.markdown(ai_text)
+            response_text = ai_text
 
         # save the ai agent response..
         st.session_state.messages.append({"role": "assistant", "content": response_text})
@@ -2,13 +2,15 @@ from typing import List
 from crewai import Agent, Task, Crew, Process
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from currency_analyst_crew.tools.custom_tool import SupportedCurrenciesTool, CurrencyConverterTool
+from currency_analyst_crew.tools.custom_tool import SupportedCurrenciesTool, CurrencyConverterTool, BatchCurrencyConverterTool
 
 
 supported_currencies_tool = SupportedCurrenciesTool()
 
 currency_converter_tool = CurrencyConverterTool()
 
+batch_currency_converter_tool = BatchCurrencyConverterTool()
+
 
 @CrewBase
 class CurrencyAnalystCrew():
@@ -25,7 +27,8 @@ class CurrencyAnalystCrew():
             memory=True,
             tools=[
                 supported_currencies_tool, 
-                currency_converter_tool
+                currency_converter_tool,
+                batch_currency_converter_tool
             ]
         )
 
@@ -42,7 +45,8 @@ class CurrencyAnalystCrew():
         return Task(
             config=self.tasks_config['real_time_currency_task'],  # type: ignore[index]
             markdown=True,
-            output_file='output/report.md'
+            # no output_file: concurrent runs would overwrite a shared report, so
+            # the api keeps each report in its request-scoped report store instead.
         )
 
     @crew
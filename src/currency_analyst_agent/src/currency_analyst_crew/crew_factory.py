@@ -0,0 +1,90 @@
+import time
+import threading
+from crewai import Crew
+from currency_analyst_crew.crew import CurrencyAnalystCrew
+
+
+class CrewFactory:
+    """
+    Builds the currency analyst crew once per process and hands out isolated
+    copies of it.
+
+    Building `CurrencyAnalystCrew().crew()` parses agents.yaml/tasks.yaml and
+    constructs the agent, its tools and the LLM client. That work is done once
+    for a template crew which is never kicked off itself; every request gets a
+    `Crew.copy()` of it, with its own agent and task objects, so concurrent
+    runs never share task outputs or interpolated inputs.
+    """
+
+    def __init__(self, crew_class=CurrencyAnalystCrew):
+        self.crew_class = crew_class
+        self.build_seconds = None
+
+        self._template = None
+        self._lock = threading.Lock()
+
+
+    def warm_up(self) -> Crew:
+        """Build the template crew if it has not been built yet, and return it."""
+
+        if self._template is None:
+            with self._lock:
+                if self._template is None:
+                    start = time.perf_counter()
+                    self._template = self.crew_class().crew()
+                    self.build_seconds = time.perf_counter() - start
+
+        return self._template
+
+
+    def create(self, stream: bool = False) -> Crew:
+        """
+        Return a fresh, request-scoped copy of the template crew.
+
+        Args:
+            stream (bool): Whether `kickoff` on the copy should stream LLM chunks.
+        """
+
+        crew = self.warm_up().copy()
+        crew.stream = stream
+
+        return crew
+
+
+# shared factory used by every request in this process.
+crew_factory = CrewFactory()
+
+
+def measure_construction(runs: int = 5) -> dict:
+    """
+    Compare per-request crew construction cost with and without the factory.
+
+    Args:
+        runs (int): Number of crews to build with each approach.
+
+    Returns:
+        dict: Average seconds per crew for a full build and for a template copy.
+    """
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        CurrencyAnalystCrew().crew()
+    full_build = (time.perf_counter() - start) / runs
+
+    factory = CrewFactory()
+    factory.warm_up()
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        factory.create()
+    template_copy = (time.perf_counter() - start) / runs
+
+    return {"full_build_seconds": full_build, "template_copy_seconds": template_copy}
+
+
+if __name__ == "__main__":
+
+    timings = measure_construction()
+
+    print(f"full build per request:    {timings['full_build_seconds'] * 1000:.1f} ms")
+    print(f"template copy per request: {timings['template_copy_seconds'] * 1000:.1f} ms")
@@ -1,9 +1,14 @@
-import os
-from currency_analyst_crew.crew import CurrencyAnalystCrew
+from typing import Callable
+from currency_analyst_crew.crew_factory import crew_factory
 
 
-# create output directory if it doesn't exist.
-os.makedirs('output', exist_ok=True)
+# define the warm up function to pre-build the crew in the current process.
+def warm_up():
+    """
+    Build the crew template for this process (also used as a worker pool initializer).
+    """
+
+    crew_factory.warm_up()
 
 
 # define the run function to kickoff the crew.
@@ -12,16 +17,45 @@ def run(inputs: dict):
     Run the currency analyst crew.
     """
 
-    # create and run the crew.
-    result = CurrencyAnalystCrew().crew().kickoff(inputs=inputs)
+    # take an isolated copy of the pre-built crew and run it.
+    result = crew_factory.create().kickoff(inputs=inputs)
+
+    return result.raw
+
 
-    # # print the result.
-    # print("\n\n=== FINAL REPORT ===\n\n")
-    # print(result)
+# define the streaming run function to kickoff the crew and forward its output as it is produced.
+def run_streaming(inputs: dict, on_event: Callable[[str, dict], None]):
+    """
+    Run the currency analyst crew, forwarding LLM tokens and tool calls as they happen.
 
-    # print("\n\nReport has been saved to output/report.md")
+    Args:
+        inputs (dict): Crew inputs (e.g. {"query": ...}).
+        on_event (Callable): Called with ("token", {...}) for every text chunk and
+            ("tool", {...}) for every tool call the agent makes.
 
-    return result.raw
+    Returns:
+        str: The final crew output.
+    """
+
+    crew = crew_factory.create(stream=True)
+
+    # crewai's stream handler listens on a process-wide event bus, so only keep
+    # chunks that belong to this request's copy of the agents.
+    agent_ids = {str(agent.id) for agent in crew.agents}
+
+    streaming = crew.kickoff(inputs=inputs)
+
+    for chunk in streaming:
+        if chunk.agent_id and chunk.agent_id not in agent_ids:
+            continue
+
+        if chunk.tool_call is not None:
+            on_event("tool", {"tool": chunk.tool_call.tool_name, "arguments": chunk.tool_call.arguments})
+
+        elif chunk.content:
+            on_event("token", {"content": chunk.content, "task": chunk.task_name})
+
+    return streaming.result.raw
 
 
 if __name__ == "__main__":
@@ -35,4 +69,4 @@ if __name__ == "__main__":
     # }
     
     
-    run(inputs)
\ No newline at end of file
+    print(run(inputs))
\ No newline at end of file
@@ -0,0 +1,317 @@
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+from currency_analyst_crew.tools.exchange_rate_api import get_supported_codes, get_rate_matrix, convert_batch
+
+
+# set FAST_PATH_ENABLED=false to send every query to the crew.
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# queries longer than this are treated as open-ended and go to the crew.
+MAX_SIMPLE_QUERY_WORDS = 30
+
+
+# country, region and currency names mapped to their iso 4217 codes.
+CURRENCY_ALIASES = {
+    "usa": "USD", "united states": "USD", "united states of america": "USD", "america": "USD",
+    "us dollar": "USD", "american dollar": "USD", "dollar": "USD",
+    "germany": "EUR", "france": "EUR", "italy": "EUR", "spain": "EUR", "netherlands": "EUR",
+    "portugal": "EUR", "ireland": "EUR", "belgium": "EUR", "austria": "EUR", "greece": "EUR",
+    "finland": "EUR", "europe": "EUR", "eurozone": "EUR", "euro": "EUR",
+    "uk": "GBP", "united kingdom": "GBP", "britain": "GBP", "great britain": "GBP", "england": "GBP",
+    "pound": "GBP", "pound sterling": "GBP", "sterling": "GBP",
+    "nigeria": "NGN", "naira": "NGN",
+    "ghana": "GHS", "cedi": "GHS",
+    "kenya": "KES", "kenyan shilling": "KES",
+    "south africa": "ZAR", "rand": "ZAR",
+    "egypt": "EGP", "egyptian pound": "EGP",
+    "japan": "JPY", "yen": "JPY",
+    "china": "CNY", "yuan": "CNY", "renminbi": "CNY",
+    "india": "INR", "rupee": "INR", "indian rupee": "INR",
+    "canada": "CAD", "canadian dollar": "CAD",
+    "australia": "AUD", "australian dollar": "AUD",
+    "new zealand": "NZD",
+    "mexico": "MXN", "mexican peso": "MXN",
+    "brazil": "BRL", "brazilian real": "BRL",
+    "argentina": "ARS", "argentine peso": "ARS",
+    "switzerland": "CHF", "swiss franc": "CHF",
+    "russia": "RUB", "ruble": "RUB", "rouble": "RUB",
+    "south korea": "KRW", "korea": "KRW",
+    "turkey": "TRY", "lira": "TRY", "turkish lira": "TRY",
+    "saudi arabia": "SAR", "riyal": "SAR",
+    "uae": "AED", "united arab emirates": "AED", "dubai": "AED", "dirham": "AED",
+    "singapore": "SGD", "hong kong": "HKD",
+    "sweden": "SEK", "norway": "NOK", "denmark": "DKK", "poland": "PLN",
+    "pakistan": "PKR", "bangladesh": "BDT", "indonesia": "IDR", "philippines": "PHP",
+    "thailand": "THB", "vietnam": "VND", "malaysia": "MYR", "israel": "ILS",
+}
+
+# iso codes that are also common english words; these only count when written in capitals.
+AMBIGUOUS_CODES = {"ALL", "TRY", "TOP", "CUP", "MOP", "PEN", "BOB", "MAD", "GEL", "SOS"}
+
+# words that signal an open-ended analysis request rather than a lookup.
+ANALYSIS_KEYWORDS = re.compile(
+    r"\b(why|trend\w*|insight\w*|factor\w*|influenc\w*|explain\w*|analy\w*|compar\w*|strength\w*|"
+    r"strong\w*|weak\w*|predict\w*|forecast\w*|histor\w*|should|recommend\w*|impact\w*|affect\w*|"
+    r"news|outlook|advice|advise|invest\w*|relationship\w*)\b",
+    re.IGNORECASE,
+)
+
+# words that ask about another time than now; live rates cannot answer those, the crew can.
+# "may" is left out of the months, it is more often the verb.
+TEMPORAL_KEYWORDS = re.compile(
+    r"\b(was|were|had|yesterday|tomorrow|ago|last|previous\w*|past|since|earlier|back then|"
+    r"next|will|future|years?|months?|weeks?|days?|decades?|"
+    r"january|february|march|april|june|july|august|september|october|november|december)\b",
+    re.IGNORECASE,
+)
+
+# calendar dates ("2024-01-01", "01/02/2024") and years ("in 2020").
+DATE = re.compile(r"\b\d{4}-\d{1,2}(?:-\d{1,2})?\b|\b\d{1,2}[/.]\d{1,2}[/.]\d{2,4}\b")
+YEAR = re.compile(r"(?<![\d,.])\b(?:19|20)\d{2}\b(?![\d,.])")
+
+# phrases that mark a rate or conversion question.
+RATE_KEYWORDS = re.compile(
+    r"\b(rate|rates|convert|conversion|exchange|worth|how much|how many|to|in|into|vs|versus|against)\b|/|=",
+    re.IGNORECASE,
+)
+
+# phrases that ask for the supported codes list.
+CODES_QUERY = re.compile(
+    r"\b(supported|available)\b.*\b(currencies|codes)\b|\b(currencies|codes)\b.*\b(supported|available)\b",
+    re.IGNORECASE,
+)
+
+# "how many naira to a dollar" asks for the rate in the reverse direction.
+REVERSED_QUERY = re.compile(r"\bhow many\b.*\b(per|to|for)\s+(a|an|one|1)\b", re.IGNORECASE)
+
+# a number, with an optional scale word ("2 million", "5k"); parts of dates are not numbers.
+AMOUNT = re.compile(
+    r"(?<![\w.\-/])(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?"
+    r"(?:\s*(k|thousand|m|mn|million|bn|billion)\b)?(?![\w.]|[-/]\d)",
+    re.IGNORECASE,
+)
+
+SCALES = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mn": 1e6, "million": 1e6, "bn": 1e9, "billion": 1e9}
+
+# a lowercase code only counts where a currency is expected: after an amount or "to", or before "to".
+CODE_POSITION_BEFORE = re.compile(
+    r"(?:\d\s*(?:k|thousand|m|mn|million|bn|billion)?|\b(?:to|into|from|in|vs|versus|against|per)|/)\s*$",
+    re.IGNORECASE,
+)
+CODE_POSITION_AFTER = re.compile(r"^\s*(?:\b(?:to|into|in|vs|versus|against|per)\b|/)", re.IGNORECASE)
+LIST_SEPARATOR = re.compile(r"\s*(?:,|\band\b)\s*", re.IGNORECASE)
+
+# text between two currencies that reads from the first to the second ("USD to EUR", "usd/eur").
+DIRECTION = re.compile(
+    r"\s*(?:currency\s+|currencies\s+)?(?:to|into|in|vs\.?|versus|against|and|/|-)\s*",
+    re.IGNORECASE,
+)
+
+CURRENCY_MENTION = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(alias) for alias in sorted(CURRENCY_ALIASES, key=len, reverse=True))
+    + r")s?\b|\b[A-Za-z]{3}\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class SimpleQuery:
+    """A query that can be answered directly from exchange rates."""
+
+    intent: str  # "rate" or "codes".
+    amount: Optional[float] = None
+    from_currency: Optional[str] = None
+    to_currencies: List[str] = field(default_factory=list)
+
+
+def _find_currencies(query: str, supported: set) -> list:
+    """Return the currencies mentioned in `query`, as (code, start, end) tuples in order."""
+
+    found = []
+
+    for match in CURRENCY_MENTION.finditer(query):
+        text = match.group(0)
+        lowered = text.lower()
+
+        code = CURRENCY_ALIASES.get(lowered)
+
+        # allow plurals such as "euros" or "pounds".
+        if code is None and lowered.endswith("s"):
+            code = CURRENCY_ALIASES.get(lowered[:-1])
+
+        if code is None and len(text) == 3:
+            candidate = text.upper()
+
+            if candidate in supported and (candidate not in AMBIGUOUS_CODES or text.isupper()):
+                # lowercase words ("kid", "bam") are only codes where a currency is expected,
+                # or as the next item of a list of currencies ("to eur, gbp and jpy").
+                in_list = bool(found) and LIST_SEPARATOR.fullmatch(query[found[-1][2]:match.start()])
+
+                if (text.isupper() or in_list
+                        or CODE_POSITION_BEFORE.search(query[:match.start()])
+                        or CODE_POSITION_AFTER.match(query[match.end():])):
+                    code = candidate
+
+        # skip unknown words and immediate repeats ("USD (US dollar)").
+        if code is not None and code in supported and (not found or found[-1][0] != code):
+            found.append((code, match.start(), match.end()))
+
+    return found
+
+
+def _find_amount(query: str, mentions: list) -> tuple:
+    """
+    Find the amount to convert: a number right before or right after a currency mention.
+
+    Returns:
+        tuple: The amount (or None), its (start, end) span in the query (or None), and the
+        currency it is written next to (None when it sits between two different currencies).
+    """
+
+    for match in AMOUNT.finditer(query):
+        start, end = match.span()
+
+        adjacent = {
+            code for code, mention_start, mention_end in mentions
+            if (end <= mention_start and not query[end:mention_start].strip())
+            or (mention_end <= start and not query[mention_end:start].strip())
+        }
+
+        if not adjacent:
+            continue
+
+        amount = float(match.group(1).replace(",", "") + (match.group(2) or ""))
+
+        if match.group(3):
+            amount *= SCALES[match.group(3).lower()]
+
+        return amount, (start, end), adjacent.pop() if len(adjacent) == 1 else None
+
+    return None, None, None
+
+
+def parse_simple_query(query: str, supported_codes) -> Optional[SimpleQuery]:
+    """
+    Classify `query` and parse it when it is a simple lookup.
+
+    Args:
+        query (str): The user's natural language query.
+        supported_codes (Iterable[str]): Currency codes the rate source can answer.
+
+    Returns:
+        SimpleQuery | None: The parsed lookup, or None when the query needs the crew.
+    """
+
+    if len(query.split()) > MAX_SIMPLE_QUERY_WORDS or ANALYSIS_KEYWORDS.search(query):
+        return None
+
+    mentions = _find_currencies(query, set(supported_codes))
+    currencies = [code for code, _, _ in mentions]
+
+    if CODES_QUERY.search(query) and len(currencies) < 2:
+        return SimpleQuery(intent="codes")
+
+    if len(currencies) < 2 or not RATE_KEYWORDS.search(query):
+        return None
+
+    # only a number next to a currency is an amount ("convert 1,500.50 USD to EUR", "2 million naira").
+    amount, amount_span, amount_currency = _find_amount(query, mentions)
+
+    # the amount is in the currency written next to it ("how many yen is 100 dollars"); without
+    # an amount the wording must give the direction, otherwise the crew works it out.
+    if amount is not None:
+        from_currency = amount_currency
+    elif REVERSED_QUERY.search(query) and len(currencies) == 2:
+        from_currency = currencies[1]
+    elif DIRECTION.fullmatch(query[mentions[0][2]:mentions[1][1]]):
+        from_currency = currencies[0]
+    else:
+        from_currency = None
+
+    if from_currency is None:
+        return None
+
+    to_currencies = list(dict.fromkeys(code for code in currencies if code != from_currency))
+
+    if not to_currencies:
+        return None
+
+    # questions about another time ("in 2020", "last week", "on 2024-01-01") go to the crew.
+    years = [match.span() for match in YEAR.finditer(query)]
+    if TEMPORAL_KEYWORDS.search(query) or DATE.search(query) or any(
+        amount_span is None or end <= amount_span[0] or start >= amount_span[1] for start, end in years
+    ):
+        return None
+
+    return SimpleQuery(intent="rate", amount=amount, from_currency=from_currency, to_currencies=to_currencies)
+
+
+def _format_number(value: float) -> str:
+    return f"{value:,.2f}" if abs(value) >= 1 else f"{value:.6g}"
+
+
+def answer_simple_query(query: str) -> Optional[str]:
+    """
+    Answer a simple rate, conversion or supported-codes question without the crew.
+
+    Returns:
+        str | None: A markdown response, or None when the query should go to the crew
+        (open-ended question, unparseable query or rates unavailable).
+    """
+
+    if not FAST_PATH_ENABLED:
+        return None
+
+    supported = get_supported_codes()
+    matrix = get_rate_matrix()
+
+    if supported is not None:
+        codes = [code for code, _ in supported]
+    elif matrix is not None:
+        codes = matrix.codes
+    else:
+        return None
+
+    parsed = parse_simple_query(query, codes)
+
+    if parsed is None:
+        return None
+
+    if parsed.intent == "codes":
+        if supported is None:
+            return None
+
+        lines = [f"- **{code}** - {name}" for code, name in supported]
+        return f"### Supported currencies ({len(lines)})\n\n" + "\n".join(lines)
+
+    amount = 1.0 if parsed.amount is None else parsed.amount
+    results = convert_batch((amount, parsed.from_currency, to) for to in parsed.to_currencies)
+
+    # let the crew explain anything we could not resolve.
+    if any(result["error"] for result in results):
+        return None
+
+    as_of = matrix.fetched_at if matrix is not None else time.time()
+
+    if parsed.amount is None:
+        title = "### Current exchange rate" + ("s" if len(results) > 1 else "")
+        rows = [f"| 1 {r['from_currency']} | {r['rate']:.6g} {r['to_currency']} |" for r in results]
+        table = "| From | To |\n| --- | --- |\n" + "\n".join(rows)
+
+    else:
+        title = "### Currency conversion"
+        rows = [
+            f"| {_format_number(r['amount'])} {r['from_currency']} "
+            f"| {_format_number(r['converted_amount'])} {r['to_currency']} "
+            f"| {r['rate']:.6g} |"
+            for r in results
+        ]
+        table = "| Amount | Converted | Rate |\n| --- | --- | --- |\n" + "\n".join(rows)
+
+    footer = f"_Live rates from ExchangeRate-API as of {time.strftime('%Y-%m-%d %H:%M UTC', time.gmtime(as_of))}._"
+
+    return f"{title}\n\n{table}\n\n{footer}"
@@ -1,18 +1,10 @@
-import os
-import requests
-from dotenv import load_dotenv
 from pydantic import BaseModel
 from typing import Type
 from crewai.tools import BaseTool
 from .tool_schema import CurrencyConverterInput
 from .tool_schema import SupportedCurrenciesInput
-
-
-load_dotenv()
-
-
-# access the exchange rate api key using os.getenv()
-exchange_rate_api_key = os.getenv("EXCHANGE_RATE_API_KEY")
+from .tool_schema import BatchCurrencyConverterInput
+from .exchange_rate_api import exchange_rate_api_key, get_supported_codes, get_pair_rate, convert_batch
 
 
 class SupportedCurrenciesTool(BaseTool):
@@ -39,22 +31,13 @@ class SupportedCurrenciesTool(BaseTool):
 
     def _run(self) -> str:
 
-        # endpoint for retrieving all supported currency codes.
-        url = f'https://v6.exchangerate-api.com/v6/{self.api_key}/codes'
-
-        # send a get request to fetch the list of all supported currencies.
-        response = requests.get(url)
+        # fetch the list of all supported currencies (served from the shared rate cache when fresh).
+        supported_codes = get_supported_codes(self.api_key)
 
         # check if the request was successful; return error message if not successful.
-        if response.status_code != 200:
+        if supported_codes is None:
             return "Failed to fetch supported currency codes."
 
-        # parse the json response from the api.
-        data = response.json()
-        
-        # if the key "supported_codes" is missing, default to an empty list to avoid errors.
-        supported_codes = data.get("supported_codes", [])
-
         # format each supported currency code and its corresponding currency name.    
         output_lines = [f"{code} - {country}" for code, country in supported_codes]
 
@@ -89,26 +72,69 @@ class CurrencyConverterTool(BaseTool):
 
     def _run(self, from_currency: str, to_currency: str) -> str:
 
-        # construct the api url for fetching the real-time exchange rate.
-        url = f"https://v6.exchangerate-api.com/v6/{self.api_key}/pair/{from_currency}/{to_currency}"
+        # normalize the currency codes so equivalent requests share one cache entry.
+        from_currency = from_currency.strip().upper()
+        to_currency = to_currency.strip().upper()
 
-        # send a get request to the exchange rate api.
-        response = requests.get(url)
+        # fetch the real-time exchange rate (served from the shared rate cache when fresh).
+        try:
+            conversion_rate = get_pair_rate(from_currency, to_currency, self.api_key)
+
+        except ValueError:
+            return "Invalid currency code."
 
         # check if the request was successful; return error message if not successful.
-        if response.status_code != 200:
+        if conversion_rate is None:
             return "Failed to fetch current exchange rates."
 
-        # parse the json response from the api.
-        data = response.json()
+        # return a clear, user-friendly message showing the current exchange rate.
+        return f"Current exchange rate: 1 {from_currency} = {conversion_rate} {to_currency}"
 
-        # extract the conversion rate and the target currency code from the response.
-        conversion_rate = data.get("conversion_rate")
-        target_code = data.get("target_code")
 
-        # validate that the response contains the expected data and matches the requested target currency.
-        if conversion_rate is None or target_code != to_currency:
-            return "Invalid currency code."
+class BatchCurrencyConverterTool(BaseTool):
+    """
+    Tool for converting many amounts between many currency pairs in a single
+    call.
+
+    All pairs are answered from one base-currency rate snapshot, so the agent
+    can handle a request such as "convert 100 USD to EUR, GBP, NGN and JPY"
+    with one tool step instead of calling the Currency Converter Tool once per
+    pair. It does not support historical data, trend analysis, or future
+    predictions.
+    """
 
-        # return a clear, user-friendly message showing the current exchange rate.
-        return f"Current exchange rate: 1 {from_currency} = {conversion_rate} {to_currency}"
\ No newline at end of file
+    name: str = "Batch Currency Converter Tool"
+    description: str = (
+        "Converts several amounts between currency pairs in one call. Takes a "
+        "list of conversions, each with an amount, a source currency code and a "
+        "target currency code, and returns the current rate and converted amount "
+        "for every item. Prefer this over repeated Currency Converter Tool calls "
+        "whenever more than one pair is needed. Does not provide historical or "
+        "predictive data."
+    )
+    args_schema: Type[BaseModel] = BatchCurrencyConverterInput
+    api_key: str = exchange_rate_api_key
+
+
+    def _run(self, conversions: list) -> str:
+
+        # accept both validated models and plain dicts from the agent.
+        items = [
+            (item["amount"], item["from_currency"], item["to_currency"])
+            if isinstance(item, dict)
+            else (item.amount, item.from_currency, item.to_currency)
+            for item in conversions
+        ]
+
+        results = convert_batch(items, self.api_key)
+
+        # format one line per conversion, keeping failures visible to the agent.
+        output_lines = [
+            f"{r['amount']:g} {r['from_currency']} -> {r['to_currency']}: {r['error']}"
+            if r["error"]
+            else f"{r['amount']:g} {r['from_currency']} = {r['converted_amount']:.4f} {r['to_currency']} "
+                 f"(1 {r['from_currency']} = {r['rate']} {r['to_currency']})"
+            for r in results
+        ]
+
+        return "\n".join(output_lines)
@@ -0,0 +1,342 @@
+import os
+import time
+import asyncio
+import numpy as np
+from typing import Iterable, Optional
+from dotenv import load_dotenv
+from .http_client import http_client, async_http_client, UpstreamError
+from .rate_cache import rate_cache
+from .rate_matrix import RateMatrix
+
+
+load_dotenv()
+
+
+# access the exchange rate api key using os.getenv()
+exchange_rate_api_key = os.getenv("EXCHANGE_RATE_API_KEY")
+
+# base url of the exchange rate api (v6); point it at a local stub server for testing.
+BASE_URL = os.getenv("EXCHANGE_RATE_API_BASE_URL", "https://v6.exchangerate-api.com/v6").rstrip("/")
+
+# the supported codes list changes rarely, so it is kept much longer than a rate.
+SUPPORTED_CODES_TTL_SECONDS = float(os.getenv("SUPPORTED_CODES_TTL_SECONDS", "86400"))
+
+# base currency of the rate matrix snapshot and how long a snapshot counts as fresh.
+RATE_MATRIX_BASE = os.getenv("RATE_MATRIX_BASE", "USD").upper()
+RATE_MATRIX_MAX_AGE_SECONDS = float(os.getenv("RATE_MATRIX_MAX_AGE_SECONDS", str(rate_cache.ttl_seconds)))
+
+# rate matrices built from the cached snapshots, keyed by base currency.
+_matrices: dict = {}
+
+# snapshot refreshes in flight on the event loop, keyed by cache key.
+_async_refreshes: dict = {}
+
+
+def _get(url: str):
+
+    # upstream failures (after retries, or while the circuit is open) count as a failed request.
+    try:
+        return http_client.get(url)
+    except UpstreamError:
+        return None
+
+
+def fetch_supported_codes(api_key: str) -> Optional[list]:
+    """
+    Fetch all supported currency codes straight from the exchange rate api.
+
+    Args:
+        api_key (str): Exchange rate api key.
+
+    Returns:
+        list | None: A list of `[code, currency name]` pairs, or None if the request failed.
+    """
+
+    # endpoint for retrieving all supported currency codes.
+    url = f"{BASE_URL}/{api_key}/codes"
+
+    # send a get request to fetch the list of all supported currencies.
+    response = _get(url)
+
+    if response is None or response.status_code != 200:
+        return None
+
+    # if the key "supported_codes" is missing, default to an empty list to avoid errors.
+    return response.json().get("supported_codes", [])
+
+
+def fetch_pair_rate(api_key: str, from_currency: str, to_currency: str) -> Optional[float]:
+    """
+    Fetch the real-time exchange rate for one currency pair from the exchange rate api.
+
+    Args:
+        api_key (str): Exchange rate api key.
+        from_currency (str): Base or source currency code.
+        to_currency (str): Target currency code.
+
+    Returns:
+        float | None: The value of 1 unit of `from_currency` in `to_currency`,
+        or None if the request failed.
+
+    Raises:
+        ValueError: If the response does not describe the requested pair.
+    """
+
+    # construct the api url for fetching the real-time exchange rate.
+    url = f"{BASE_URL}/{api_key}/pair/{from_currency}/{to_currency}"
+
+    # send a get request to the exchange rate api.
+    response = _get(url)
+
+    if response is None or response.status_code != 200:
+        return None
+
+    data = response.json()
+
+    # extract the conversion rate and the target currency code from the response.
+    conversion_rate = data.get("conversion_rate")
+    target_code = data.get("target_code")
+
+    # validate that the response contains the expected data and matches the requested target currency.
+    if conversion_rate is None or target_code != to_currency:
+        raise ValueError("Invalid currency code.")
+
+    return conversion_rate
+
+
+def fetch_latest_rates(api_key: str, base: str) -> Optional[dict]:
+    """
+    Fetch the full rate table for one base currency from the exchange rate api.
+
+    Args:
+        api_key (str): Exchange rate api key.
+        base (str): Base currency code.
+
+    Returns:
+        dict | None: `{"base", "fetched_at", "rates"}` where `rates` maps every
+        supported code to the value of 1 unit of `base`, or None if the request failed.
+    """
+
+    # endpoint for retrieving the latest rates against the base currency.
+    url = f"{BASE_URL}/{api_key}/latest/{base}"
+
+    return _parse_latest_rates(_get(url), base)
+
+
+async def afetch_latest_rates(api_key: str, base: str) -> Optional[dict]:
+    """Async counterpart of `fetch_latest_rates`, for use on the FastAPI event loop."""
+
+    url = f"{BASE_URL}/{api_key}/latest/{base}"
+
+    try:
+        response = await async_http_client.get(url)
+    except UpstreamError:
+        response = None
+
+    return _parse_latest_rates(response, base)
+
+
+def _parse_latest_rates(response, base: str) -> Optional[dict]:
+
+    if response is None or response.status_code != 200:
+        return None
+
+    conversion_rates = response.json().get("conversion_rates")
+
+    if not conversion_rates:
+        return None
+
+    return {"base": base, "fetched_at": time.time(), "rates": conversion_rates}
+
+
+def _matrix_from_snapshot(snapshot: Optional[dict], base: str, max_age_seconds: float) -> Optional[RateMatrix]:
+
+    if snapshot is None:
+        return None
+
+    # only rebuild the numpy vector when the cached snapshot actually changed.
+    matrix = _matrices.get(base)
+
+    if matrix is None or matrix.fetched_at != snapshot["fetched_at"]:
+        matrix = RateMatrix(base, snapshot["rates"], snapshot["fetched_at"])
+        _matrices[base] = matrix
+
+    if not matrix.is_fresh(max_age_seconds):
+        return None
+
+    return matrix
+
+
+def get_rate_matrix(
+    api_key: str = exchange_rate_api_key,
+    base: str = RATE_MATRIX_BASE,
+    max_age_seconds: float = RATE_MATRIX_MAX_AGE_SECONDS,
+) -> Optional[RateMatrix]:
+    """
+    Return a fresh rate matrix for `base`, refreshing the snapshot when it has expired.
+
+    The snapshot is stored in the shared rate cache, so concurrent refreshes
+    are coalesced into one `/latest/{BASE}` call and, with a shared backend,
+    reused across worker processes.
+
+    Returns:
+        RateMatrix | None: The snapshot, or None if no fresh snapshot could be obtained.
+    """
+
+    snapshot = rate_cache.get_or_fetch(
+        f"latest:{base}",
+        lambda: fetch_latest_rates(api_key, base),
+        ttl_seconds=max_age_seconds,
+    )
+
+    return _matrix_from_snapshot(snapshot, base, max_age_seconds)
+
+
+async def aget_rate_matrix(
+    api_key: str = exchange_rate_api_key,
+    base: str = RATE_MATRIX_BASE,
+    max_age_seconds: float = RATE_MATRIX_MAX_AGE_SECONDS,
+) -> Optional[RateMatrix]:
+    """
+    Async counterpart of `get_rate_matrix` that never blocks the event loop on upstream.
+
+    Concurrent refreshes on the event loop are coalesced into one
+    `/latest/{BASE}` call, and the snapshot is shared with the sync helpers
+    through the rate cache.
+    """
+
+    key = f"latest:{base}"
+    snapshot = rate_cache.get(key)
+
+    if snapshot is None:
+        refresh = _async_refreshes.get(key)
+
+        if refresh is None:
+            async def _refresh():
+                fresh = await afetch_latest_rates(api_key, base)
+                if fresh is not None:
+                    rate_cache.set(key, fresh, ttl_seconds=max_age_seconds)
+                return fresh
+
+            refresh = asyncio.ensure_future(_refresh())
+            _async_refreshes[key] = refresh
+            refresh.add_done_callback(lambda _: _async_refreshes.pop(key, None))
+
+        # shield the shared refresh so one cancelled caller doesn't cancel it for the others.
+        snapshot = await asyncio.shield(refresh)
+
+    return _matrix_from_snapshot(snapshot, base, max_age_seconds)
+
+
+def get_supported_codes(api_key: str = exchange_rate_api_key) -> Optional[list]:
+    """Return the supported currency codes, served from the shared rate cache when possible."""
+
+    return rate_cache.get_or_fetch(
+        "codes",
+        lambda: fetch_supported_codes(api_key),
+        ttl_seconds=SUPPORTED_CODES_TTL_SECONDS,
+    )
+
+
+def get_pair_rate(from_currency: str, to_currency: str, api_key: str = exchange_rate_api_key) -> Optional[float]:
+    """
+    Return the exchange rate for a currency pair.
+
+    The rate is derived from the base-currency rate matrix when a fresh
+    snapshot is available; only otherwise does it fall back to the cached
+    `/pair/{from}/{to}` endpoint.
+    """
+
+    from_currency = from_currency.strip().upper()
+    to_currency = to_currency.strip().upper()
+
+    matrix = get_rate_matrix(api_key)
+
+    if matrix is not None and from_currency in matrix and to_currency in matrix:
+        return matrix.rate(from_currency, to_currency)
+
+    return _get_cached_pair_rate(from_currency, to_currency, api_key)
+
+
+def _get_cached_pair_rate(from_currency: str, to_currency: str, api_key: str) -> Optional[float]:
+
+    # pair endpoint fallback, used when the pair is not covered by a fresh snapshot.
+    return rate_cache.get_or_fetch(
+        f"pair:{from_currency}:{to_currency}",
+        lambda: fetch_pair_rate(api_key, from_currency, to_currency),
+    )
+
+
+def convert_batch(conversions: Iterable[tuple], api_key: str = exchange_rate_api_key) -> list:
+    """
+    Convert many `(amount, from_currency, to_currency)` items in one pass.
+
+    Every pair covered by the fresh rate matrix is converted with a single
+    vectorized numpy operation; the remaining pairs fall back to the cached
+    pair endpoint, once per distinct pair.
+
+    Args:
+        conversions (Iterable[tuple]): `(amount, from_currency, to_currency)` items.
+        api_key (str): Exchange rate api key.
+
+    Returns:
+        list: One dict per item with `amount`, `from_currency`, `to_currency`,
+        `rate`, `converted_amount` and `error` (None on success).
+    """
+
+    conversions = list(conversions)
+    count = len(conversions)
+
+    amounts = np.fromiter((amount for amount, _, _ in conversions), dtype=np.float64, count=count)
+    from_codes = [from_currency.strip().upper() for _, from_currency, _ in conversions]
+    to_codes = [to_currency.strip().upper() for _, _, to_currency in conversions]
+
+    # nan marks items that have not been resolved yet.
+    rates = np.full(count, np.nan)
+    errors = [None] * count
+
+    matrix = get_rate_matrix(api_key)
+
+    if matrix is not None:
+        covered = [i for i in range(count) if from_codes[i] in matrix and to_codes[i] in matrix]
+
+        if covered:
+            rates[covered] = matrix.pair_rates(
+                [from_codes[i] for i in covered],
+                [to_codes[i] for i in covered],
+            )
+
+    # resolve the rest through the pair endpoint, once per distinct pair.
+    fallback = {}
+
+    for i in np.flatnonzero(np.isnan(rates)):
+        pair = (from_codes[i], to_codes[i])
+
+        if pair not in fallback:
+            try:
+                fallback[pair] = _get_cached_pair_rate(pair[0], pair[1], api_key)
+            except ValueError:
+                fallback[pair] = "Invalid currency code."
+
+        rate = fallback[pair]
+
+        if rate is None:
+            errors[i] = "Failed to fetch current exchange rates."
+        elif isinstance(rate, str):
+            errors[i] = rate
+        else:
+            rates[i] = rate
+
+    converted = amounts * rates
+
+    return [
+        {
+            "amount": float(amounts[i]),
+            "from_currency": from_codes[i],
+            "to_currency": to_codes[i],
+            "rate": None if errors[i] else float(rates[i]),
+            "converted_amount": None if errors[i] else float(converted[i]),
+            "error": errors[i],
+        }
+        for i in range(count)
+    ]
@@ -0,0 +1,325 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional
+
+
+# status codes worth retrying: rate limiting and upstream server errors.
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """Raised when the upstream api could not be reached after every retry."""
+
+
+class CircuitOpenError(UpstreamError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast for `reset_seconds`. The first call after that is let
+    through as a trial (half-open): success closes the circuit again, failure
+    re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+
+    def acquire(self) -> Optional[str]:
+        """
+        Ask whether a call may go upstream right now.
+
+        Returns:
+            str | None: "call" while closed, "trial" for the single half-open trial, None while open.
+        """
+
+        with self._lock:
+            if self._opened_at is None:
+                return "call"
+
+            # let exactly one trial call through once the reset window has passed.
+            if time.monotonic() - self._opened_at >= self.reset_seconds and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return "trial"
+
+            return None
+
+
+    def allow(self) -> bool:
+        """Return True if a call may go upstream right now."""
+        return self.acquire() is not None
+
+
+    def release_trial(self) -> None:
+        """Give up a trial that ended without an outcome (e.g. cancelled), so the next call can try."""
+
+        with self._lock:
+            self._trial_in_flight = False
+
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class _RetryPolicy:
+    """Shared retry, backoff and circuit breaker settings for the sync and async clients."""
+
+    def __init__(
+        self,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        pool_size: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.breaker = breaker or CircuitBreaker()
+
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given (0-based) retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+    def check_circuit(self) -> str:
+
+        permit = self.breaker.acquire()
+
+        if permit is None:
+            raise CircuitOpenError("Exchange rate api is unavailable (circuit open).")
+
+        return permit
+
+
+    def record(self, permit: str, succeeded: Optional[bool]) -> None:
+        """Report a call's outcome to the breaker; None means it was interrupted before it had one."""
+
+        if succeeded is True:
+            self.breaker.record_success()
+        elif succeeded is False:
+            self.breaker.record_failure()
+        elif permit == "trial":
+            self.breaker.release_trial()
+
+
+class HttpClient(_RetryPolicy):
+    """
+    Pooled, synchronous http client for the exchange rate tools.
+
+    One keep-alive `requests.Session` is shared by every caller, with
+    connect/read timeouts, retries with exponential backoff and jitter on
+    connection errors, timeouts, 429 and 5xx responses, and a circuit breaker
+    that fails fast while upstream is down. Any other request error counts as
+    a failure without being retried.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+
+    def get(self, url: str) -> requests.Response:
+        """
+        Send a get request.
+
+        Returns:
+            requests.Response: The final response (which may still be an error status).
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            UpstreamError: If upstream could not be reached after every retry.
+        """
+
+        permit = self.check_circuit()
+        succeeded = None
+
+        # the breaker always hears how the call ended, so a trial is never left in flight.
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = self.session.get(url, timeout=(self.connect_timeout, self.read_timeout))
+
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        succeeded = True
+                        return response
+
+                    error = None
+
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    response, error = None, e
+
+                except requests.RequestException as e:
+                    succeeded = False
+                    raise UpstreamError(f"Exchange rate api request failed: {e}") from e
+
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff(attempt))
+
+            succeeded = False
+
+        finally:
+            self.record(permit, succeeded)
+
+        if response is not None:
+            return response
+
+        raise UpstreamError(f"Exchange rate api request failed: {error}") from error
+
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncHttpClient(_RetryPolicy):
+    """
+    Pooled, asynchronous http client for the FastAPI side.
+
+    Same timeouts, retry policy and circuit breaker semantics as `HttpClient`,
+    on top of a keep-alive `httpx.AsyncClient`. The underlying client is
+    created lazily on first use inside the running event loop.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._client: Optional[httpx.AsyncClient] = None
+
+
+    def _get_client(self) -> httpx.AsyncClient:
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+
+        return self._client
+
+
+    async def get(self, url: str) -> httpx.Response:
+        """Async counterpart of `HttpClient.get`."""
+
+        permit = self.check_circuit()
+        succeeded = None
+
+        # cancellation propagates only after the breaker has released the trial.
+        try:
+            client = self._get_client()
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await client.get(url)
+
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        succeeded = True
+                        return response
+
+                    error = None
+
+                except (httpx.TransportError, httpx.TimeoutException) as e:
+                    response, error = None, e
+
+                except httpx.HTTPError as e:
+                    succeeded = False
+                    raise UpstreamError(f"Exchange rate api request failed: {e}") from e
+
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.backoff(attempt))
+
+            succeeded = False
+
+        finally:
+            self.record(permit, succeeded)
+
+        if response is not None:
+            return response
+
+        raise UpstreamError(f"Exchange rate api request failed: {error}") from error
+
+
+    async def aclose(self) -> None:
+
+        client, self._client = self._client, None
+
+        if client is not None:
+            await client.aclose()
+
+
+def _policy_from_env() -> dict:
+    """
+    Read the http client settings from environment variables.
+
+    HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT: seconds (default 3.05 / 10).
+    HTTP_MAX_RETRIES: retries after the first attempt (default 3).
+    HTTP_BACKOFF_BASE / HTTP_BACKOFF_MAX: backoff bounds in seconds (default 0.25 / 4).
+    HTTP_POOL_SIZE: keep-alive connections per client (default 20).
+    CIRCUIT_FAILURE_THRESHOLD / CIRCUIT_RESET_SECONDS: breaker settings (default 5 / 30).
+    """
+
+    return dict(
+        connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),
+        read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "10")),
+        max_retries=int(os.getenv("HTTP_MAX_RETRIES", "3")),
+        backoff_base=float(os.getenv("HTTP_BACKOFF_BASE", "0.25")),
+        backoff_max=float(os.getenv("HTTP_BACKOFF_MAX", "4")),
+        pool_size=int(os.getenv("HTTP_POOL_SIZE", "20")),
+    )
+
+
+# both clients talk to the same upstream, so they share one circuit breaker.
+exchange_rate_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+    reset_seconds=float(os.getenv("CIRCUIT_RESET_SECONDS", "30")),
+)
+
+# shared clients used by the exchange rate api helpers.
+http_client = HttpClient(breaker=exchange_rate_breaker, **_policy_from_env())
+async_http_client = AsyncHttpClient(breaker=exchange_rate_breaker, **_policy_from_env())
@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class SQLiteRateBackend:
+    """
+    Optional cache backend shared by every process that points at the same
+    SQLite file (e.g. all uvicorn workers inside one container).
+
+    Values are stored as json alongside their absolute expiry time. The
+    backend is bounded to `max_entries` rows; the entries closest to expiry
+    are evicted first once the bound is exceeded.
+    """
+
+    def __init__(self, path: str, max_entries: int = 4096):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+        # create the parent directory and the table if they don't exist.
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS rate_cache_expiry ON rate_cache (expires_at)")
+
+
+    def _connection(self) -> sqlite3.Connection:
+
+        # sqlite connections must not be shared across threads, so keep one per thread.
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+        return conn
+
+
+    def get(self, key: str) -> Optional[tuple]:
+        """Return `(value, expires_at)` for a live entry, otherwise None."""
+
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM rate_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return json.loads(row[0]), row[1]
+
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        """Store a value and trim the table back to its size bound."""
+
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO rate_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at),
+        )
+
+        # drop expired rows first, then the soonest-to-expire rows above the bound.
+        conn.execute("DELETE FROM rate_cache WHERE expires_at <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM rate_cache WHERE key IN ("
+            "SELECT key FROM rate_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM rate_cache")
+
+
+class _InFlight:
+    """Book-keeping for a fetch that other threads may be waiting on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class RateCache:
+    """
+    Thread-safe, size-bounded TTL cache for exchange rate api responses.
+
+    Entries live in an in-process LRU map and, when a backend is given, in a
+    store shared across processes. Concurrent misses for the same key are
+    coalesced: only the first caller runs the fetch function while the others
+    wait for its result, so a burst of identical requests costs a single
+    upstream call.
+
+    Fetch functions signal failure by returning None (or raising); failures
+    are handed to every waiting caller but are never cached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 4096,
+        backend: Optional[SQLiteRateBackend] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.backend = backend
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: dict = {}
+        self._lock = threading.Lock()
+
+        # simple counters, useful for checking the hit ratio under load.
+        self.hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+
+
+    def _get_local(self, key: str) -> Optional[tuple]:
+
+        # caller must hold the lock.
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        if entry[1] <= time.time():
+            del self._entries[key]
+            return None
+
+        # mark the entry as most recently used.
+        self._entries.move_to_end(key)
+
+        return entry
+
+
+    def _set_local(self, key: str, value: Any, expires_at: float) -> None:
+
+        # caller must hold the lock.
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        # evict the least recently used entries above the size bound.
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for `key`, or None if it is missing or expired."""
+
+        with self._lock:
+            entry = self._get_local(key)
+
+        if entry is not None:
+            return entry[0]
+
+        if self.backend is not None:
+            entry = self.backend.get(key)
+
+            if entry is not None:
+                with self._lock:
+                    self._set_local(key, entry[0], entry[1])
+                return entry[0]
+
+        return None
+
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store `value` under `key` for `ttl_seconds` (defaults to the cache ttl)."""
+
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+
+        with self._lock:
+            self._set_local(key, value, expires_at)
+
+        if self.backend is not None:
+            self.backend.set(key, value, expires_at)
+
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any], ttl_seconds: Optional[float] = None) -> Any:
+        """
+        Return the cached value for `key`, calling `fetch` on a miss.
+
+        Args:
+            key (str): Cache key.
+            fetch (Callable): Zero-argument function returning the fresh value,
+                or None when the upstream call failed.
+            ttl_seconds (float, optional): Overrides the cache ttl for this entry.
+
+        Returns:
+            The cached or freshly fetched value, or None if the fetch failed.
+        """
+
+        value = self.get(key)
+
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            # re-check under the lock, another thread may have just filled the entry.
+            entry = self._get_local(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+
+            if leader:
+                inflight = _InFlight()
+                self._inflight[key] = inflight
+
+        # followers wait for the leader's result instead of calling upstream.
+        if not leader:
+            inflight.done.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.value
+
+        try:
+            with self._lock:
+                self.upstream_calls += 1
+
+            inflight.value = fetch()
+
+            if inflight.value is not None:
+                self.set(key, inflight.value, ttl_seconds)
+
+            return inflight.value
+
+        except BaseException as e:
+            inflight.error = e
+            raise
+
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.done.set()
+
+
+    def clear(self) -> None:
+        """Drop every cached entry (both in-process and in the shared backend)."""
+
+        with self._lock:
+            self._entries.clear()
+
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def build_rate_cache() -> RateCache:
+    """
+    Build the process-wide rate cache from environment variables.
+
+    RATE_CACHE_TTL_SECONDS: how long a fetched rate stays valid (default 300).
+    RATE_CACHE_MAX_ENTRIES: maximum number of cached entries (default 4096).
+    RATE_CACHE_SQLITE_PATH: optional sqlite file shared across worker processes.
+    """
+
+    ttl_seconds = float(os.getenv("RATE_CACHE_TTL_SECONDS", "300"))
+    max_entries = int(os.getenv("RATE_CACHE_MAX_ENTRIES", "4096"))
+    sqlite_path = os.getenv("RATE_CACHE_SQLITE_PATH")
+
+    backend = SQLiteRateBackend(sqlite_path, max_entries) if sqlite_path else None
+
+    return RateCache(ttl_seconds=ttl_seconds, max_entries=max_entries, backend=backend)
+
+
+# shared cache used by every exchange rate tool in this process.
+rate_cache = build_rate_cache()
@@ -0,0 +1,81 @@
+import time
+import numpy as np
+from typing import Iterable, Optional
+
+
+class RateMatrix:
+    """
+    Dense snapshot of every exchange rate against a single base currency.
+
+    The exchange rate api's `/latest/{BASE}` endpoint returns the value of one
+    unit of BASE in every supported currency. Any pair can be derived from that
+    one table as a cross rate: `1 FROM = rates[TO] / rates[FROM] TO`. Rates are
+    kept in a float64 vector indexed by currency code, so one snapshot answers
+    N×N conversions with vectorized numpy ops instead of N×N api calls.
+    """
+
+    def __init__(self, base: str, rates: dict, fetched_at: Optional[float] = None):
+        self.base = base
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+        # keep a stable code order so the vector index is deterministic.
+        self.codes = sorted(rates)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.rates = np.array([rates[code] for code in self.codes], dtype=np.float64)
+
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.index
+
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+    @property
+    def age(self) -> float:
+        """Seconds elapsed since the snapshot was fetched."""
+        return time.time() - self.fetched_at
+
+
+    def is_fresh(self, max_age_seconds: float) -> bool:
+        return self.age <= max_age_seconds
+
+
+    def indices(self, codes: Iterable[str]) -> np.ndarray:
+        """
+        Map currency codes to their positions in the rate vector.
+
+        Raises:
+            KeyError: If any code is not part of the snapshot.
+        """
+        return np.fromiter((self.index[code] for code in codes), dtype=np.intp)
+
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """Return the value of 1 unit of `from_currency` in `to_currency`."""
+        return float(self.rates[self.index[to_currency]] / self.rates[self.index[from_currency]])
+
+
+    def pair_rates(self, from_currencies: Iterable[str], to_currencies: Iterable[str]) -> np.ndarray:
+        """
+        Return the cross rate for each `(from, to)` pair, element-wise.
+
+        Args:
+            from_currencies (Iterable[str]): Source currency codes.
+            to_currencies (Iterable[str]): Target currency codes, same length as `from_currencies`.
+
+        Returns:
+            np.ndarray: One rate per pair.
+        """
+        return self.rates[self.indices(to_currencies)] / self.rates[self.indices(from_currencies)]
+
+
+    def cross_rates(self, codes: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        Return the full cross-rate matrix for `codes` (all snapshot codes by default).
+
+        Entry `[i, j]` is the value of 1 unit of `codes[i]` in `codes[j]`.
+        """
+        rates = self.rates if codes is None else self.rates[self.indices(codes)]
+        return rates[np.newaxis, :] / rates[:, np.newaxis]
@@ -1,3 +1,4 @@
+from typing import List
 from pydantic import BaseModel, Field
 
 class SupportedCurrenciesInput(BaseModel):
@@ -8,4 +9,19 @@ class SupportedCurrenciesInput(BaseModel):
 class CurrencyConverterInput(BaseModel):
     """"Input schema for CurrencyConverterTool."""
     from_currency: str = Field(..., description="The base or source currency code (e.g., USD, NGN) to convert from.")
-    to_currency: str = Field(..., description="The target currency code (e.g., EUR) to convert to.")
\ No newline at end of file
+    to_currency: str = Field(..., description="The target currency code (e.g., EUR) to convert to.")
+
+class ConversionRequest(BaseModel):
+    """A single amount to convert between two currencies."""
+    amount: float = Field(1.0, description="The amount of the source currency to convert (defaults to 1).")
+    from_currency: str = Field(..., description="The base or source currency code (e.g., USD, NGN) to convert from.")
+    to_currency: str = Field(..., description="The target currency code (e.g., EUR) to convert to.")
+
+
+class BatchCurrencyConverterInput(BaseModel):
+    """Input schema for BatchCurrencyConverterTool."""
+    conversions: List[ConversionRequest] = Field(
+        ...,
+        description="All conversions to perform in one call, e.g. 100 USD to EUR, 100 USD to GBP and 100 USD to NGN.",
+        min_length=1,
+    )
@@ -0,0 +1,105 @@
+import os
+import time
+import asyncio
+import tempfile
+
+# the shared worker built on import must not write into the working directory.
+os.environ.setdefault("JOB_STORE_PATH", os.path.join(tempfile.mkdtemp(), "jobs.db"))
+
+import api.services.job_worker as job_worker_module
+from api.services.job_store import JobStore
+from api.services.job_worker import JobWorker
+from api.services.report_store import ReportStore
+
+
+def test_jobs_are_claimed_once_oldest_first(tmp_path):
+
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first = store.create("first")
+    store.create("second")
+
+    claimed = store.claim_next("a")
+
+    assert claimed["id"] == first["id"]
+    assert claimed["status"] == "running" and claimed["lease_owner"] == "a"
+    assert store.claim_next("b")["query"] == "second"
+    assert store.claim_next("c") is None
+
+
+def test_only_the_lease_owner_can_finish_a_job(tmp_path):
+
+    store = JobStore(str(tmp_path / "jobs.db"), lease_seconds=0.05)
+    job = store.create("q")
+
+    store.claim_next("a")
+    time.sleep(0.1)
+
+    # the lease expired, so another worker takes the job over.
+    assert store.claim_next("b")["id"] == job["id"]
+
+    assert not store.complete(job["id"], "a", "stale result")
+    assert not store.fail(job["id"], "a", "stale error")
+    assert store.complete(job["id"], "b", "result", report_id="r1")
+
+    done = store.get(job["id"])
+    assert (done["status"], done["result"], done["report_id"], done["attempts"]) == ("succeeded", "result", "r1", 2)
+
+
+def test_jobs_interrupted_too_often_are_failed(tmp_path):
+
+    store = JobStore(str(tmp_path / "jobs.db"), lease_seconds=0.01, max_attempts=2)
+    job = store.create("q")
+
+    for owner in ("a", "b"):
+        assert store.claim_next(owner) is not None
+        time.sleep(0.02)
+
+    assert store.claim_next("c") is None
+    assert store.get(job["id"])["status"] == "failed"
+
+
+def test_released_jobs_are_queued_without_using_an_attempt(tmp_path):
+
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = store.create("q")
+    store.claim_next("a")
+
+    assert not store.release(job["id"], "b")
+    assert store.release(job["id"], "a")
+
+    released = store.get(job["id"])
+    assert (released["status"], released["attempts"], released["lease_owner"]) == ("queued", 0, None)
+
+
+def test_worker_runs_jobs_and_stores_reports(tmp_path, monkeypatch):
+
+    async def analyze(query):
+        return f"report for {query}"
+
+    monkeypatch.setattr(job_worker_module, "analyze_query", analyze)
+
+    store = JobStore(str(tmp_path / "jobs.db"))
+    reports = ReportStore()
+
+    async def run():
+        # a long poll interval: the job only runs quickly if notify() wakes a consumer.
+        worker = JobWorker(store, concurrency=1, poll_seconds=30, reports=reports)
+        worker.start()
+        await asyncio.sleep(0.05)
+
+        # submissions come from threadpool threads, off the worker's loop.
+        job = await asyncio.to_thread(store.create, "q")
+        await asyncio.to_thread(worker.notify)
+
+        for _ in range(100):
+            if store.get(job["id"])["status"] == "succeeded":
+                break
+            await asyncio.sleep(0.02)
+
+        await worker.stop()
+        return store.get(job["id"])
+
+    job = asyncio.run(run())
+
+    assert job["status"] == "succeeded"
+    assert reports.get(job["report_id"])["content"] == "report for q"
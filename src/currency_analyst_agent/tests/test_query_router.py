@@ -0,0 +1,68 @@
+import pytest
+from currency_analyst_crew.query_router import parse_simple_query
+
+
+SUPPORTED = [
+    "USD", "EUR", "GBP", "NGN", "JPY", "CAD", "KID", "BAM", "IMP", "NAD", "ALL", "TRY",
+]
+
+
+@pytest.mark.parametrize("query, amount, from_currency, to_currencies", [
+    ("convert 100 USD to EUR", 100.0, "USD", ["EUR"]),
+    ("what is 1,500.50 USD in EUR", 1500.5, "USD", ["EUR"]),
+    ("USD to EUR rate", None, "USD", ["EUR"]),
+    ("convert 2 million naira to dollars", 2_000_000.0, "NGN", ["USD"]),
+    ("how much is 5k euros in yen", 5000.0, "EUR", ["JPY"]),
+    ("convert 2020 USD to EUR", 2020.0, "USD", ["EUR"]),
+    ("convert 100 usd to eur for my kid", 100.0, "USD", ["EUR"]),
+    ("convert 50 usd to eur, gbp and cad", 50.0, "USD", ["EUR", "GBP", "CAD"]),
+    ("usd to cad", None, "USD", ["CAD"]),
+    ("how many naira to a dollar", None, "USD", ["NGN"]),
+    ("how many yen is 100 dollars", 100.0, "USD", ["JPY"]),
+    ("how much EUR do I get for 100 USD", 100.0, "USD", ["EUR"]),
+    ("what is the current exchange rate between USA currency and Germany currency", None, "USD", ["EUR"]),
+])
+def test_simple_lookups(query, amount, from_currency, to_currencies):
+
+    parsed = parse_simple_query(query, SUPPORTED)
+
+    assert parsed is not None and parsed.intent == "rate"
+    assert parsed.amount == amount
+    assert parsed.from_currency == from_currency
+    assert parsed.to_currencies == to_currencies
+
+
+@pytest.mark.parametrize("query", [
+    "what was the USD to EUR rate in 2020",
+    "rate of USD to EUR on 2024-01-01",
+    "USD to EUR in 5 years",
+    "USD to EUR yesterday",
+    "what was 100 USD in EUR last week",
+    "USD to GBP rate 3 months ago",
+    "USD to EUR on 01/02/2024",
+    "why is the naira weak against the dollar",
+])
+def test_temporal_and_open_ended_queries_go_to_the_crew(query):
+    assert parse_simple_query(query, SUPPORTED) is None
+
+
+def test_lowercase_words_are_not_codes_outside_currency_positions():
+
+    parsed = parse_simple_query("convert 100 usd to eur for my kid and imp", SUPPORTED)
+
+    assert parsed.to_currencies == ["EUR"]
+
+
+def test_numbers_away_from_currencies_are_not_amounts():
+
+    parsed = parse_simple_query("give me 3 quotes for USD to EUR", SUPPORTED)
+
+    assert parsed.amount is None
+
+
+@pytest.mark.parametrize("query", [
+    "how much EUR do I get for my USD",
+    "convert USD 100 EUR",
+])
+def test_queries_without_a_clear_direction_go_to_the_crew(query):
+    assert parse_simple_query(query, SUPPORTED) is None
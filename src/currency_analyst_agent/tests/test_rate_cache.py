@@ -0,0 +1,95 @@
+import time
+import threading
+import pytest
+from currency_analyst_crew.tools.rate_cache import RateCache, SQLiteRateBackend
+
+
+def test_entries_expire_after_their_ttl():
+
+    cache = RateCache(ttl_seconds=60)
+    cache.set("USD", {"EUR": 0.9}, ttl_seconds=0.05)
+
+    assert cache.get("USD") == {"EUR": 0.9}
+
+    time.sleep(0.1)
+
+    assert cache.get("USD") is None
+
+
+def test_least_recently_used_entries_are_evicted():
+
+    cache = RateCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # reading "a" makes "b" the least recently used entry.
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_concurrent_misses_share_one_upstream_call():
+
+    cache = RateCache()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"EUR": 0.9}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("USD", fetch))) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    time.sleep(0.1)
+    release.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"EUR": 0.9}] * 8
+    assert cache.upstream_calls == 1
+
+
+def test_failed_fetches_are_not_cached():
+
+    cache = RateCache()
+
+    assert cache.get_or_fetch("USD", lambda: None) is None
+    assert cache.get_or_fetch("USD", lambda: {"EUR": 0.9}) == {"EUR": 0.9}
+
+    def broken():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("GBP", broken)
+
+    assert cache.get("GBP") is None
+
+
+def test_sqlite_backend_is_shared_and_bounded(tmp_path):
+
+    path = str(tmp_path / "rates.db")
+
+    first = RateCache(backend=SQLiteRateBackend(path, max_entries=2))
+    second = RateCache(backend=SQLiteRateBackend(path, max_entries=2))
+
+    first.set("USD", {"EUR": 0.9})
+
+    # another process (here: another cache) reads the entry from the shared file.
+    assert second.get("USD") == {"EUR": 0.9}
+
+    first.set("EUR", {"USD": 1.1}, ttl_seconds=600)
+    first.set("GBP", {"USD": 1.3}, ttl_seconds=900)
+
+    # the entry closest to expiry is evicted from the file once the bound is exceeded.
+    assert second.backend.get("USD") is None
+    assert second.backend.get("GBP") is not None
@@ -0,0 +1,71 @@
+import os
+import time
+import pytest
+from api.services.report_store import ReportStore, ReportTooLarge
+
+
+def test_reports_are_content_addressed():
+
+    store = ReportStore()
+
+    first = store.put("# USD to EUR\n0.92")
+    second = store.put("# USD to EUR\n0.92")
+    other = store.put("# USD to GBP\n0.79")
+
+    assert first == second != other
+    assert store.get(first)["content"] == "# USD to EUR\n0.92"
+    assert store.get("0" * 32) is None
+
+
+def test_oldest_reports_are_evicted_by_count_and_size():
+
+    store = ReportStore(max_reports=2, max_bytes=100, max_report_bytes=60)
+
+    a, b, c = store.put("a" * 10), store.put("b" * 10), store.put("c" * 10)
+
+    assert store.get(a) is None
+    assert store.get(b) and store.get(c)
+
+    # 60 more bytes push the total over 100, so the older reports go.
+    d = store.put("d" * 60)
+
+    assert store.get(b) is None
+    assert store.get(d)
+
+
+def test_expired_reports_are_dropped():
+
+    store = ReportStore(retention_seconds=0.05)
+    report_id = store.put("report")
+
+    time.sleep(0.1)
+
+    assert store.get(report_id) is None
+
+
+def test_oversize_reports_are_rejected(tmp_path):
+
+    store = ReportStore(max_report_bytes=10, directory=str(tmp_path))
+
+    with pytest.raises(ReportTooLarge):
+        store.put("x" * 11)
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_reports_outlive_the_process_on_disk(tmp_path):
+
+    report_id = ReportStore(directory=str(tmp_path)).put("persisted")
+
+    assert ReportStore(directory=str(tmp_path)).get(report_id)["content"] == "persisted"
+    assert ReportStore(directory=str(tmp_path)).get("../../etc/passwd") is None
+
+
+def test_report_directory_is_bounded_by_size(tmp_path):
+
+    store = ReportStore(max_bytes=1000, max_report_bytes=300, directory=str(tmp_path))
+
+    for i in range(20):
+        store.put(f"{i:03d}" + "x" * 247)
+
+    assert sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)) <= 1000
@@ -0,0 +1,86 @@
+# local stand-in for exchangerate-api, used to exercise the http client layer
+# (timeouts, retries, circuit breaker) without network access or api quota.
+#
+# usage:
+#   python utils/stub_exchange_rate_api.py --port 8089 --fail-rate 0.2 --latency 0.05
+#   export EXCHANGE_RATE_API_BASE_URL=http://127.0.0.1:8089/v6
+
+import json
+import time
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# value of 1 USD in each currency; every other base is derived from it.
+USD_RATES = {
+    "USD": 1.0, "EUR": 0.92, "GBP": 0.79, "NGN": 1550.0, "JPY": 151.2,
+    "CNY": 7.23, "MXN": 17.1, "CAD": 1.36, "INR": 83.4, "ZAR": 18.6,
+}
+
+CURRENCY_NAMES = {
+    "USD": "United States Dollar", "EUR": "Euro", "GBP": "Pound Sterling", "NGN": "Nigerian Naira",
+    "JPY": "Japanese Yen", "CNY": "Chinese Renminbi", "MXN": "Mexican Peso", "CAD": "Canadian Dollar",
+    "INR": "Indian Rupee", "ZAR": "South African Rand",
+}
+
+
+def make_handler(fail_rate: float, latency: float):
+
+    class StubHandler(BaseHTTPRequestHandler):
+
+        def _send(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+        def do_GET(self):
+            time.sleep(latency)
+
+            # simulate an unhealthy upstream.
+            if random.random() < fail_rate:
+                return self._send(503, {"result": "error", "error-type": "service-unavailable"})
+
+            # paths look like /v6/{key}/codes, /v6/{key}/latest/{base} or /v6/{key}/pair/{from}/{to}.
+            parts = self.path.strip("/").split("/")[2:]
+
+            if parts == ["codes"]:
+                codes = [[code, CURRENCY_NAMES[code]] for code in USD_RATES]
+                return self._send(200, {"result": "success", "supported_codes": codes})
+
+            if len(parts) == 2 and parts[0] == "latest" and parts[1] in USD_RATES:
+                base = USD_RATES[parts[1]]
+                rates = {code: rate / base for code, rate in USD_RATES.items()}
+                return self._send(200, {"result": "success", "base_code": parts[1], "conversion_rates": rates})
+
+            if len(parts) == 3 and parts[0] == "pair" and parts[1] in USD_RATES and parts[2] in USD_RATES:
+                rate = USD_RATES[parts[2]] / USD_RATES[parts[1]]
+                return self._send(
+                    200,
+                    {"result": "success", "base_code": parts[1], "target_code": parts[2], "conversion_rate": rate},
+                )
+
+            return self._send(404, {"result": "error", "error-type": "unsupported-code"})
+
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Local stub for the exchange rate api.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before every response.")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.fail_rate, args.latency))
+    print(f"stub exchange rate api on http://127.0.0.1:{args.port}/v6")
+    server.serve_forever()
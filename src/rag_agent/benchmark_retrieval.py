@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+# load test for the local retrieval backend, optionally compared with chroma.
+#
+# usage:
+#   python benchmark_retrieval.py --chunks 1000000 --index brute
+#   python benchmark_retrieval.py --chunks 100000 --index hnsw --chroma
+
+
+# import all the necessary libraries, modules or packages.
+import os
+import time
+import shutil
+import argparse
+import numpy as np
+from local_backend import HashingEmbeddings, NumpyVectorStore
+
+
+def synthetic_chunks(count: int, words_per_chunk: int = 60, vocabulary_size: int = 20_000, seed: int = 0):
+    """
+    Generate reproducible chunk texts with a zipf-like word distribution.
+
+    Args:
+        count (int): Number of chunks.
+        words_per_chunk (int): Words in each chunk (about 400 characters, like chunk_data's chunks).
+        vocabulary_size (int): Number of distinct words.
+        seed (int): Random seed.
+
+    Yields:
+        str: One chunk text at a time.
+    """
+
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"w{i}" for i in range(vocabulary_size)])
+
+    weights = 1.0 / np.arange(1, vocabulary_size + 1)
+    weights /= weights.sum()
+
+    for _ in range(count):
+        yield " ".join(rng.choice(vocabulary, size=words_per_chunk, p=weights))
+
+
+def load(store, embeddings, count: int, batch_size: int) -> dict:
+    """Embed and add `count` synthetic chunks to a store, in batches."""
+
+    texts, embed_seconds, add_seconds = [], 0.0, 0.0
+
+    def flush():
+        nonlocal embed_seconds, add_seconds
+
+        start = time.perf_counter()
+        vectors = embeddings.embed_documents(texts)
+        embed_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        if isinstance(store, NumpyVectorStore):
+            store.add_embeddings(texts, vectors, metadatas=[{"source": "synthetic"}] * len(texts))
+        else:
+            store.add_texts(texts, metadatas=[{"source": "synthetic"}] * len(texts))
+        add_seconds += time.perf_counter() - start
+
+        texts.clear()
+
+    for text in synthetic_chunks(count):
+        texts.append(text)
+
+        if len(texts) == batch_size:
+            flush()
+
+    if texts:
+        flush()
+
+    return {
+        "embed_seconds": round(embed_seconds, 1),
+        "add_seconds": round(add_seconds, 1),
+        "chunks_per_second": round(count / (embed_seconds + add_seconds), 1),
+    }
+
+
+def query(store, embeddings, queries: int, k: int) -> dict:
+    """Time `queries` searches (query embedding excluded) and report latency percentiles."""
+
+    vectors = embeddings.embed_documents(list(synthetic_chunks(queries, words_per_chunk=8, seed=1)))
+    latencies = []
+
+    for vector in vectors:
+        start = time.perf_counter()
+        store.similarity_search_by_vector(vector, k=k)
+        latencies.append(time.perf_counter() - start)
+
+    latencies = np.array(latencies) * 1000
+
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "mean_ms": round(float(latencies.mean()), 2),
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Load test the local retrieval backend.")
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--index", choices=["brute", "hnsw"], default="brute")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--directory", default="./retrieval_benchmark")
+    parser.add_argument("--chroma", action="store_true", help="Also load and query chroma with the same embeddings.")
+    args = parser.parse_args()
+
+    shutil.rmtree(args.directory, ignore_errors=True)
+    embeddings = HashingEmbeddings()
+
+    store = NumpyVectorStore(os.path.join(args.directory, "local"), embeddings, index=args.index)
+    print(f"local ({args.index}) load:  {load(store, embeddings, args.chunks, args.batch_size)}")
+    store.persist()
+
+    start = time.perf_counter()
+    store = NumpyVectorStore(os.path.join(args.directory, "local"), embeddings, index=args.index)
+    print(f"local ({args.index}) reopen: {time.perf_counter() - start:.2f}s")
+    print(f"local ({args.index}) query: {query(store, embeddings, args.queries, args.k)}")
+
+    if args.chroma:
+        from langchain_chroma import Chroma
+
+        chroma = Chroma(
+            collection_name="benchmark",
+            embedding_function=embeddings,
+            persist_directory=os.path.join(args.directory, "chroma"),
+        )
+
+        # chroma caps the number of records per add call.
+        print(f"chroma load:  {load(chroma, embeddings, args.chunks, min(args.batch_size, 5000))}")
+        print(f"chroma query: {query(chroma, embeddings, args.queries, args.k)}")
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import threading
+from collections import deque
+from typing import Callable, List, Optional
+import numpy as np
+from langchain_core.documents import Document
+from retrieval import estimate_tokens, dedupe_overlaps
+
+
+def _stitch(passage: dict, text: str, start: int) -> None:
+    """Stitch text at offset `start` into a passage on their offsets, so the shared overlap appears once."""
+
+    merged, first = passage["text"], passage["start"]
+    end = start + len(text)
+
+    if start < first:
+        merged = text[:first - start] + merged
+        first = start
+    if end > first + len(merged):
+        merged = merged + text[first + len(merged) - start:]
+
+    passage.update(text=merged, start=first, end=first + len(merged))
+
+
+def merge_adjacent(documents: List[Document]) -> tuple:
+    """
+    Merge chunks that overlap or touch on the same page into one passage.
+
+    Chunks need the "start_index" metadata chunk_data records; others are
+    passed through. A merged passage takes the rank of its best chunk.
+
+    Args:
+        documents (List[Document]): Chunks in rank order.
+
+    Returns:
+        tuple: The passages in rank order, and the number of chunks merged away.
+    """
+
+    passages: List[dict] = []
+    merged = 0
+
+    for document in documents:
+        metadata = document.metadata
+        start = metadata.get("start_index")
+
+        if start is None:
+            passages.append({"document": document})
+            continue
+
+        end = start + len(document.page_content)
+        key = (metadata.get("source"), metadata.get("page"))
+
+        for passage in passages:
+            if passage.get("key") != key or start > passage["end"] or end < passage["start"]:
+                continue
+
+            _stitch(passage, document.page_content, start)
+            merged += 1
+
+            # the grown passage may now bridge the gap to a lower ranked passage of the same page.
+            for other in passages[passages.index(passage) + 1:]:
+                if other.get("key") == key and other["start"] <= passage["end"] and other["end"] >= passage["start"]:
+                    _stitch(passage, other["text"], other["start"])
+                    passages.remove(other)
+                    merged += 1
+
+            break
+
+        else:
+            passages.append({"document": document, "key": key, "text": document.page_content, "start": start, "end": end})
+
+    result = []
+
+    for passage in passages:
+        document = passage["document"]
+
+        if "text" in passage and passage["text"] != document.page_content:
+            # a chunk stitched in front moves the passage start, so its offset moves with it.
+            metadata = {**document.metadata, "start_index": passage["start"]}
+            document = Document(id=document.id, page_content=passage["text"], metadata=metadata)
+
+        result.append(document)
+
+    return result, merged
+
+
+class ContextPacker:
+    """
+    Builds the dynamic system prompt from retrieved chunks within a token budget.
+
+    The static instructions and their token count are computed once. On each
+    turn the chunks are ordered by score, overlapping chunks of the same page
+    are merged, and passages are added best first until `max_context_tokens`
+    is reached, the last one trimmed to fit. With `max_context_tokens` set to
+    None the packer keeps every passage, for chunks a retriever has already
+    fitted into its own token budget. Every turn's token counts are
+    kept (the last `history_size` turns) for tuning chunk_data's chunk_size and
+    chunk_overlap against real prompt sizes.
+    """
+
+    def __init__(
+        self,
+        static_prompt: str,
+        max_context_tokens: Optional[int] = 1500,
+        min_trimmed_tokens: int = 50,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+        separator: str = "\n\n",
+        history_size: int = 1000,
+    ):
+        """
+        Args:
+            static_prompt (str): Instructions placed before the retrieved context.
+            max_context_tokens (int): Token budget for the retrieved context (None for no budget of its own).
+            min_trimmed_tokens (int): Smallest useful piece of a trimmed passage; shorter remainders are dropped.
+            count_tokens (Callable): Token counter (defaults to a four-characters-per-token estimate).
+            separator (str): Text between passages.
+            history_size (int): Number of per-turn reports kept.
+        """
+
+        self.static_prompt = static_prompt
+        self.max_context_tokens = max_context_tokens
+        self.min_trimmed_tokens = min_trimmed_tokens
+        self.count_tokens = count_tokens
+        self.separator = separator
+
+        self.static_tokens = count_tokens(static_prompt)
+
+        self._reports = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+
+    def _trim(self, text: str, tokens: int) -> str:
+        """Cut text to about `tokens` tokens, at a word boundary."""
+
+        cut = text[:max(1, len(text) * tokens // max(self.count_tokens(text), 1))]
+
+        if " " in cut:
+            cut = cut[:cut.rindex(" ")]
+
+        return cut.rstrip() + " ..."
+
+
+    def pack(self, documents: List[Document], scores: Optional[List[float]] = None, history_tokens: int = 0) -> tuple:
+        """
+        Build the system prompt for one turn.
+
+        Args:
+            documents (List[Document]): Retrieved chunks, in rank order unless `scores` is given.
+            scores (List[float]): Optional relevance scores (higher is better) to order the chunks by.
+            history_tokens (int): Tokens in the conversation messages sent along, for the report.
+
+        Returns:
+            tuple: The system prompt, and the turn's report (token counts and chunk counts).
+        """
+
+        if scores is not None:
+            order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")
+            documents = [documents[i] for i in order]
+
+        passages, merged = merge_adjacent(documents)
+        passages = dedupe_overlaps(passages)
+
+        parts, context_tokens, trimmed = [], 0, 0
+        separator_tokens = self.count_tokens(self.separator)
+
+        for passage in passages:
+            text = passage.page_content.strip()
+            tokens = self.count_tokens(text) + (separator_tokens if parts else 0)
+
+            if self.max_context_tokens is None:
+                parts.append(text)
+                context_tokens += tokens
+                continue
+
+            remaining = self.max_context_tokens - context_tokens
+
+            if tokens > remaining:
+                if remaining < self.min_trimmed_tokens:
+                    break
+
+                text = self._trim(text, remaining - separator_tokens)
+                tokens = self.count_tokens(text) + (separator_tokens if parts else 0)
+                trimmed += 1
+
+            parts.append(text)
+            context_tokens += tokens
+
+        report = {
+            "static_tokens": self.static_tokens,
+            "context_tokens": context_tokens,
+            "history_tokens": history_tokens,
+            "prompt_tokens": self.static_tokens + context_tokens + history_tokens,
+            "chunks_retrieved": len(documents),
+            "chunks_merged": merged,
+            "passages_used": len(parts),
+            "passages_trimmed": trimmed,
+        }
+
+        with self._lock:
+            self._reports.append(report)
+
+        return self.static_prompt + self.separator.join(parts), report
+
+
+    def reports(self) -> list:
+        """Return the kept per-turn reports, oldest first."""
+
+        with self._lock:
+            return list(self._reports)
+
+
+    def summary(self) -> dict:
+        """Return the number of turns and the mean and 95th percentile of each token count."""
+
+        reports = self.reports()
+
+        if not reports:
+            return {"turns": 0}
+
+        summary = {"turns": len(reports)}
+
+        for key in ("context_tokens", "history_tokens", "prompt_tokens"):
+            values = np.array([report[key] for report in reports])
+            summary[f"{key}_mean"] = round(float(values.mean()), 1)
+            summary[f"{key}_p95"] = round(float(np.percentile(values, 95)), 1)
+
+        return summary
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import os
+import glob
+import logging
+import queue as queue_module
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader, TextLoader
+
+
+logger = logging.getLogger(__name__)
+
+# document formats the loaders below can parse.
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+def get_loader(file_path: str):
+    """
+    Select the LangChain loader for a document file based on its extension.
+
+    Args:
+        file_path (str): Path to the document file.
+
+    Returns:
+        BaseLoader | None: The loader, or None for unsupported file formats.
+    """
+
+    # extract file extension.
+    _, extension = os.path.splitext(file_path)
+    extension = extension.lower()
+
+    # select the appropriate document loader.
+    if extension == ".pdf":
+        return PyPDFLoader(file_path)
+
+    elif extension == ".docx":
+        return Docx2txtLoader(file_path)
+
+    elif extension == ".txt":
+        return TextLoader(file_path)
+
+    return None
+
+
+def load_document(file_path: str):
+    """
+    Load a document file and return it as a LangChain Document object.
+
+    This function supports PDF, DOCX, and TXT files. The appropriate
+    LangChain loader is selected based on the file extension.
+
+    Args:
+        file_path (str): Path to the document file.
+
+    Returns:
+        list | None: A list of LangChain Document objects if successful,
+        otherwise None for unsupported file formats.
+    """
+
+    loader = get_loader(file_path)
+
+    if loader is None:
+        logger.warning("unsupported document format: %s", file_path)
+        return None
+
+    # load and return the document content.
+    return loader.load()
+
+
+def find_documents(paths) -> list:
+    """
+    Expand files, directories and glob patterns into the supported document files they contain.
+
+    Args:
+        paths (str | list[str]): A file, a directory (searched recursively), a glob pattern, or a list of these.
+
+    Returns:
+        list: Sorted, de-duplicated paths of PDF, DOCX and TXT files.
+    """
+
+    if isinstance(paths, str):
+        paths = [paths]
+
+    found = set()
+
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.glob(os.path.join(path, "**", "*"), recursive=True)
+        elif glob.has_magic(path):
+            matches = glob.glob(path, recursive=True)
+        else:
+            matches = [path]
+
+        found.update(
+            match for match in matches
+            if os.path.isfile(match) and match.lower().endswith(SUPPORTED_EXTENSIONS)
+        )
+
+    return sorted(found)
+
+
+def _parse_file(file_path: str, queue) -> None:
+    """Parse one file in a worker process, putting its pages on the shared queue as they are read."""
+
+    try:
+        loader = get_loader(file_path)
+
+        if loader is None:
+            raise ValueError("Unsupported document format.")
+
+        # lazy_load yields pdfs page by page, so a large file never has to be held whole.
+        for page in loader.lazy_load():
+            queue.put(("page", file_path, page))
+
+        queue.put(("done", file_path, None))
+
+    except Exception as e:
+        queue.put(("error", file_path, f"{type(e).__name__}: {e}"))
+
+
+def stream_pages(paths, max_workers: int = None, queue_depth: int = 64, poll_seconds: float = 1.0):
+    """
+    Parse documents in a process pool and yield their pages as they are read.
+
+    Workers put pages on a queue holding at most `queue_depth` pages and block
+    when it is full, so memory is bounded by the queue depth and not by the
+    size of the corpus, and the caller can chunk and embed while parsing goes on.
+    A parser process that dies without reporting (killed, out of memory,
+    crashed) is detected through its future and reported as an error, so a
+    dead worker never leaves the caller waiting.
+
+    Args:
+        paths (str | list[str]): Files, directories or glob patterns (see `find_documents`).
+        max_workers (int): Number of parser processes (defaults to the number of CPUs).
+        queue_depth (int): Maximum number of parsed pages waiting to be consumed.
+        poll_seconds (float): How long to wait for a page before checking the workers.
+
+    Yields:
+        tuple: `("page", file_path, Document)` for each page, then `("done", file_path, None)`
+        once a file is fully read, or `("error", file_path, message)` if it could not be parsed.
+    """
+
+    files = find_documents(paths)
+
+    if not files:
+        return
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(files))
+
+    manager = multiprocessing.Manager()
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+
+    queue = manager.Queue(maxsize=queue_depth)
+    futures = {file_path: pool.submit(_parse_file, file_path, queue) for file_path in files}
+
+    try:
+        finished = set()
+
+        while len(finished) < len(files):
+            try:
+                event = queue.get(timeout=poll_seconds)
+
+            except queue_module.Empty:
+                # the queue is drained, so a failed future means its worker died before reporting.
+                for file_path, future in futures.items():
+                    if file_path not in finished and future.done() and future.exception() is not None:
+                        finished.add(file_path)
+                        yield ("error", file_path, f"{type(future.exception()).__name__}: {future.exception()}")
+
+                continue
+
+            # ignore anything a file sends after it was reported as failed.
+            if event[1] in finished:
+                continue
+
+            if event[0] != "page":
+                finished.add(event[1])
+
+            yield event
+
+    finally:
+        # if the caller stops early, drop the files not started yet and drain the queue
+        # so that workers blocked on it can finish the file they are on.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        while not all(future.done() for future in futures.values()):
+            try:
+                queue.get(timeout=0.1)
+            except queue_module.Empty:
+                pass
+
+        pool.shutdown(wait=True)
+        manager.shutdown()
+
+
+def stream_documents(paths, max_workers: int = None, queue_depth: int = 64):
+    """
+    Parse documents in a process pool and yield their pages as LangChain Documents.
+
+    Files that cannot be parsed are reported and skipped.
+
+    Args:
+        paths (str | list[str]): Files, directories or glob patterns (see `find_documents`).
+        max_workers (int): Number of parser processes (defaults to the number of CPUs).
+        queue_depth (int): Maximum number of parsed pages waiting to be consumed.
+
+    Yields:
+        Document: One page (or whole DOCX/TXT file) at a time.
+    """
+
+    for event, file_path, payload in stream_pages(paths, max_workers, queue_depth):
+        if event == "page":
+            yield payload
+
+        elif event == "error":
+            logger.warning("could not load %s: %s", file_path, payload)
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class EmbeddingCache:
+    """
+    Persistent, size-capped store of embedding vectors.
+
+    Vectors live in one memory-mapped float32 file of `max_entries` rows, so
+    reading a cached vector is a slice of the page cache rather than a parse.
+    A small SQLite index file maps each key to its row and last-use time; the
+    least recently used entry is overwritten once the file is full.
+
+    The cache is safe to share between threads, but only one process should
+    write to a given directory at a time.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 50_000):
+        """
+        Args:
+            directory (str): Directory holding the index and vector files (created if missing).
+            max_entries (int): Maximum number of vectors kept; the vector file is sized for this many rows.
+        """
+
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self._dim: Optional[int] = None
+
+        # key -> row in the vector file, least recently used first.
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._free: List[int] = []
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+        self._load()
+
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, "vectors.f32")
+
+
+    def _load(self) -> None:
+
+        meta = dict(self._conn.execute("SELECT name, value FROM meta"))
+
+        # a different capacity means a differently shaped file, so start over.
+        if not meta or int(meta["max_entries"]) != self.max_entries or not os.path.exists(self._vectors_path):
+            self._reset()
+            return
+
+        self._dim = int(meta["dim"])
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(self.max_entries, self._dim))
+
+        for key, slot in self._conn.execute("SELECT key, slot FROM entries ORDER BY last_used"):
+            self._slots[key] = slot
+
+        used = set(self._slots.values())
+        self._free = [slot for slot in range(self.max_entries - 1, -1, -1) if slot not in used]
+
+
+    def _reset(self) -> None:
+
+        self._conn.execute("DELETE FROM meta")
+        self._conn.execute("DELETE FROM entries")
+        self._conn.commit()
+
+        if os.path.exists(self._vectors_path):
+            os.remove(self._vectors_path)
+
+        self._vectors = None
+        self._dim = None
+        self._slots.clear()
+        self._free = list(range(self.max_entries - 1, -1, -1))
+
+
+    def _create_vectors(self, dim: int) -> None:
+
+        # the file is sparse until rows are written, so the full size is not paid up front.
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="w+", shape=(self.max_entries, dim))
+        self._dim = dim
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+            [("dim", str(dim)), ("max_entries", str(self.max_entries))],
+        )
+        self._conn.commit()
+
+
+    def get_many(self, keys: List[str]) -> dict:
+        """
+        Look up cached vectors.
+
+        Args:
+            keys (List[str]): Cache keys.
+
+        Returns:
+            dict: Mapping of each cached key to its vector (a list of floats); missing keys are left out.
+        """
+
+        found = {}
+        now = time.time()
+
+        with self._lock:
+            for key in keys:
+                slot = self._slots.get(key)
+
+                if slot is None:
+                    self.misses += 1
+                    continue
+
+                self._slots.move_to_end(key)
+                found[key] = self._vectors[slot].tolist()
+                self.hits += 1
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+        return found
+
+
+    def put_many(self, items: dict) -> None:
+        """
+        Store vectors, evicting the least recently used entries when full.
+
+        Args:
+            items (dict): Mapping of cache key to vector.
+        """
+
+        if not items:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            if self._vectors is None:
+                self._create_vectors(len(next(iter(items.values()))))
+
+            # rows to write, by key: an entry evicted later in the same batch must not be written.
+            rows = {}
+
+            for key, vector in items.items():
+                # vectors of another width (e.g. a different model) cannot share the file.
+                if len(vector) != self._dim:
+                    continue
+
+                slot = self._slots.pop(key, None)
+
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                    else:
+                        evicted, slot = self._slots.popitem(last=False)
+                        self._conn.execute("DELETE FROM entries WHERE key = ?", (evicted,))
+                        rows.pop(evicted, None)
+
+                self._vectors[slot] = vector
+                self._slots[key] = slot
+                rows[key] = (key, slot, now)
+
+            # flush the vectors before the index points at them.
+            self._vectors.flush()
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, slot, last_used) VALUES (?, ?, ?)", rows.values()
+            )
+            self._conn.commit()
+
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+    def close(self) -> None:
+
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain `Embeddings` wrapper that serves repeated texts from an `EmbeddingCache`.
+
+    Pass it anywhere an embedding model is expected (e.g. as a vector store's
+    `embedding_function`) so that both `add_documents` and `similarity_search`
+    only call the wrapped model for texts it has not embedded before.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, namespace: Optional[str] = None):
+        """
+        Args:
+            embeddings (Embeddings): The embedding model to wrap.
+            cache (EmbeddingCache): Where vectors are kept.
+            namespace (str): Identifies the model in cache keys; defaults to the wrapped model's name.
+        """
+
+        self.embeddings = embeddings
+        self.cache = cache
+        self.namespace = namespace or getattr(embeddings, "model", None) or type(embeddings).__name__
+
+
+    def _key(self, kind: str, text: str) -> str:
+
+        # documents and queries are embedded differently by some models (e.g. cohere's input_type).
+        return hashlib.sha256(f"{self.namespace}\x00{kind}\x00{text}".encode("utf-8")).hexdigest()
+
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, calling the wrapped model only for texts not in the cache.
+
+        Args:
+            texts (List[str]): Texts to embed.
+
+        Returns:
+            List[List[float]]: One vector per text, in order.
+        """
+
+        keys = [self._key("document", text) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        # embed each missing text once, even if it appears several times.
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), embedded))
+
+            self.cache.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        return [vectors[key] for key in keys]
+
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, calling the wrapped model only on a cache miss.
+
+        Args:
+            text (str): Query text.
+
+        Returns:
+            List[float]: The query vector.
+        """
+
+        key = self._key("query", text)
+        cached = self.cache.get_many([key])
+
+        if key in cached:
+            return cached[key]
+
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many({key: vector})
+
+        return vector
@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import time
+import random
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from document_loader import find_documents, stream_pages
+
+
+logger = logging.getLogger(__name__)
+
+def chunk_data(data, chunk_size=400, chunk_overlap=20):
+    """
+    Split documents into overlapping text chunks.
+
+    Args:
+        data: A list of documents to be split.
+        chunk_size (int): Maximum number of characters per chunk.
+        chunk_overlap (int): Number of overlapping characters between chunks.
+
+    Returns:
+        list: A list of chunked documents.
+    """
+
+    # initialize the text splitter with specified chunk size and overlap. each chunk records
+    # its offset in the page ("start_index") so overlapping chunks can be merged at prompt time.
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True)
+
+    # split the input documents into overlapping text chunks.
+    chunked_data = text_splitter.split_documents(data)
+
+    return chunked_data
+
+
+def file_fingerprint(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    Compute a content hash of a file.
+
+    Args:
+        file_path (str): Path to the file.
+        block_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: Hex sha256 digest of the file content.
+    """
+
+    digest = hashlib.sha256()
+
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def chunk_id(chunk) -> str:
+    """
+    Build a stable id for a chunk from its source and content.
+
+    The same chunk always gets the same id, so re-ingesting it is a no-op,
+    while a chunk whose text changed gets a new id.
+
+    Args:
+        chunk: A LangChain Document.
+
+    Returns:
+        str: Hex sha256 digest identifying the chunk.
+    """
+
+    source = str(chunk.metadata.get("source", ""))
+    return hashlib.sha256(f"{source}\x00{chunk.page_content}".encode("utf-8")).hexdigest()
+
+
+class RateLimiter:
+    """
+    Spaces out calls so that at most `per_minute` of them start in any minute.
+
+    Shared by every ingestion worker, so the limit holds for the whole pool.
+    """
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+
+    def wait(self) -> None:
+        """Block until the next call is allowed to start."""
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+
+        time.sleep(start - now)
+
+
+def add_in_batches(
+    vector_store,
+    documents: list,
+    ids: list,
+    batch_size: int = 96,
+    max_workers: int = 4,
+    requests_per_minute: float = None,
+    max_retries: int = 3,
+) -> dict:
+    """
+    Embed and add documents to the vector store in concurrent batches.
+
+    Each batch is one `add_documents` call (one embedding request). Batches run
+    on a bounded thread pool, optionally rate limited, and a failing batch is
+    retried with exponential backoff on its own, so batches that already
+    succeeded are never embedded again.
+
+    Args:
+        vector_store: A LangChain Chroma vector store.
+        documents (list): LangChain Documents to add.
+        ids (list): One id per document.
+        batch_size (int): Documents per embedding request (cohere accepts up to 96 texts per call).
+        max_workers (int): Maximum number of batches in flight.
+        requests_per_minute (float): Optional cap on embedding requests started per minute.
+        max_retries (int): Retries per batch after the first attempt.
+
+    Returns:
+        dict: Number of chunks "added" and "failed", "seconds" taken and throughput in "chunks_per_second".
+    """
+
+    start = time.perf_counter()
+    limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+
+    batches = [
+        (documents[i:i + batch_size], ids[i:i + batch_size])
+        for i in range(0, len(documents), batch_size)
+    ]
+
+
+    def add_batch(batch) -> int:
+        batch_documents, batch_ids = batch
+
+        for attempt in range(max_retries + 1):
+            if limiter is not None:
+                limiter.wait()
+
+            try:
+                vector_store.add_documents(documents=batch_documents, ids=batch_ids)
+                return len(batch_ids)
+
+            except Exception as e:
+                if attempt == max_retries:
+                    logger.error("batch of %d chunks failed after %d attempts: %s", len(batch_ids), attempt + 1, e)
+                    return 0
+
+                # exponential backoff with full jitter.
+                time.sleep(random.uniform(0, min(30.0, 2 ** attempt)))
+
+
+    added = 0
+
+    if batches:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            added = sum(pool.map(add_batch, batches))
+
+    seconds = time.perf_counter() - start
+
+    return {
+        "added": added,
+        "failed": len(documents) - added,
+        "seconds": round(seconds, 3),
+        "chunks_per_second": round(added / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def is_source_current(vector_store, source: str, source_hash: str) -> bool:
+    """
+    Check whether the vector store already holds exactly this version of a source file.
+
+    Args:
+        vector_store: A LangChain Chroma vector store.
+        source (str): Source path, as stored in the chunks' "source" metadata.
+        source_hash (str): Fingerprint of the current file content.
+
+    Returns:
+        bool: True if every chunk of this file version is stored, and nothing else from the source.
+    """
+
+    stored = vector_store.get(where={"source": source}, include=["metadatas"])
+    metadatas = stored["metadatas"]
+
+    if {metadata.get("source_hash") for metadata in metadatas} != {source_hash}:
+        return False
+
+    # a partially ingested file (e.g. some batches failed) is not current.
+    return all(metadata.get("source_chunks") == len(metadatas) for metadata in metadatas)
+
+
+def _update_metadatas(vector_store, ids: list, metadatas: list) -> None:
+    """Replace the metadata of stored chunks without re-embedding them."""
+
+    if hasattr(vector_store, "update_metadatas"):
+        vector_store.update_metadatas(ids, metadatas)
+        return
+
+    # the langchain chroma wrapper has no metadata-only update (update_documents re-embeds),
+    # so this goes to the chroma collection directly.
+    vector_store._collection.update(ids=ids, metadatas=metadatas)
+
+
+def sync_chunks(vector_store, chunks, source_hash: str = None, **batch_options) -> dict:
+    """
+    Make the vector store hold exactly the given chunks for each of their sources.
+
+    New chunks are embedded and added under their content-hash ids, chunks
+    already stored are skipped (no embedding call), and stored chunks of the
+    same sources that are no longer produced are deleted.
+
+    Args:
+        vector_store: A LangChain Chroma vector store.
+        chunks (list): Chunked LangChain Documents, each with a "source" metadata entry.
+        source_hash (str): Optional fingerprint of the source file, stored with each chunk.
+        **batch_options: Passed to `add_in_batches` (batch_size, max_workers, requests_per_minute, max_retries).
+
+    Returns:
+        dict: Number of chunks "added", "failed", "removed" and "unchanged", and the embedding throughput.
+    """
+
+    # group the chunks per source, dropping exact duplicates.
+    by_source = defaultdict(dict)
+
+    for chunk in chunks:
+        if source_hash is not None:
+            chunk.metadata["source_hash"] = source_hash
+        by_source[chunk.metadata.get("source", "")][chunk_id(chunk)] = chunk
+
+    # new chunks of every source are collected first so that they share batches.
+    new_documents, new_ids = [], []
+    stats = {"added": 0, "failed": 0, "removed": 0, "unchanged": 0}
+
+    for source, wanted in by_source.items():
+        for chunk in wanted.values():
+            chunk.metadata["source_chunks"] = len(wanted)
+
+        stored = vector_store.get(where={"source": source}, include=["metadatas"])
+        existing = dict(zip(stored["ids"], stored["metadatas"]))
+
+        # remove chunks whose text is no longer part of the source.
+        stale = [id_ for id_ in existing if id_ not in wanted]
+        if stale:
+            vector_store.delete(ids=stale)
+
+        # chunks kept from a previous version of the file only need their metadata refreshed.
+        outdated = [id_ for id_, metadata in existing.items() if id_ in wanted and metadata != wanted[id_].metadata]
+        if outdated:
+            _update_metadatas(vector_store, outdated, [wanted[id_].metadata for id_ in outdated])
+
+        # only embed chunks that are not stored yet.
+        source_new_ids = [id_ for id_ in wanted if id_ not in existing]
+        new_ids.extend(source_new_ids)
+        new_documents.extend(wanted[id_] for id_ in source_new_ids)
+
+        stats["removed"] += len(stale)
+        stats["unchanged"] += len(wanted) - len(source_new_ids)
+
+    stats.update(add_in_batches(vector_store, new_documents, new_ids, **batch_options))
+
+    return stats
+
+
+def ingest_file(vector_store, file_path: str, load, chunk, **batch_options) -> dict:
+    """
+    Incrementally ingest one file into the vector store.
+
+    If the store already holds this exact version of the file, nothing is
+    loaded, chunked or embedded; otherwise the file's chunks are synced with
+    `sync_chunks`.
+
+    Args:
+        vector_store: A LangChain Chroma vector store.
+        file_path (str): Path to the document file.
+        load (Callable): Loads a file path into a list of Documents (e.g. load_document).
+        chunk (Callable): Splits a list of Documents into chunks (e.g. chunk_data).
+        **batch_options: Passed to `add_in_batches`.
+
+    Returns:
+        dict: Statistics from `sync_chunks`, and whether the file was "skipped".
+    """
+
+    source_hash = file_fingerprint(file_path)
+
+    if is_source_current(vector_store, file_path, source_hash):
+        return {"skipped": True}
+
+    data = load(file_path)
+
+    if not data:
+        return {"skipped": True}
+
+    stats = sync_chunks(vector_store, chunk(data), source_hash, **batch_options)
+    stats["skipped"] = False
+
+    return stats
+
+
+def ingest_paths(
+    vector_store,
+    paths,
+    chunk=chunk_data,
+    parse_workers: int = None,
+    queue_depth: int = 64,
+    prune: bool = False,
+    **batch_options,
+) -> dict:
+    """
+    Incrementally ingest every document under the given files, directories or glob patterns.
+
+    Files whose current version is already stored are skipped before parsing.
+    The others are parsed in a process pool (see `stream_pages`); pages are
+    chunked as they arrive and each file is synced as soon as its last page
+    is in, while the remaining files are still being parsed. Syncing a file
+    needs all of its chunks (to find the stale ones), so the chunks of the
+    files being parsed are held in memory until then, on top of the queue. With `prune`, chunks of files that are no
+    longer found under `paths` (e.g. deleted files) are removed as well.
+
+    Args:
+        vector_store: A LangChain Chroma vector store.
+        paths (str | list[str]): Files, directories or glob patterns.
+        chunk (Callable): Splits a list of Documents into chunks (defaults to chunk_data).
+        parse_workers (int): Number of parser processes.
+        queue_depth (int): Maximum number of parsed pages waiting to be chunked.
+        prune (bool): Remove stored sources missing from `paths`; only use it when `paths` covers the whole corpus.
+        **batch_options: Passed to `add_in_batches`.
+
+    Returns:
+        dict: Chunk counts summed over all files, file counts and overall throughput.
+    """
+
+    start = time.perf_counter()
+    stats = {"files": 0, "skipped_files": 0, "failed_files": 0, "added": 0, "failed": 0, "removed": 0, "unchanged": 0}
+
+    # fingerprinting is much cheaper than parsing, so unchanged files never reach the pool.
+    source_hashes = {}
+    documents = find_documents(paths)
+
+    if prune:
+        stats["removed"] += prune_sources(vector_store, documents)
+
+    for file_path in documents:
+        source_hash = file_fingerprint(file_path)
+
+        if is_source_current(vector_store, file_path, source_hash):
+            stats["skipped_files"] += 1
+        else:
+            source_hashes[file_path] = source_hash
+
+    chunks = defaultdict(list)
+
+    for event, file_path, payload in stream_pages(list(source_hashes), parse_workers, queue_depth):
+        if event == "page":
+            # pages are split on arrival, so chunking overlaps with parsing.
+            chunks[file_path].extend(chunk([payload]))
+            continue
+
+        file_chunks = chunks.pop(file_path, [])
+
+        if event == "error":
+            logger.warning("could not load %s: %s", file_path, payload)
+            stats["failed_files"] += 1
+            continue
+
+        stats["files"] += 1
+
+        if file_chunks:
+            file_stats = sync_chunks(vector_store, file_chunks, source_hashes[file_path], **batch_options)
+
+            for key in ("added", "failed", "removed", "unchanged"):
+                stats[key] += file_stats[key]
+
+    seconds = time.perf_counter() - start
+
+    stats["seconds"] = round(seconds, 3)
+    stats["chunks_per_second"] = round(stats["added"] / seconds, 1) if seconds > 0 else 0.0
+
+    return stats
+
+
+def prune_sources(vector_store, sources) -> int:
+    """
+    Delete every stored chunk whose source is not in `sources` (e.g. deleted files).
+
+    Args:
+        vector_store: A LangChain Chroma vector store.
+        sources (Iterable[str]): Sources that should stay in the store.
+
+    Returns:
+        int: Number of chunks removed.
+    """
+
+    keep = set(sources)
+    stored = vector_store.get(include=["metadatas"])
+
+    stale = [
+        id_ for id_, metadata in zip(stored["ids"], stored["metadatas"])
+        if metadata.get("source") not in keep
+    ]
+
+    if stale:
+        vector_store.delete(ids=stale)
+
+    return len(stale)
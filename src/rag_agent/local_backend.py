@@ -0,0 +1,585 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import os
+import json
+import uuid
+import zlib
+import sqlite3
+import threading
+from typing import List, Optional
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from retrieval import tokenize
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic, offline embeddings from hashed word and word-pair features.
+
+    Every word and pair of adjacent words is hashed (crc32) into one of `dim`
+    signed buckets and the result is l2-normalized. Texts sharing vocabulary
+    get similar vectors, which is enough to exercise and load-test the
+    retrieval pipeline without network access or model downloads; it is not
+    a substitute for a trained model's retrieval quality.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+
+    def _embed(self, text: str) -> np.ndarray:
+
+        tokens = tokenize(text)
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+
+        if not features:
+            return vector
+
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features))
+        signs = np.where(hashes & (1 << 31), -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dim, signs)
+
+        norm = np.linalg.norm(vector)
+
+        return vector / norm if norm else vector
+
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text).tolist() for text in texts]
+
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text).tolist()
+
+
+def local_embeddings(model_name: Optional[str] = None) -> Embeddings:
+    """
+    Return an embedding model that runs without calling a hosted api.
+
+    Args:
+        model_name (str): Optional sentence-transformers model (e.g. "sentence-transformers/all-MiniLM-L6-v2"),
+            which requires the langchain-huggingface package; defaults to `HashingEmbeddings`.
+
+    Returns:
+        Embeddings: The embedding model.
+    """
+
+    if not model_name:
+        return HashingEmbeddings()
+
+    try:
+        from langchain_huggingface import HuggingFaceEmbeddings
+    except ImportError as e:
+        raise ImportError("Local model embeddings need the langchain-huggingface package.") from e
+
+    return HuggingFaceEmbeddings(model_name=model_name, encode_kwargs={"normalize_embeddings": True})
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process vector store backed by memory-mapped files.
+
+    Vectors are l2-normalized float32 rows of `vectors.f32`, so similarity is
+    a dot product and the operating system pages vectors in on demand; ids,
+    texts and metadata live in a SQLite file next to it. Search is an exact
+    brute-force scan in blocks of `block_rows` rows by default, or an
+    approximate HNSW graph (`index="hnsw"`, needs the hnswlib package) saved
+    as `hnsw.bin` by `persist()`.
+
+    Besides the LangChain `VectorStore` interface it implements the subset of
+    Chroma's api the ingestion code uses (`get`, `delete`, `update_metadatas`),
+    so it can replace Chroma in `RagService`. Only one process should write to
+    a directory at a time.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        embedding: Embeddings,
+        index: str = "brute",
+        block_rows: int = 65536,
+        hnsw_m: int = 16,
+        hnsw_ef: int = 64,
+    ):
+        """
+        Args:
+            directory (str): Directory holding the vector, metadata and index files (created if missing).
+            embedding (Embeddings): Embedding model for added texts and queries.
+            index (str): "brute" for exact search or "hnsw" for approximate search.
+            block_rows (int): Rows scored per block by brute-force search.
+            hnsw_m (int): HNSW graph degree.
+            hnsw_ef (int): HNSW search breadth (higher is more accurate and slower).
+        """
+
+        if index not in ("brute", "hnsw"):
+            raise ValueError(f"Unknown index type: {index}")
+
+        self.directory = directory
+        self._embedding = embedding
+        self.index_type = index
+        self.block_rows = block_rows
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef = hnsw_ef
+
+        self._lock = threading.RLock()
+        self._vectors: Optional[np.memmap] = None
+        self._dim: Optional[int] = None
+        self._capacity = 0
+        self._rows = 0
+        self._live = np.zeros(0, dtype=bool)
+        self._hnsw = None
+
+        # bumped on every add or delete, so a saved hnsw graph can tell whether it is stale.
+        self._writes = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(directory, "documents.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_id ON documents (id)")
+        self._conn.commit()
+
+        self._load()
+
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, "vectors.f32")
+
+
+    @property
+    def _hnsw_path(self) -> str:
+        return os.path.join(self.directory, "hnsw.bin")
+
+
+    def _load(self) -> None:
+
+        meta = dict(self._conn.execute("SELECT name, value FROM meta"))
+
+        self._writes = int(meta.get("writes", 0))
+
+        if "dim" not in meta:
+            return
+
+        self._dim = int(meta["dim"])
+        self._capacity = int(meta["capacity"])
+        self._rows = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM documents").fetchone()[0]
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(self._capacity, self._dim))
+
+        self._live = np.zeros(self._capacity, dtype=bool)
+        live_rows = np.fromiter(
+            (row for (row,) in self._conn.execute("SELECT row FROM documents WHERE deleted = 0")), dtype=np.int64
+        )
+        self._live[live_rows] = True
+
+        if self.index_type == "hnsw":
+            self._load_hnsw(saved=meta.get("hnsw_writes") == str(self._writes))
+
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        """Make room for `rows` more vectors, doubling the vector file when it is full."""
+
+        if self._dim is None:
+            self._dim = dim
+        elif dim != self._dim:
+            raise ValueError(f"Expected {self._dim}-dimensional vectors, got {dim}.")
+
+        needed = self._rows + rows
+
+        if needed <= self._capacity:
+            return
+
+        capacity = max(needed, 2 * self._capacity, 1024)
+
+        if self._vectors is None:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="w+", shape=(capacity, dim))
+        else:
+            self._vectors.flush()
+
+            # growing the file keeps existing rows in place; readers holding the old map stay valid.
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(capacity * dim * 4)
+
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._capacity] = self._live
+        self._live = live
+        self._capacity = capacity
+
+        if self._hnsw is not None:
+            self._hnsw.resize_index(capacity)
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+            [("dim", str(dim)), ("capacity", str(capacity))],
+        )
+
+
+    def _new_hnsw(self, path: Optional[str] = None):
+        """Create an empty hnsw index, or load the one saved at `path`."""
+
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("index='hnsw' needs the hnswlib package.") from e
+
+        index = hnswlib.Index(space="ip", dim=self._dim)
+
+        if path is None:
+            index.init_index(max_elements=max(self._capacity, 1), ef_construction=200, M=self.hnsw_m)
+        else:
+            index.load_index(path, max_elements=self._capacity)
+
+        index.set_ef(self.hnsw_ef)
+
+        return index
+
+
+    def _load_hnsw(self, saved: bool) -> None:
+
+        # a graph saved before later writes is rebuilt from the vectors rather than trusted.
+        if saved and os.path.exists(self._hnsw_path):
+            self._hnsw = self._new_hnsw(self._hnsw_path)
+            return
+
+        index = self._new_hnsw()
+
+        rows = np.flatnonzero(self._live[:self._rows])
+        for start in range(0, len(rows), self.block_rows):
+            block = rows[start:start + self.block_rows]
+            index.add_items(np.asarray(self._vectors[block]), block)
+
+        self._hnsw = index
+
+
+    def persist(self) -> None:
+        """Flush the vector file and, for the hnsw index, save the graph."""
+
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+
+            if self._hnsw is not None:
+                self._hnsw.save_index(self._hnsw_path)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES ('hnsw_writes', ?)", (str(self._writes),)
+                )
+                self._conn.commit()
+
+
+    def add_texts(self, texts, metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(texts, self._embedding.embed_documents(texts), metadatas=metadatas, ids=ids)
+
+
+    def add_embeddings(
+        self,
+        texts: List[str],
+        embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Add texts with precomputed embeddings; existing ids are replaced.
+
+        Args:
+            texts (List[str]): The texts.
+            embeddings: One vector per text (list of lists or a 2-d array).
+            metadatas (List[dict]): Optional metadata per text.
+            ids (List[str]): Optional ids (random ones are generated otherwise).
+
+        Returns:
+            List[str]: The ids of the added texts.
+        """
+
+        if not texts:
+            return []
+
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in texts]
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1)
+
+        with self._lock:
+            self.delete(ids)
+            self._reserve(len(texts), vectors.shape[1])
+
+            rows = np.arange(self._rows, self._rows + len(texts))
+
+            if self._hnsw is None and self.index_type == "hnsw":
+                self._hnsw = self._new_hnsw()
+
+            self._vectors[rows] = vectors
+            self._vectors.flush()
+
+            self._conn.executemany(
+                "INSERT INTO documents (row, id, text, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (int(row), id_, text, json.dumps(metadata or {}))
+                    for row, id_, text, metadata in zip(rows, ids, texts, metadatas)
+                ],
+            )
+            self._bump_writes()
+            self._conn.commit()
+
+            if self._hnsw is not None:
+                self._hnsw.add_items(vectors, rows)
+
+            self._live[rows] = True
+            self._rows += len(texts)
+
+        return ids
+
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs) -> None:
+
+        if not ids:
+            return
+
+        with self._lock:
+            rows = self._rows_for_ids(ids)
+
+            if not rows:
+                return
+
+            self._conn.executemany("UPDATE documents SET deleted = 1 WHERE row = ?", [(row,) for row in rows])
+            self._bump_writes()
+            self._conn.commit()
+
+            self._live[rows] = False
+
+            if self._hnsw is not None:
+                for row in rows:
+                    self._hnsw.mark_deleted(row)
+
+
+    def _bump_writes(self) -> None:
+        self._writes += 1
+        self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('writes', ?)", (str(self._writes),))
+
+
+    def _rows_for_ids(self, ids: List[str]) -> List[int]:
+
+        rows = []
+
+        # stay under sqlite's limit on bound parameters.
+        for start in range(0, len(ids), 500):
+            batch = list(ids[start:start + 500])
+            rows.extend(
+                row for (row,) in self._conn.execute(
+                    f"SELECT row FROM documents WHERE deleted = 0 AND id IN ({','.join('?' * len(batch))})", batch
+                )
+            )
+
+        return rows
+
+
+    @staticmethod
+    def _where_clause(where: Optional[dict]) -> tuple:
+        """Translate a {"key": value} metadata filter into sql."""
+
+        if not where:
+            return "", []
+
+        if any(key.startswith("$") for key in where):
+            raise ValueError("Only {'key': value} equality filters are supported.")
+
+        clause = " AND ".join("json_extract(metadata, ?) = ?" for _ in where)
+        params = [param for key, value in where.items() for param in (f'$."{key}"', value)]
+
+        return f" AND {clause}", params
+
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[dict] = None, include=("documents", "metadatas")) -> dict:
+        """
+        Fetch stored documents, like Chroma's `get`.
+
+        Args:
+            ids (List[str]): Optional ids to fetch.
+            where (dict): Optional metadata equality filter.
+            include: Any of "documents" and "metadatas".
+
+        Returns:
+            dict: "ids", plus "documents" and/or "metadatas" as requested.
+        """
+
+        clause, params = self._where_clause(where)
+
+        if ids is not None:
+            clause += f" AND id IN ({','.join('?' * len(ids))})" if ids else " AND 0"
+            params += list(ids)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, text, metadata FROM documents WHERE deleted = 0{clause} ORDER BY row", params
+            ).fetchall()
+
+        result = {"ids": [row[0] for row in rows]}
+
+        if "documents" in include:
+            result["documents"] = [row[1] for row in rows]
+
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(row[2]) for row in rows]
+
+        return result
+
+
+    def update_metadatas(self, ids: List[str], metadatas: List[dict]) -> None:
+        """Replace the metadata of stored documents without re-embedding them."""
+
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE documents SET metadata = ? WHERE deleted = 0 AND id = ?",
+                [(json.dumps(metadata or {}), id_) for id_, metadata in zip(ids, metadatas)],
+            )
+            self._conn.commit()
+
+
+    def __len__(self) -> int:
+        return int(self._live.sum())
+
+
+    def _allowed_rows(self, filter: Optional[dict]) -> Optional[np.ndarray]:
+
+        if not filter:
+            return None
+
+        clause, params = self._where_clause(filter)
+        allowed = np.zeros(self._capacity, dtype=bool)
+
+        with self._lock:
+            rows = [row for (row,) in self._conn.execute(f"SELECT row FROM documents WHERE deleted = 0{clause}", params)]
+
+        allowed[rows] = True
+
+        return allowed
+
+
+    def _search_rows(self, query: np.ndarray, k: int, filter: Optional[dict]) -> tuple:
+        """Return the best `k` (rows, scores) for a normalized query vector."""
+
+        # snapshot what is visible now; concurrent writes only append rows.
+        vectors, rows, live = self._vectors, self._rows, self._live
+        allowed = self._allowed_rows(filter)
+
+        if vectors is None or rows == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        if self._hnsw is not None:
+            count = min(k, int(live.sum()) if allowed is None else int(allowed.sum()))
+
+            if count == 0:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+            labels, distances = self._hnsw.knn_query(
+                query, k=count, filter=None if allowed is None else (lambda label: bool(allowed[label]))
+            )
+
+            # hnswlib's inner-product distance is 1 - similarity.
+            return labels[0].astype(np.int64), 1 - distances[0]
+
+        best_rows, best_scores = [], []
+
+        for start in range(0, rows, self.block_rows):
+            end = min(start + self.block_rows, rows)
+            scores = np.asarray(vectors[start:end]) @ query
+
+            mask = live[start:end] if allowed is None else (live[start:end] & allowed[start:end])
+            scores[~mask] = -np.inf
+
+            top = np.argpartition(-scores, k - 1)[:k] if end - start > k else np.arange(end - start)
+            best_rows.append(top + start)
+            best_scores.append(scores[top])
+
+        best_rows, best_scores = np.concatenate(best_rows), np.concatenate(best_scores)
+        order = np.argsort(-best_scores, kind="stable")[:k]
+        keep = order[np.isfinite(best_scores[order])]
+
+        return best_rows[keep], best_scores[keep]
+
+
+    def similarity_search_by_vector_with_score(self, embedding, k: int = 4, filter: Optional[dict] = None) -> list:
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        query = query / norm if norm else query
+
+        rows, scores = self._search_rows(query, k, filter)
+
+        if len(rows) == 0:
+            return []
+
+        with self._lock:
+            stored = {
+                row: (id_, text, metadata)
+                for row, id_, text, metadata in self._conn.execute(
+                    f"SELECT row, id, text, metadata FROM documents WHERE row IN ({','.join('?' * len(rows))})",
+                    [int(row) for row in rows],
+                )
+            }
+
+        return [
+            (Document(id=stored[row][0], page_content=stored[row][1], metadata=json.loads(stored[row][2])), float(score))
+            for row, score in zip(rows.tolist(), scores.tolist())
+        ]
+
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs) -> list:
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k=k, filter=filter)
+
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, filter: Optional[dict] = None, **kwargs) -> List[Document]:
+        return [document for document, _ in self.similarity_search_by_vector_with_score(embedding, k=k, filter=filter)]
+
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+
+    def _select_relevance_score_fn(self):
+        # scores are cosine similarities in [-1, 1].
+        return lambda score: (score + 1) / 2
+
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        directory: str = "./local_vector_store",
+        **kwargs,
+    ) -> "NumpyVectorStore":
+
+        store = cls(directory=directory, embedding=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+
+        return store
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+# multi-session http front end for the academic CV assistant.
+#
+# usage:
+#   export GROQ_API_KEY=... COHERE_API_KEY=... RAG_CHECKPOINT_PATH=./rag_sessions.db
+#   uvicorn rag_server:app --port 8001
+
+
+# import all the necessary libraries, modules or packages.
+import os
+import json
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+from rag_service import RagService
+from sessions import SessionLocks
+
+
+logger = logging.getLogger(__name__)
+
+# sessions are only useful if they outlive the process, so a checkpoint file is always used.
+os.environ.setdefault("RAG_CHECKPOINT_PATH", "./rag_sessions.db")
+
+# maximum number of agent turns running at once, across all sessions.
+MAX_CONCURRENT_TURNS = int(os.getenv("RAG_MAX_CONCURRENT_TURNS", "8"))
+
+
+class MessageRequest(BaseModel):
+    message: str = Field(..., min_length=1, max_length=8000)
+
+
+class MessageResponse(BaseModel):
+    session_id: str
+    response: str
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+
+
+class HistoryMessage(BaseModel):
+    role: str
+    content: str
+
+
+class HistoryResponse(BaseModel):
+    session_id: str
+    messages: list[HistoryMessage]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+
+    service = RagService.from_env()
+
+    # open the collection and build the agents before the first request arrives.
+    warm_start = await run_in_threadpool(service.warm_start)
+    logger.info("rag warm start: %s", warm_start)
+
+    app.state.service = service
+    app.state.turns = asyncio.Semaphore(MAX_CONCURRENT_TURNS)
+    app.state.session_locks = SessionLocks()
+
+    yield
+
+    service.close()
+
+
+app = FastAPI(title="Academic CV Assistant", lifespan=lifespan)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get("/health")
+async def health(request: Request):
+    service = request.app.state.service
+    return {
+        "status": "ok",
+        "timings": service.timings,
+        "retrieval": service.retriever.stats(),
+        "prompt_tokens": service.packer.summary(),
+    }
+
+
+@app.post("/sessions", response_model=SessionResponse, status_code=201)
+async def create_session():
+    return SessionResponse(session_id=uuid.uuid4().hex)
+
+
+@app.get("/sessions/{session_id}/messages", response_model=HistoryResponse)
+async def get_history(session_id: str, request: Request):
+
+    messages = await run_in_threadpool(request.app.state.service.history, session_id, True)
+
+    return HistoryResponse(
+        session_id=session_id,
+        messages=[
+            HistoryMessage(role=message.type, content=message.text)
+            for message in messages if message.type in ("human", "ai")
+        ],
+    )
+
+
+@app.post("/sessions/{session_id}/messages", response_model=MessageResponse)
+async def send_message(session_id: str, body: MessageRequest, request: Request):
+
+    state = request.app.state
+
+    async with state.session_locks.get(session_id), state.turns:
+        response = await run_in_threadpool(state.service.answer, body.message, session_id, True)
+
+    return MessageResponse(session_id=session_id, response=response)
+
+
+@app.post("/sessions/{session_id}/messages/stream")
+async def stream_message(session_id: str, body: MessageRequest, request: Request):
+    """
+    Answer a message as server-sent events: "token" events with text chunks,
+    then "done" with the full response, or "error".
+    """
+
+    state = request.app.state
+    loop = asyncio.get_running_loop()
+
+    async def events():
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def run_turn() -> str:
+            # the whole turn runs in one worker thread, so the retrieval turn scope stays intact.
+            parts = []
+
+            for chunk, metadata in state.service.stream(body.message, session_id, True, stream_mode="messages"):
+                if metadata.get("langgraph_node") == "model" and chunk.text:
+                    parts.append(chunk.text)
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+
+            return "".join(parts)
+
+        async with state.session_locks.get(session_id), state.turns:
+            turn = asyncio.ensure_future(run_in_threadpool(run_turn))
+
+            try:
+                while True:
+                    next_token = asyncio.ensure_future(queue.get())
+                    await asyncio.wait({next_token, turn}, return_when=asyncio.FIRST_COMPLETED)
+
+                    if next_token.done():
+                        yield _sse("token", {"content": next_token.result()})
+                        continue
+
+                    next_token.cancel()
+
+                    # flush tokens that arrived together with the end of the turn.
+                    while not queue.empty():
+                        yield _sse("token", {"content": queue.get_nowait()})
+
+                    try:
+                        yield _sse("done", {"session_id": session_id, "response": turn.result()})
+                    except Exception as e:
+                        yield _sse("error", {"detail": str(e)})
+
+                    return
+
+            finally:
+                # the worker thread cannot be interrupted; keep the session locked until it finishes.
+                if not turn.done():
+                    await asyncio.wait({turn})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,489 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+# the langchain client libraries are imported inside the builders below, on first use,
+# so that importing this module (e.g. when a web worker boots) stays fast.
+import os
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+from typing import Optional
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+from retrieval import QueryCache, Retriever, HybridRetriever
+from ingestion import ingest_paths
+from prompts import SYSTEM_PROMPT, CONTEXT_PROMPT
+from local_backend import NumpyVectorStore, local_embeddings
+from context_packer import ContextPacker
+from sessions import history_window
+
+
+logger = logging.getLogger(__name__)
+
+
+class RagService:
+    """
+    The academic CV assistant as a reusable service.
+
+    Nothing is built when the service is created: the embeddings, the Chroma
+    store, the retriever, the chat model and the agents are each constructed
+    on first use (thread-safely, once) and their construction times are kept
+    in `timings`. `warm_start()` opens the persisted collection and builds the
+    agents without ingesting anything, and checks the time it took against
+    `cold_start_budget_seconds`. API keys (GROQ_API_KEY, COHERE_API_KEY) are
+    read from the environment by the clients.
+
+    With `backend="local"`, embeddings and search run in-process instead
+    (see `local_backend`): no cohere key or network access is needed for
+    retrieval, which makes it usable for offline runs and load tests.
+
+    With `checkpoint_path` set, conversations are kept per session in a
+    SQLite checkpoint file; only the last `keep_checkpoints` checkpoints of a
+    session are kept, and its history is trimmed to the last
+    `max_history_messages` messages before every model call, so prompt size
+    and checkpoint file size stay flat however long a chat runs.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "academic-cv_collection",
+        persist_directory: str = "./chroma_academic_cv_db",
+        embedding_cache_dir: str = "./embedding_cache",
+        embedding_cache_entries: int = 50_000,
+        embedding_model: str = "embed-english-v3.0",
+        chat_model: str = "llama-3.3-70b-versatile",
+        backend: str = "cohere-chroma",
+        local_index: str = "brute",
+        local_embedding_model: Optional[str] = None,
+        k: int = 5,
+        hybrid: bool = True,
+        max_context_tokens: Optional[int] = 1000,
+        query_cache_ttl_seconds: float = 600.0,
+        checkpoint_path: Optional[str] = None,
+        keep_checkpoints: Optional[int] = 10,
+        max_history_messages: Optional[int] = 20,
+        cold_start_budget_seconds: Optional[float] = 5.0,
+    ):
+        self.collection_name = collection_name
+        self.persist_directory = persist_directory
+        self.embedding_cache_dir = embedding_cache_dir
+        self.embedding_cache_entries = embedding_cache_entries
+        self.embedding_model = embedding_model
+        self.chat_model = chat_model
+        self.backend = backend
+        self.local_index = local_index
+        self.local_embedding_model = local_embedding_model
+        self.k = k
+        self.hybrid = hybrid
+        self.max_context_tokens = max_context_tokens
+        self.query_cache_ttl_seconds = query_cache_ttl_seconds
+        self.checkpoint_path = checkpoint_path
+        self.keep_checkpoints = keep_checkpoints
+        self.max_history_messages = max_history_messages
+        self.cold_start_budget_seconds = cold_start_budget_seconds
+
+        # seconds spent building each component (including the components it needed).
+        self.timings = {}
+
+        self._components = {}
+        self._lock = threading.RLock()
+
+
+    @classmethod
+    def from_env(cls) -> "RagService":
+        """
+        Build the service from environment variables.
+
+        RAG_COLLECTION_NAME / RAG_PERSIST_DIR: the chroma collection and where it is persisted.
+        RAG_EMBEDDING_CACHE_DIR: directory of the on-disk embedding cache.
+        RAG_BACKEND: "cohere-chroma" (default) or "local".
+        RAG_LOCAL_INDEX: "brute" (default) or "hnsw", for the local backend.
+        RAG_LOCAL_EMBEDDING_MODEL: optional sentence-transformers model for the local backend.
+        RAG_CHECKPOINT_PATH: sqlite file for per-session conversation state (default: no sessions).
+        RAG_MAX_HISTORY_MESSAGES: messages kept per session (default 20, 0 keeps everything).
+        RAG_COLD_START_BUDGET_SECONDS: warm start time budget (default 5, 0 disables the check).
+        """
+
+        return cls(
+            collection_name=os.getenv("RAG_COLLECTION_NAME", "academic-cv_collection"),
+            persist_directory=os.getenv("RAG_PERSIST_DIR", "./chroma_academic_cv_db"),
+            embedding_cache_dir=os.getenv("RAG_EMBEDDING_CACHE_DIR", "./embedding_cache"),
+            backend=os.getenv("RAG_BACKEND", "cohere-chroma"),
+            local_index=os.getenv("RAG_LOCAL_INDEX", "brute"),
+            local_embedding_model=os.getenv("RAG_LOCAL_EMBEDDING_MODEL") or None,
+            checkpoint_path=os.getenv("RAG_CHECKPOINT_PATH") or None,
+            max_history_messages=int(os.getenv("RAG_MAX_HISTORY_MESSAGES", "20")) or None,
+            cold_start_budget_seconds=float(os.getenv("RAG_COLD_START_BUDGET_SECONDS", "5")) or None,
+        )
+
+
+    def _get(self, name: str):
+        """Return a component, building it with `_build_<name>` the first time it is needed."""
+
+        if name not in self._components:
+            with self._lock:
+                if name not in self._components:
+                    start = time.perf_counter()
+                    component = getattr(self, f"_build_{name}")()
+                    self.timings[name] = round(time.perf_counter() - start, 3)
+                    self._components[name] = component
+
+        return self._components[name]
+
+
+    @property
+    def embeddings(self):
+        return self._get("embeddings")
+
+
+    @property
+    def vector_store(self):
+        return self._get("vector_store")
+
+
+    @property
+    def retriever(self) -> Retriever:
+        return self._get("retriever")
+
+
+    @property
+    def model(self):
+        return self._get("model")
+
+
+    @property
+    def packer(self) -> ContextPacker:
+        """Builds the dynamic system prompt and records its per-turn token counts."""
+        return self._get("packer")
+
+
+    @property
+    def checkpointer(self):
+        """SQLite checkpointer holding per-session state, or None without a checkpoint path."""
+        return self._get("checkpointer")
+
+
+    @property
+    def agent(self):
+        """Agent that retrieves context through the retrieval tool."""
+        return self._get("agent")
+
+
+    @property
+    def context_agent(self):
+        """Agent whose system prompt is built from context retrieved for the user's message."""
+        return self._get("context_agent")
+
+
+    def _build_embeddings(self):
+
+        if self.backend == "local":
+            embeddings = local_embeddings(self.local_embedding_model)
+
+            # hashing embeddings are cheaper to recompute than to look up.
+            if not self.local_embedding_model:
+                return embeddings
+
+            return CachedEmbeddings(
+                embeddings,
+                cache=EmbeddingCache(directory=self.embedding_cache_dir, max_entries=self.embedding_cache_entries),
+                namespace=self.local_embedding_model,
+            )
+
+        from langchain_cohere import CohereEmbeddings
+
+        # identical chunks and repeated queries are served from the on-disk cache instead of calling cohere again.
+        return CachedEmbeddings(
+            CohereEmbeddings(model=self.embedding_model),
+            cache=EmbeddingCache(directory=self.embedding_cache_dir, max_entries=self.embedding_cache_entries),
+        )
+
+
+    def _build_vector_store(self):
+
+        if self.backend == "local":
+            return NumpyVectorStore(
+                directory=os.path.join(self.persist_directory, f"{self.collection_name}-local"),
+                embedding=self.embeddings,
+                index=self.local_index,
+            )
+
+        from langchain_chroma import Chroma
+
+        return Chroma(
+            collection_name=self.collection_name,
+            embedding_function=self.embeddings,
+            persist_directory=self.persist_directory,
+        )
+
+
+    def _build_retriever(self) -> Retriever:
+        cache = QueryCache(max_entries=512, ttl_seconds=self.query_cache_ttl_seconds)
+
+        if not self.hybrid:
+            return Retriever(self.vector_store, cache=cache, k=self.k)
+
+        # keyword + dense search, packed into a token budget instead of a larger k.
+        return HybridRetriever(self.vector_store, cache=cache, k=self.k, max_tokens=self.max_context_tokens)
+
+
+    def _build_model(self):
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(
+            model_name=self.chat_model,
+            temperature=0.7,
+            max_tokens=1024,
+            timeout=None,
+            max_retries=3,
+        )
+
+
+    def _build_packer(self) -> ContextPacker:
+
+        # the hybrid retriever already fits its chunks into max_context_tokens; one budget is enough.
+        if self.hybrid:
+            return ContextPacker(CONTEXT_PROMPT, max_context_tokens=None)
+
+        return ContextPacker(CONTEXT_PROMPT, max_context_tokens=self.max_context_tokens or 1500)
+
+
+    def _build_checkpointer(self):
+
+        if not self.checkpoint_path:
+            return None
+
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        # the saver serializes access to the connection itself.
+        conn = sqlite3.connect(self.checkpoint_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        return SqliteSaver(conn)
+
+
+    def _middleware(self) -> list:
+        return [history_window(self.max_history_messages)] if self.max_history_messages else []
+
+
+    def _build_agent(self):
+        from langchain.tools import tool
+        from langchain.agents import create_agent
+
+        retriever = self.retriever
+
+        @tool(response_format="content_and_artifact")
+        def retrieve_context(query: str):
+            """Retrieve information to help answer a query."""
+            retrieved_docs = retriever.search(query)
+            serialized = "\n\n".join(
+                (f"Source: {doc.metadata}\nContent: {doc.page_content}")
+                for doc in retrieved_docs
+            )
+            return serialized, retrieved_docs
+
+        return create_agent(
+            self.model,
+            [retrieve_context],
+            system_prompt=SYSTEM_PROMPT,
+            middleware=self._middleware(),
+            checkpointer=self.checkpointer,
+        )
+
+
+    def _build_context_agent(self):
+        from langchain.agents import create_agent
+        from langchain.agents.middleware import dynamic_prompt, ModelRequest
+
+        retriever, packer = self.retriever, self.packer
+
+        @dynamic_prompt
+        def prompt_with_context(request: ModelRequest) -> str:
+            """Inject context into state messages."""
+            last_query = request.state["messages"][-1].text
+            retrieved_docs = retriever.search(last_query)
+
+            history_tokens = sum(packer.count_tokens(message.text) for message in request.messages)
+            system_message, report = packer.pack(retrieved_docs, history_tokens=history_tokens)
+            logger.debug("prompt tokens: %s", report)
+
+            return system_message
+
+        return create_agent(
+            self.model,
+            tools=[],
+            middleware=[*self._middleware(), prompt_with_context],
+            checkpointer=self.checkpointer,
+        )
+
+
+    def warm_start(self) -> dict:
+        """
+        Open the persisted collection and build both agents, without ingesting anything.
+
+        Returns:
+            dict: Number of stored chunks, total "seconds", whether that was "within_budget",
+            and the per-component "timings".
+        """
+
+        start = time.perf_counter()
+
+        if self.backend == "local":
+            documents = len(self.vector_store)
+        else:
+            # count() is not exposed by the langchain wrapper; it is cheap on the chroma collection.
+            documents = self.vector_store._collection.count()
+        self.agent
+        self.context_agent
+
+        seconds = round(time.perf_counter() - start, 3)
+        within_budget = self.cold_start_budget_seconds is None or seconds <= self.cold_start_budget_seconds
+
+        if documents == 0:
+            logger.warning("Collection %r in %s is empty; run ingest() first.", self.collection_name, self.persist_directory)
+
+        if not within_budget:
+            logger.warning(
+                "RAG warm start took %.2fs, over the %.2fs budget: %s",
+                seconds, self.cold_start_budget_seconds, self.timings,
+            )
+
+        return {"documents": documents, "seconds": seconds, "within_budget": within_budget, "timings": dict(self.timings)}
+
+
+    def ingest(self, paths, **options) -> dict:
+        """
+        Incrementally ingest documents into the collection (see `ingestion.ingest_paths`).
+
+        Args:
+            paths (str | list[str]): Files, directories or glob patterns.
+            **options: Passed to `ingest_paths` (e.g. prune, parse_workers, queue_depth, batch_size, max_workers).
+
+        Returns:
+            dict: Ingestion statistics.
+        """
+
+        stats = ingest_paths(self.vector_store, paths, **options)
+
+        if self.backend == "local":
+            self.vector_store.persist()
+
+        # cached results and the keyword index may no longer match the collection.
+        if stats["added"] or stats["removed"]:
+            self.retriever.invalidate()
+
+        return stats
+
+
+    def _config(self, session_id: Optional[str]) -> dict:
+
+        # without a session id every call is a fresh conversation.
+        if self.checkpointer is None:
+            return {}
+
+        return {"configurable": {"thread_id": session_id or uuid.uuid4().hex}}
+
+
+    def _prune_checkpoints(self, config: dict) -> None:
+        """Delete all but the last `keep_checkpoints` checkpoints of a session (and their writes)."""
+
+        if not self.keep_checkpoints or not config:
+            return
+
+        thread_id = config["configurable"]["thread_id"]
+
+        # checkpoint ids are time ordered, so the newest sort last.
+        with self.checkpointer.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id NOT IN "
+                "(SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? ORDER BY checkpoint_id DESC LIMIT ?)",
+                (thread_id, thread_id, self.keep_checkpoints),
+            )
+            cursor.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_id NOT IN "
+                "(SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?)",
+                (thread_id, thread_id),
+            )
+
+
+    def stream(self, query: str, session_id: Optional[str] = None, use_context: bool = False, stream_mode: str = "values"):
+        """
+        Stream an agent's response to a user query as one retrieval turn.
+
+        Args:
+            query (str): The user's message.
+            session_id (str): Conversation to continue (needs a checkpoint path).
+            use_context (bool): Use the dynamic-prompt agent instead of the retrieval tool agent.
+            stream_mode (str): LangGraph stream mode ("values", "updates", "messages", ...).
+
+        Yields:
+            The agent's stream items for the given mode.
+        """
+
+        agent = self.context_agent if use_context else self.agent
+        config = self._config(session_id)
+
+        with self.retriever.turn():
+            yield from agent.stream(
+                {"messages": [{"role": "user", "content": query}]},
+                config,
+                stream_mode=stream_mode,
+            )
+
+        self._prune_checkpoints(config)
+
+
+    def answer(self, query: str, session_id: Optional[str] = None, use_context: bool = False) -> str:
+        """
+        Answer a user query.
+
+        Args:
+            query (str): The user's message.
+            session_id (str): Conversation to continue (needs a checkpoint path).
+            use_context (bool): Use the dynamic-prompt agent instead of the retrieval tool agent.
+
+        Returns:
+            str: The agent's final message.
+        """
+
+        agent = self.context_agent if use_context else self.agent
+        config = self._config(session_id)
+
+        with self.retriever.turn():
+            result = agent.invoke({"messages": [{"role": "user", "content": query}]}, config)
+
+        self._prune_checkpoints(config)
+
+        return result["messages"][-1].text
+
+
+    def history(self, session_id: str, use_context: bool = False) -> list:
+        """
+        Return the messages kept for a session (at most `max_history_messages`).
+
+        Args:
+            session_id (str): The conversation.
+            use_context (bool): Read the dynamic-prompt agent's state instead of the retrieval tool agent's.
+
+        Returns:
+            list: LangChain messages, oldest first (empty for unknown sessions).
+        """
+
+        if self.checkpointer is None:
+            return []
+
+        agent = self.context_agent if use_context else self.agent
+        state = agent.get_state(self._config(session_id))
+
+        return list(state.values.get("messages", []))
+
+
+    def close(self) -> None:
+        """Close the checkpoint database, if one was opened."""
+
+        checkpointer = self._components.get("checkpointer")
+
+        if checkpointer is not None:
+            checkpointer.conn.close()
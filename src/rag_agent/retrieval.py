@@ -0,0 +1,485 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import re
+import json
+import math
+import time
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import numpy as np
+from langchain_core.documents import Document
+from ingestion import chunk_id
+
+
+# results already retrieved during the current agent turn, keyed like the query cache.
+_turn_results: ContextVar[Optional[dict]] = ContextVar("turn_results", default=None)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for cache lookups (case and whitespace insensitive).
+
+    Args:
+        query (str): The raw query text.
+
+    Returns:
+        str: The normalized query.
+    """
+
+    return " ".join(query.casefold().split())
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache of retrieval results with a time-to-live.
+
+    Entries expire `ttl_seconds` after they were stored, so documents added to
+    the vector store show up in results within one ttl.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key: tuple) -> Optional[list]:
+        """Return the cached documents for a key, or None if missing or expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or time.monotonic() >= entry[0]:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+
+    def set(self, key: tuple, documents: list) -> None:
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, documents)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._entries.clear()
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Retriever:
+    """
+    Similarity search shared by the retrieval tool and the dynamic prompt.
+
+    Inside `turn()`, every distinct (normalized query, k, filter) is searched
+    at most once, so the middleware and the tool reuse one search. Across
+    turns, results come from a `QueryCache` until they expire.
+    """
+
+    def __init__(self, vector_store, cache: Optional[QueryCache] = None, k: int = 5):
+        """
+        Args:
+            vector_store: A LangChain vector store.
+            cache (QueryCache): Cross-turn result cache; pass None to search on every new turn.
+            k (int): Default number of documents to retrieve.
+        """
+
+        self.vector_store = vector_store
+        self.cache = cache
+        self.k = k
+        self.turn_hits = 0
+        self.searches = 0
+
+
+    @contextmanager
+    def turn(self):
+        """Scope one agent turn: searches inside it are memoized until it ends."""
+
+        token = _turn_results.set({})
+
+        try:
+            yield self
+        finally:
+            _turn_results.reset(token)
+
+
+    def search(self, query: str, k: Optional[int] = None, filter: Optional[dict] = None) -> list:
+        """
+        Retrieve the documents most similar to a query.
+
+        Args:
+            query (str): The query text.
+            k (int): Number of documents to retrieve (defaults to the retriever's k).
+            filter (dict): Optional metadata filter passed to the vector store.
+
+        Returns:
+            list: The retrieved LangChain Documents.
+        """
+
+        k = k or self.k
+        key = (normalize_query(query), k, json.dumps(filter, sort_keys=True) if filter else None)
+
+        turn_results = _turn_results.get()
+
+        if turn_results is not None and key in turn_results:
+            self.turn_hits += 1
+            return list(turn_results[key])
+
+        documents = self.cache.get(key) if self.cache is not None else None
+
+        if documents is None:
+            documents = self._search(query, k, filter)
+            self.searches += 1
+
+            if self.cache is not None:
+                self.cache.set(key, documents)
+
+        if turn_results is not None:
+            turn_results[key] = documents
+
+        return list(documents)
+
+
+    def _search(self, query: str, k: int, filter: Optional[dict]) -> list:
+        return self.vector_store.similarity_search(query, k=k, filter=filter)
+
+
+    def invalidate(self) -> None:
+        """Forget cached results, e.g. after documents were added to or removed from the store."""
+
+        if self.cache is not None:
+            self.cache.clear()
+
+
+    def stats(self) -> dict:
+        """Return retrieval counters: searches run, per-turn reuses and cross-turn cache hits/misses."""
+
+        return {
+            "searches": self.searches,
+            "turn_hits": self.turn_hits,
+            "cache_hits": self.cache.hits if self.cache is not None else 0,
+            "cache_misses": self.cache.misses if self.cache is not None else 0,
+        }
+
+
+def tokenize(text: str) -> list:
+    """Split text into lowercase word tokens for keyword search."""
+    return re.findall(r"\w+", text.casefold())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough number of LLM tokens in a text (about four characters per token for English)."""
+    return math.ceil(len(text) / 4)
+
+
+class BM25Index:
+    """
+    In-memory inverted index scored with Okapi BM25.
+
+    Built from the documents already in the vector store, so exact terms such
+    as section names ("Referees", "Publications") can be matched even when
+    the dense embedding does not rank them highly.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.ids: list = []
+        self.texts: list = []
+        self.metadatas: list = []
+
+        self._postings: dict = {}
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._avg_length = 0.0
+
+
+    def build(self, ids: list, texts: list, metadatas: list) -> None:
+        """
+        (Re)build the index.
+
+        Args:
+            ids (list): Document ids.
+            texts (list): Document texts.
+            metadatas (list): Document metadata dicts.
+        """
+
+        texts = [text or "" for text in texts]
+        metadatas = [metadata or {} for metadata in metadatas]
+
+        postings = defaultdict(lambda: ([], []))
+        lengths = []
+
+        for i, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+
+            for term, count in Counter(tokens).items():
+                postings[term][0].append(i)
+                postings[term][1].append(count)
+
+        n = len(texts)
+
+        # each term keeps its idf, the documents containing it and its frequency in each.
+        self._postings = {
+            term: (
+                math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5)),
+                np.array(docs, dtype=np.int64),
+                np.array(counts, dtype=np.float32),
+            )
+            for term, (docs, counts) in postings.items()
+        }
+
+        self.ids, self.texts, self.metadatas = list(ids), list(texts), list(metadatas)
+        self._lengths = np.array(lengths, dtype=np.float32)
+        self._avg_length = float(self._lengths.mean()) if n else 0.0
+
+
+    @classmethod
+    def from_vector_store(cls, vector_store, **kwargs) -> "BM25Index":
+        """Build an index over every document in a Chroma vector store."""
+
+        index = cls(**kwargs)
+        stored = vector_store.get(include=["documents", "metadatas"])
+        index.build(stored["ids"], stored["documents"], stored["metadatas"])
+
+        return index
+
+
+    def search(self, query: str, k: int, filter: Optional[dict] = None) -> list:
+        """
+        Rank documents against a query.
+
+        Args:
+            query (str): The query text.
+            k (int): Maximum number of results.
+            filter (dict): Optional metadata filter; only plain {"key": value} equality is supported.
+
+        Returns:
+            list: `(position, score)` pairs for documents matching at least one query term, best first.
+        """
+
+        if not self.ids:
+            return []
+
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+
+            if posting is None:
+                continue
+
+            idf, docs, counts = posting
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[docs] / self._avg_length)
+            scores[docs] += idf * counts * (self.k1 + 1) / (counts + norm)
+
+        if filter:
+            for i, metadata in enumerate(self.metadatas):
+                if any(metadata.get(key) != value for key, value in filter.items()):
+                    scores[i] = 0
+
+        candidates = np.flatnonzero(scores)
+
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [(int(i), float(scores[i])) for i in order]
+
+
+    def document(self, position: int) -> Document:
+        return Document(id=self.ids[position], page_content=self.texts[position], metadata=self.metadatas[position])
+
+
+def _boundary_overlap(left: str, right: str, max_overlap: int) -> int:
+    """Length of the longest suffix of `left` that is also a prefix of `right` (at most `max_overlap`)."""
+
+    for size in range(min(max_overlap, len(left), len(right)), 0, -1):
+        if left.endswith(right[:size]):
+            return size
+
+    return 0
+
+
+def dedupe_overlaps(documents: list, max_overlap: int = 40, min_overlap: int = 8) -> list:
+    """
+    Remove text repeated between chunks of the same source.
+
+    Chunks contained in an already kept chunk are dropped, and the text a
+    chunk shares with a neighbouring kept chunk (chunk_data's overlap) is
+    trimmed from its start or end. A chunk trimmed at its start gets its
+    "start_index" moved along, so it can still be stitched to its neighbours.
+
+    Args:
+        documents (list): LangChain Documents in rank order.
+        max_overlap (int): Longest boundary overlap looked for, in characters.
+        min_overlap (int): Shortest boundary overlap that is trimmed.
+
+    Returns:
+        list: The kept Documents, in the same order (trimmed ones are copies).
+    """
+
+    kept = []
+
+    for document in documents:
+        text = document.page_content
+        source = document.metadata.get("source")
+        neighbours = [other.page_content for other in kept if other.metadata.get("source") == source]
+
+        if any(text in other for other in neighbours):
+            continue
+
+        # characters cut from the start of the chunk.
+        offset = 0
+
+        for other in neighbours:
+            head = _boundary_overlap(other, text, max_overlap)
+            if head >= min_overlap:
+                text = text[head:]
+                offset += head
+
+            tail = _boundary_overlap(text, other, max_overlap)
+            if tail >= min_overlap:
+                text = text[:-tail]
+
+        if not text.strip():
+            continue
+
+        if text != document.page_content:
+            metadata = document.metadata
+
+            # the text is not stripped, so it still starts at start_index and ends where its neighbour begins.
+            if offset and metadata.get("start_index") is not None:
+                metadata = {**metadata, "start_index": metadata["start_index"] + offset}
+
+            document = Document(id=document.id, page_content=text, metadata=metadata)
+
+        kept.append(document)
+
+    return kept
+
+
+class HybridRetriever(Retriever):
+    """
+    Retriever that fuses BM25 keyword ranking with dense vector ranking.
+
+    Both rankings fetch `fetch_k` candidates, which are merged with
+    reciprocal rank fusion, stripped of overlapping text and packed, best
+    first, into at most `k` chunks and `max_tokens` estimated tokens. This
+    gives a smaller, more precise context than raising k on dense search.
+    The keyword index is built from the vector store on first use and
+    rebuilt after `invalidate()`.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        cache: Optional[QueryCache] = None,
+        k: int = 5,
+        fetch_k: int = 20,
+        rrf_k: int = 60,
+        max_tokens: Optional[int] = 1000,
+    ):
+        """
+        Args:
+            vector_store: A LangChain Chroma vector store.
+            cache (QueryCache): Cross-turn result cache.
+            k (int): Default maximum number of chunks returned.
+            fetch_k (int): Candidates taken from each ranking before fusion.
+            rrf_k (int): Reciprocal rank fusion constant; larger values flatten the rank weights.
+            max_tokens (int): Estimated token budget for the returned chunks (None for no cap).
+        """
+
+        super().__init__(vector_store, cache=cache, k=k)
+
+        self.fetch_k = fetch_k
+        self.rrf_k = rrf_k
+        self.max_tokens = max_tokens
+
+        self._index: Optional[BM25Index] = None
+        self._index_lock = threading.Lock()
+
+
+    @property
+    def index(self) -> BM25Index:
+
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = BM25Index.from_vector_store(self.vector_store)
+
+        return self._index
+
+
+    def invalidate(self) -> None:
+
+        with self._index_lock:
+            self._index = None
+
+        super().invalidate()
+
+
+    def _search(self, query: str, k: int, filter: Optional[dict]) -> list:
+
+        fetch_k = max(self.fetch_k, k)
+        scores, documents = defaultdict(float), {}
+
+        dense = self.vector_store.similarity_search(query, k=fetch_k, filter=filter)
+
+        for rank, document in enumerate(dense):
+            id_ = document.id or chunk_id(document)
+            scores[id_] += 1 / (self.rrf_k + rank + 1)
+            documents[id_] = document
+
+        # chroma filters with operators ($and, $in, ...) are left to dense search alone.
+        if not filter or not any(key.startswith("$") for key in filter):
+            # one snapshot of the index: an invalidate() during the search must not mix two indexes.
+            index = self.index
+
+            for rank, (position, _) in enumerate(index.search(query, fetch_k, filter)):
+                id_ = index.ids[position]
+                scores[id_] += 1 / (self.rrf_k + rank + 1)
+                documents.setdefault(id_, index.document(position))
+
+        fused = [documents[id_] for id_ in sorted(scores, key=scores.get, reverse=True)]
+
+        selected, used_tokens = [], 0
+
+        for document in dedupe_overlaps(fused):
+            tokens = estimate_tokens(document.page_content)
+
+            # always keep the best chunk, even if it alone is over the budget.
+            if selected and self.max_tokens is not None and used_tokens + tokens > self.max_tokens:
+                continue
+
+            selected.append(document)
+            used_tokens += tokens
+
+            if len(selected) == k:
+                break
+
+        return selected
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+# session helpers: the per-session turn lock of the http front end and the middleware
+# that keeps a session's history to a fixed window.
+
+
+# import all the necessary libraries, modules or packages.
+# langchain is imported inside history_window, so the servers can import this module cheaply.
+import asyncio
+import weakref
+
+
+class SessionLocks:
+    """One lock per session, so turns of the same conversation run one after another."""
+
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+    def get(self, session_id: str) -> asyncio.Lock:
+
+        lock = self._locks.get(session_id)
+
+        # locks of idle sessions are garbage collected once no request holds them.
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+
+        return lock
+
+
+def history_window(max_messages: int):
+    """
+    Build middleware that trims a conversation to its last `max_messages` messages.
+
+    The trimmed messages are removed from the agent state itself, so neither
+    the prompt nor the stored checkpoint grows with the length of the chat.
+    The kept window always starts at a user message, so tool calls are never
+    separated from their results.
+
+    Args:
+        max_messages (int): Maximum number of messages kept.
+
+    Returns:
+        AgentMiddleware: Middleware to pass to `create_agent`.
+    """
+
+    from langchain.agents.middleware import before_model
+    from langchain_core.messages import RemoveMessage
+    from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+    @before_model
+    def trim_history(state, runtime):
+        messages = state["messages"]
+
+        if len(messages) <= max_messages:
+            return None
+
+        start = len(messages) - max_messages
+        human = [i for i, message in enumerate(messages) if message.type == "human"]
+
+        # start at the first user message inside the window, or the last one before it.
+        start = next((i for i in human if i >= start), human[-1] if human else start)
+
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *messages[start:]]}
+
+    return trim_history
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the agent's modules are imported by plain name, as when it runs from its own directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
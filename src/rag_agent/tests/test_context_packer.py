@@ -0,0 +1,69 @@
+import itertools
+import pytest
+from langchain_core.documents import Document
+from context_packer import ContextPacker, merge_adjacent
+
+
+PAGE = "The quick brown fox jumps over the lazy dog while the cat sleeps on the warm mat."
+
+
+def chunk(start, end, page=0, source="doc.pdf"):
+    return Document(
+        id=f"{source}:{page}:{start}",
+        page_content=PAGE[start:end],
+        metadata={"source": source, "page": page, "start_index": start},
+    )
+
+
+@pytest.mark.parametrize("order", list(itertools.permutations(range(3))))
+def test_overlapping_chunks_merge_into_the_page_text_in_any_order(order):
+
+    chunks = [chunk(0, 30), chunk(25, 60), chunk(55, len(PAGE))]
+
+    passages, merged = merge_adjacent([chunks[i] for i in order])
+
+    assert merged == 2
+    assert [passage.page_content for passage in passages] == [PAGE]
+    assert passages[0].metadata["start_index"] == 0
+
+
+def test_a_chunk_stitched_in_front_moves_the_start_index():
+
+    passages, _ = merge_adjacent([chunk(25, 60), chunk(0, 30)])
+
+    assert passages[0].page_content == PAGE[0:60]
+    assert passages[0].metadata["start_index"] == 0
+    assert passages[0].id == "doc.pdf:0:25"
+
+
+def test_chunks_of_other_pages_are_not_merged():
+
+    passages, merged = merge_adjacent([chunk(0, 30), chunk(25, 60, page=1), chunk(40, 70)])
+
+    assert merged == 0
+    assert len(passages) == 3
+
+
+def test_passages_are_packed_best_first_within_the_budget():
+
+    documents = [chunk(0, 20, source="a"), chunk(0, 20, page=1, source="b"), chunk(40, 80, source="c")]
+    packer = ContextPacker("static:", max_context_tokens=13, min_trimmed_tokens=2, count_tokens=lambda text: len(text.split()))
+
+    prompt, report = packer.pack(documents, scores=[0.1, 0.9, 0.5])
+
+    # "b" then "c" fit whole (4 + 9 tokens); nothing is left for "a".
+    assert prompt == "static:" + PAGE[0:20].strip() + "\n\n" + PAGE[40:80].strip()
+    assert report["context_tokens"] == 13
+    assert report["passages_used"] == 2
+    assert packer.summary()["turns"] == 1
+
+
+def test_the_last_passage_is_trimmed_to_fit():
+
+    packer = ContextPacker("", max_context_tokens=10, min_trimmed_tokens=2, count_tokens=lambda text: len(text.split()))
+
+    prompt, report = packer.pack([chunk(0, len(PAGE))])
+
+    assert report["passages_trimmed"] == 1
+    assert report["context_tokens"] <= 10
+    assert prompt.endswith(" ...")
@@ -0,0 +1,80 @@
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+def test_vectors_round_trip(tmp_path):
+
+    cache = EmbeddingCache(str(tmp_path), max_entries=4)
+    cache.put_many({"a": [1.0, 2.0], "b": [3.0, 4.0]})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": [1.0, 2.0], "b": [3.0, 4.0]}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    cache.close()
+
+
+def test_least_recently_used_vectors_are_evicted(tmp_path):
+
+    cache = EmbeddingCache(str(tmp_path), max_entries=2)
+    cache.put_many({"a": [1.0], "b": [2.0]})
+    cache.get_many(["a"])
+    cache.put_many({"c": [3.0]})
+
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+    cache.close()
+
+
+def test_a_batch_larger_than_the_cache_keeps_its_last_entries(tmp_path):
+
+    cache = EmbeddingCache(str(tmp_path), max_entries=2)
+    cache.put_many({"a": [1.0], "b": [2.0], "c": [3.0], "d": [4.0]})
+    cache.close()
+
+    # the evicted rows must not survive in the index either.
+    cache = EmbeddingCache(str(tmp_path), max_entries=2)
+
+    assert len(cache) == 2
+    assert cache.get_many(["a", "b", "c", "d"]) == {"c": [3.0], "d": [4.0]}
+
+    cache.close()
+
+
+def test_vectors_persist_across_reopen(tmp_path):
+
+    cache = EmbeddingCache(str(tmp_path), max_entries=4)
+    cache.put_many({"a": [0.5, 0.25]})
+    cache.close()
+
+    cache = EmbeddingCache(str(tmp_path), max_entries=4)
+    assert cache.get_many(["a"]) == {"a": [0.5, 0.25]}
+    cache.close()
+
+    # another capacity means another file layout, so the cache starts empty.
+    cache = EmbeddingCache(str(tmp_path), max_entries=8)
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_cached_embeddings_call_the_model_once_per_text(tmp_path):
+
+    class CountingEmbedding(DeterministicFakeEmbedding):
+        calls: int = 0
+
+        def embed_documents(self, texts):
+            self.calls += len(texts)
+            return super().embed_documents(texts)
+
+    model = CountingEmbedding(size=8)
+    cache = EmbeddingCache(str(tmp_path), max_entries=16)
+    embeddings = CachedEmbeddings(model, cache)
+
+    first = embeddings.embed_documents(["x", "y", "x"])
+    second = embeddings.embed_documents(["y", "x"])
+
+    assert model.calls == 2
+    # cached vectors are stored as float32.
+    assert np.allclose(second, [first[1], first[0]], atol=1e-6)
+
+    cache.close()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import json
+import time
+import sqlite3
+import threading
+from typing import List, Optional
+
+
+class ApprovalQueue:
+    """
+    Durable queue of tool calls waiting for a human decision.
+
+    When the agent pauses on a human-in-the-loop interrupt, the run ends and
+    its state stays in the checkpoint; the interrupt is recorded here, so no
+    worker thread waits for the reviewer. A decision later resumes the run
+    from the checkpoint, in any worker and after a restart alike. An approval
+    can be decided once: `claim` moves it out of "pending" atomically.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Args:
+            path (str): SQLite file of the queue (can be the checkpoint file).
+        """
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+        with self._lock, self.conn:
+            if path != ":memory:":
+                self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS approvals (
+                    id TEXT PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    actions TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    created_at REAL NOT NULL,
+                    decided_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS approvals_status ON approvals (status, created_at);
+                CREATE INDEX IF NOT EXISTS approvals_session ON approvals (session_id, status);
+                """
+            )
+
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[dict]:
+        if row is None:
+            return None
+        return {**dict(row), "actions": json.loads(row["actions"])}
+
+
+    def add(self, approval_id: str, session_id: str, actions: list) -> None:
+        """
+        Record a pending approval.
+
+        Adding a pending approval again is a no-op. A decided one is reopened:
+        its interrupt is still in the checkpoint, so the process that claimed
+        it stopped before the run was resumed.
+
+        Args:
+            approval_id (str): The interrupt id.
+            session_id (str): The conversation that is paused.
+            actions (list): The tool calls to review: name, args and description each.
+        """
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO approvals (id, session_id, actions, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET status = 'pending', decided_at = NULL WHERE status != 'pending'",
+                (approval_id, session_id, json.dumps(actions, default=str), time.time()),
+            )
+
+
+    def get(self, approval_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._row(self.conn.execute("SELECT * FROM approvals WHERE id = ?", (approval_id,)).fetchone())
+
+
+    def pending(self, session_id: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """
+        List pending approvals, oldest first.
+
+        Args:
+            session_id (str): Only this conversation's approvals (all when omitted).
+            limit (int): Most approvals returned.
+
+        Returns:
+            List[dict]: The approvals.
+        """
+
+        with self._lock:
+            if session_id is None:
+                rows = self.conn.execute(
+                    "SELECT * FROM approvals WHERE status = 'pending' ORDER BY created_at LIMIT ?", (limit,)
+                )
+            else:
+                rows = self.conn.execute(
+                    "SELECT * FROM approvals WHERE session_id = ? AND status = 'pending' ORDER BY created_at LIMIT ?",
+                    (session_id, limit),
+                )
+            return [self._row(row) for row in rows.fetchall()]
+
+
+    def claim(self, approval_id: str, status: str) -> bool:
+        """
+        Mark a pending approval as decided.
+
+        Args:
+            approval_id (str): The approval.
+            status (str): The decision ("approve", "edit" or "reject").
+
+        Returns:
+            bool: False if the approval does not exist or was decided already.
+        """
+
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE approvals SET status = ?, decided_at = ? WHERE id = ? AND status = 'pending'",
+                (status, time.time(), approval_id),
+            )
+            return cursor.rowcount == 1
+
+
+    def release(self, approval_id: str) -> None:
+        """Put a claimed approval back in the queue, e.g. when resuming the run failed."""
+
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE approvals SET status = 'pending', decided_at = NULL WHERE id = ?", (approval_id,))
+
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT count(*) FROM approvals WHERE status = 'pending'").fetchone()[0]
+
+
+    def close(self) -> None:
+        self.conn.close()
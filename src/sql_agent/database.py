@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import sqlite3
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import SQLAlchemyError
+from langchain_community.utilities import SQLDatabase
+from langchain_community.utilities.sql_database import truncate_word
+from query_cache import QueryResultCache, database_file, file_stamp
+from engine import ReadOnlyEngine
+from preflight import Preflight, PreflightError
+
+
+class AgentDatabase(SQLDatabase):
+    """
+    SQLDatabase whose query results are cached and, for SQLite files, run read-only.
+
+    The toolkit's sql_db_query tool calls `run`, so repeated or equivalent
+    SELECTs, from any session, are answered from the cache without touching
+    the database. The cache is emptied when the database file changes. Other
+    statements are checked by `preflight`, if set, and go through `executor`,
+    a pool of read-only connections with time, row and byte limits, when one
+    is set.
+    """
+
+    def __init__(
+        self,
+        *args,
+        result_cache: Optional[QueryResultCache] = None,
+        result_cache_bytes: int = 32 * 1024 * 1024,
+        executor: Optional[ReadOnlyEngine] = None,
+        preflight: Optional[Preflight] = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            *args, **kwargs: Passed on to SQLDatabase.
+            result_cache (QueryResultCache): Cache to use, e.g. one shared with another database object.
+            result_cache_bytes (int): Size bound of the cache created when none is given; 0 disables caching.
+            executor (ReadOnlyEngine): Runs the agent's queries; SQLAlchemy's engine is used when omitted.
+            preflight (Preflight): Checks the agent's queries before they run (see `enable_preflight`).
+        """
+
+        super().__init__(*args, **kwargs)
+
+        self.path = database_file(self._engine)
+        self.executor = executor
+        self.preflight = preflight
+
+        if result_cache is None and result_cache_bytes:
+            result_cache = QueryResultCache(result_cache_bytes, stamp=lambda: file_stamp(self.path))
+
+        self.result_cache = result_cache
+
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        pool_size: int = 8,
+        timeout_seconds: float = 10.0,
+        max_rows: int = 500,
+        max_bytes: int = 256 * 1024,
+        **kwargs,
+    ) -> "AgentDatabase":
+        """
+        Open a SQLite file read-only, for the agent's queries and for schema inspection alike.
+
+        Args:
+            path (str): The database file.
+            pool_size (int): Most queries running at once, across sessions.
+            timeout_seconds (float): Wall-clock limit of one query.
+            max_rows (int): Most rows returned by one query.
+            max_bytes (int): Most bytes of values returned by one query.
+            **kwargs: Passed on to AgentDatabase (e.g. result_cache_bytes, sample_rows_in_table_info).
+
+        Returns:
+            AgentDatabase: The database.
+        """
+
+        executor = ReadOnlyEngine(path, pool_size, timeout_seconds, max_rows, max_bytes)
+
+        # the schema inspection and sample queries of SQLDatabase get read-only connections too.
+        engine = create_engine(f"sqlite:///{executor.uri}&uri=true")
+
+        @event.listens_for(engine, "connect")
+        def set_query_only(connection, _):
+            connection.execute("PRAGMA query_only = ON")
+            connection.setlimit(sqlite3.SQLITE_LIMIT_ATTACHED, 0)
+
+        return cls(engine, executor=executor, **kwargs)
+
+
+    def enable_preflight(self, catalog, large_table_rows: int = 100_000) -> Preflight:
+        """
+        Check queries against a schema catalog of this database before running them.
+
+        Args:
+            catalog (SchemaCatalog): The catalog, built from this database.
+            large_table_rows (int): Row count from which full table scans are flagged.
+
+        Returns:
+            Preflight: The pre-flight stage, also set as `preflight`.
+        """
+
+        if self.executor is None:
+            raise ValueError("pre-flight checks need a read-only executor; open the database with from_file")
+
+        self.preflight = Preflight(catalog, self.executor.connection, large_table_rows)
+        return self.preflight
+
+
+    def _execute_read_only(self, command: str, fetch: str, include_columns: bool) -> str:
+        """Run a statement through the executor and format it like SQLDatabase.run."""
+
+        result = self.executor.execute(command)
+        rows = result.rows[:1] if fetch == "one" else result.rows
+
+        rows = [tuple(truncate_word(value, length=self._max_string_length) for value in row) for row in rows]
+
+        if include_columns:
+            rows = [dict(zip(result.columns, row)) for row in rows]
+
+        output = str(rows) if rows else ""
+
+        if result.truncated == "rows":
+            output += f"\n(truncated to the first {len(rows)} rows; add a LIMIT or aggregate)"
+        elif result.truncated == "bytes":
+            output += f"\n(truncated after {len(rows)} rows, the result exceeds {self.executor.max_bytes} bytes; select fewer columns or rows)"
+
+        return output
+
+
+    def run(self, command, fetch="all", include_columns=False, *, parameters=None, execution_options=None):
+        """Execute a SQL command like SQLDatabase.run, answering repeated SELECTs from the cache."""
+
+        plain = isinstance(command, str) and fetch != "cursor" and not parameters and not execution_options
+
+        if not plain:
+            return super().run(command, fetch, include_columns, parameters=parameters, execution_options=execution_options)
+
+        def execute():
+            warnings = self.preflight.check(command) if self.preflight is not None else []
+
+            if self.executor is not None:
+                result = self._execute_read_only(command, fetch, include_columns)
+            else:
+                result = super(AgentDatabase, self).run(command, fetch, include_columns)
+
+            if warnings:
+                result += "".join(f"\n(warning: {warning})" for warning in warnings)
+
+            return result
+
+        cache = self.result_cache
+        key = cache.key(command, fetch, include_columns) if cache is not None else None
+
+        if key is None:
+            return execute()
+
+        found, result, stamp = cache.get(key)
+
+        if not found:
+            result = execute()
+            cache.put(key, result, stamp)
+
+        return result
+
+
+    def run_no_throw(self, command, fetch="all", include_columns=False, *, parameters=None, execution_options=None):
+        """Like SQLDatabase.run_no_throw, also returning pre-flight and executor errors (timeouts, writes) as messages."""
+
+        try:
+            return self.run(command, fetch, include_columns, parameters=parameters, execution_options=execution_options)
+        except (SQLAlchemyError, sqlite3.Error, PreflightError) as e:
+            return f"Error: {e}"
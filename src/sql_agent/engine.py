@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import os
+import time
+import queue
+import sqlite3
+import threading
+import urllib.parse
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+
+
+class QueryTimeout(sqlite3.OperationalError):
+    """Raised when a query runs past the engine's time limit."""
+
+
+class QueryResult(NamedTuple):
+    columns: list
+    rows: list
+    # why the rows were cut short ("rows" or "bytes"), or None if the result is complete.
+    truncated: Optional[str]
+
+
+def read_only_uri(path: str) -> str:
+    """
+    SQLite URI opening a database file read-only.
+
+    Args:
+        path (str): The database file.
+
+    Returns:
+        str: A "file:" URI with mode=ro, for sqlite3.connect(..., uri=True).
+    """
+
+    return f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+
+
+# authorizer actions a query may use; pragmas, attach, transactions and every write are denied.
+READ_ACTIONS = frozenset({sqlite3.SQLITE_READ, sqlite3.SQLITE_SELECT, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE})
+
+
+def authorize_read(action, first, second, database, source) -> int:
+    """SQLite authorizer allowing only reads (SQLite does not consult it while loading the schema)."""
+
+    return sqlite3.SQLITE_OK if action in READ_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def _row_size(row: tuple) -> int:
+    return sum(len(value) if isinstance(value, (str, bytes)) else 8 for value in row)
+
+
+class ReadOnlyEngine:
+    """
+    Pool of read-only SQLite connections that run queries under time and size limits.
+
+    Connections are opened with mode=ro and PRAGMA query_only, and keep an
+    authorizer that denies every write, PRAGMA, ATTACH and DETACH, with the
+    limit of attached databases set to 0; mode=ro alone does not stop a
+    statement from attaching (and creating) another file, and query_only can
+    be switched off by a pragma. At most `pool_size` queries run at
+    once; idle connections are reused across sessions. A progress handler
+    aborts a query once it has run for `timeout_seconds`, and rows are fetched
+    in batches of `fetch_size` until `max_rows` or `max_bytes` is reached, so a
+    runaway join neither holds a worker nor fills memory.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = 8,
+        timeout_seconds: float = 10.0,
+        max_rows: int = 500,
+        max_bytes: int = 256 * 1024,
+        fetch_size: int = 100,
+        check_every: int = 1000,
+    ):
+        """
+        Args:
+            path (str): The database file.
+            pool_size (int): Most connections open (and queries running) at once.
+            timeout_seconds (float): Wall-clock limit of one query, fetching included.
+            max_rows (int): Most rows returned by one query.
+            max_bytes (int): Most bytes of values returned by one query.
+            fetch_size (int): Rows fetched from SQLite per batch.
+            check_every (int): SQLite virtual machine steps between two timeout checks.
+        """
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+
+        self.path = path
+        self.uri = read_only_uri(path)
+        self.pool_size = pool_size
+        self.timeout_seconds = timeout_seconds
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.fetch_size = fetch_size
+        self.check_every = check_every
+
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+        self.queries = 0
+        self.timeouts = 0
+        self.truncations = 0
+
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        connection.execute("PRAGMA query_only = ON")
+        connection.setlimit(sqlite3.SQLITE_LIMIT_ATTACHED, 0)
+        connection.set_authorizer(authorize_read)
+        return connection
+
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection from the pool, waiting while all `pool_size` are in use.
+
+        A borrower may install its own authorizer (e.g. Preflight); the
+        read-only one is put back when the connection returns to the pool.
+        """
+
+        self._slots.acquire()
+
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+
+            try:
+                yield connection
+            finally:
+                connection.set_authorizer(authorize_read)
+                self._idle.put(connection)
+
+        finally:
+            self._slots.release()
+
+
+    def execute(self, sql: str, parameters=()) -> QueryResult:
+        """
+        Run one statement within the time, row and byte limits.
+
+        Args:
+            sql (str): The statement.
+            parameters: Values for its placeholders.
+
+        Returns:
+            QueryResult: Column names, rows and whether (and why) the rows were truncated.
+
+        Raises:
+            QueryTimeout: If the query ran past `timeout_seconds`.
+            sqlite3.Error: For invalid statements, and any attempt to write, attach or change a pragma.
+        """
+
+        deadline = time.monotonic() + self.timeout_seconds
+
+        def past_deadline() -> int:
+            # a non-zero return makes sqlite abort the running statement.
+            return int(time.monotonic() > deadline)
+
+        with self.connection() as connection:
+            connection.set_progress_handler(past_deadline, self.check_every)
+            cursor = connection.cursor()
+
+            try:
+                cursor.execute(sql, parameters)
+                columns = [description[0] for description in cursor.description or ()]
+                rows, size, truncated = [], 0, None
+
+                while truncated is None:
+                    batch = cursor.fetchmany(self.fetch_size)
+
+                    if not batch:
+                        break
+
+                    for row in batch:
+                        if len(rows) == self.max_rows:
+                            truncated = "rows"
+                            break
+
+                        size += _row_size(row)
+                        if size > self.max_bytes:
+                            truncated = "bytes"
+                            break
+
+                        rows.append(row)
+
+            except sqlite3.OperationalError as e:
+                if time.monotonic() > deadline and "interrupt" in str(e):
+                    self.timeouts += 1
+                    raise QueryTimeout(f"query cancelled after {self.timeout_seconds}s; narrow it down or aggregate") from e
+                raise
+
+            finally:
+                cursor.close()
+                connection.set_progress_handler(None, 0)
+
+        self.queries += 1
+        if truncated:
+            self.truncations += 1
+
+        return QueryResult(columns, rows, truncated)
+
+
+    def close(self) -> None:
+        """Close the idle connections."""
+
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "idle_connections": self._idle.qsize(),
+            "queries": self.queries,
+            "timeouts": self.timeouts,
+            "truncations": self.truncations,
+        }
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import re
+import json
+import time
+import difflib
+import sqlite3
+import threading
+from collections import Counter
+from typing import Callable, List, Optional
+from query_cache import normalize_sql
+from schema_catalog import SchemaCatalog
+
+
+# authorizer actions a read-only query needs; everything else (writes, pragmas, attach, ...) is denied.
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_READ, sqlite3.SQLITE_SELECT, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+# names of authorizer actions, for error messages.
+_ACTION_NAMES = {
+    getattr(sqlite3, name): name[len("SQLITE_"):].lower().replace("_", " ")
+    for name in dir(sqlite3)
+    if name.startswith(("SQLITE_CREATE", "SQLITE_DROP", "SQLITE_ALTER"))
+    or name in ("SQLITE_INSERT", "SQLITE_UPDATE", "SQLITE_DELETE", "SQLITE_PRAGMA", "SQLITE_ATTACH", "SQLITE_DETACH",
+                "SQLITE_TRANSACTION", "SQLITE_SAVEPOINT", "SQLITE_ANALYZE", "SQLITE_REINDEX")
+}
+
+# schema tables a query may read besides the catalog's tables.
+_SCHEMA_TABLES = {"sqlite_master", "sqlite_schema", "sqlite_temp_master", "sqlite_temp_schema"}
+
+# words that can follow a table name in a FROM clause without being its alias.
+_NOT_ALIASES = {
+    "where", "join", "inner", "left", "right", "full", "outer", "cross", "natural", "on", "using", "group",
+    "order", "limit", "having", "union", "intersect", "except", "window", "indexed", "not",
+}
+
+_NO_SUCH = re.compile(r"no such (table|column): (?:\w+\.)?(\S+)")
+
+# full scans in the query plan: "SCAN Track" since SQLite 3.36, "SCAN TABLE Track" before.
+_SCAN = re.compile(r"SCAN (?:TABLE )?(\S+)")
+
+# table-valued functions in a normalized statement, e.g. "from pragma_table_info ( ? )".
+_TABLE_FUNCTION = re.compile(r"(?:from|join|,) (\w+) \(")
+
+
+class PreflightError(ValueError):
+    """
+    A query rejected before execution.
+
+    The message is JSON with an "error" code, a "message" and a "hint" the
+    agent can use to fix the query without another round-trip.
+    """
+
+    def __init__(self, code: str, message: str, hint: str = ""):
+        self.code = code
+        self.message = message
+        self.hint = hint
+        super().__init__(json.dumps({"error": code, "message": message, "hint": hint}))
+
+
+class Preflight:
+    """
+    Checks a query locally before it runs, in place of an LLM query checker.
+
+    The statement must be a single SELECT (or WITH ... SELECT). SQLite then
+    compiles it with EXPLAIN QUERY PLAN, which parses the statement and
+    resolves every table and column without running it; an authorizer allows
+    only reads, and only of the catalog's tables. Parse and name errors come
+    back as a PreflightError with suggestions from the catalog. Full scans of
+    tables with at least `large_table_rows` rows are returned as warnings.
+    """
+
+    def __init__(self, catalog: SchemaCatalog, connection: Callable, large_table_rows: int = 100_000):
+        """
+        Args:
+            catalog (SchemaCatalog): Schema the identifiers are checked against.
+            connection (Callable): Context manager factory lending a sqlite3 connection, e.g. ReadOnlyEngine.connection.
+            large_table_rows (int): Row count from which a full table scan is flagged.
+        """
+
+        self.catalog = catalog
+        self.connection = connection
+        self.large_table_rows = large_table_rows
+
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.seconds = 0.0
+        self.rejections: Counter = Counter()
+        self.warnings = 0
+
+
+    def _hint(self, kind: str, name: str) -> str:
+        """Suggest catalog names close to an unknown table or column."""
+
+        tables = self.catalog.tables
+        name = name.strip("\"'`[]")
+
+        if kind == "table":
+            by_lower = {table.lower(): table for table in tables}
+            matches = [by_lower[match] for match in difflib.get_close_matches(name.lower(), list(by_lower), n=3, cutoff=0.5)]
+            hint = f"Did you mean {', '.join(matches)}? " if matches else ""
+            return hint + f"Available tables: {', '.join(tables)}."
+
+        columns = {f"{table}.{column[0]}": column[0].lower() for table, entry in tables.items() for column in entry["columns"]}
+        matches = [qualified for qualified, column in columns.items()
+                   if column in difflib.get_close_matches(name.lower(), set(columns.values()), n=3, cutoff=0.6)]
+
+        if matches:
+            return f"Did you mean {', '.join(matches[:5])}? Check the table aliases too."
+        return "Check the column names in the schema (sql_db_schema) and the table aliases."
+
+
+    def _aliases(self, template: str) -> dict:
+        """Map the aliases of catalog tables in a normalized statement to the tables."""
+
+        tables = {table.lower(): table for table in self.catalog.tables}
+        tokens = template.split(" ")
+        aliases = {}
+
+        for i, token in enumerate(tokens[:-1]):
+            if token not in ("from", "join", ","):
+                continue
+
+            table = tables.get(tokens[i + 1].strip("\"`[]"))
+            if table is None:
+                continue
+
+            aliases[table.lower()] = table
+
+            following = tokens[i + 2:i + 4]
+            if following[:1] == ["as"]:
+                following = following[1:]
+            if following and re.fullmatch(r"\w+|\"[^\"]+\"", following[0]) and following[0] not in _NOT_ALIASES:
+                aliases[following[0].strip("\"")] = table
+
+        return aliases
+
+
+    def check(self, sql: str) -> List[str]:
+        """
+        Validate a query and inspect its plan.
+
+        Args:
+            sql (str): The query.
+
+        Returns:
+            List[str]: Warnings about the plan (empty when the query looks cheap).
+
+        Raises:
+            PreflightError: If the query is not a single read-only SELECT over known tables and columns.
+        """
+
+        start = time.perf_counter()
+
+        try:
+            warnings = self._check(sql)
+        except PreflightError as e:
+            with self._lock:
+                self.rejections[e.code] += 1
+            raise
+        finally:
+            with self._lock:
+                self.checks += 1
+                self.seconds += time.perf_counter() - start
+
+        with self._lock:
+            self.warnings += len(warnings)
+
+        return warnings
+
+
+    def _check(self, sql: str) -> List[str]:
+
+        template, _ = normalize_sql(sql)
+
+        if not template:
+            raise PreflightError("empty_query", "The query is empty.")
+
+        if ";" in template.split(" "):
+            raise PreflightError("multiple_statements", "Only one statement can run at a time.", "Send each query separately.")
+
+        if template.split(" ", 1)[0] not in ("select", "with", "values"):
+            raise PreflightError(
+                "not_select",
+                f"Only SELECT queries are allowed, got {template.split(' ', 1)[0].upper()}.",
+                "The database is read-only; rephrase the request as a SELECT.",
+            )
+
+        self.catalog.refresh_if_stale()
+        tables = self.catalog.tables
+        denied, unknown, table_functions = [], [], []
+
+        def authorize(action, first, second, database, source):
+            # a table-valued function (pragma_table_info, json_each, ...) is first registered in the schema table.
+            if action == sqlite3.SQLITE_UPDATE and first.lower() in _SCHEMA_TABLES and not denied:
+                table_functions.append(first)
+                return sqlite3.SQLITE_DENY
+
+            if action not in _ALLOWED_ACTIONS:
+                denied.append(_ACTION_NAMES.get(action, f"action {action}"))
+                return sqlite3.SQLITE_DENY
+
+            if action == sqlite3.SQLITE_READ and first not in tables and first.lower() not in _SCHEMA_TABLES:
+                unknown.append(first)
+                return sqlite3.SQLITE_DENY
+
+            return sqlite3.SQLITE_OK
+
+        with self.connection() as connection:
+            connection.set_authorizer(authorize)
+
+            try:
+                plan = connection.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+
+            except sqlite3.DatabaseError as e:
+                if table_functions and not denied:
+                    match = _TABLE_FUNCTION.search(template)
+                    name = match.group(1) if match else "table-valued function"
+                    raise PreflightError(
+                        "table_function",
+                        f"Table-valued functions such as {name} are not allowed.",
+                        "Read the columns from the schema (sql_db_schema) and query the tables themselves.",
+                    ) from e
+                if denied:
+                    raise PreflightError("not_allowed", f"The query needs {denied[0]} permission.", "Only reads are allowed.") from e
+                if unknown:
+                    raise PreflightError("unknown_table", f"no such table: {unknown[0]}", self._hint("table", unknown[0])) from e
+
+                match = _NO_SUCH.search(str(e))
+                if match:
+                    kind, name = match.groups()
+                    raise PreflightError(f"unknown_{kind}", str(e), self._hint(kind, name)) from e
+
+                raise PreflightError("invalid_query", str(e), "Fix the SQL syntax near the quoted token.") from e
+
+            finally:
+                connection.set_authorizer(None)
+
+        aliases = self._aliases(template)
+        warnings = []
+
+        for _, _, _, detail in plan:
+            match = _SCAN.match(detail)
+
+            if not match or " USING " in detail:
+                continue
+
+            name = match.group(1)
+            table = name if name in tables else aliases.get(name.lower())
+            rows = tables[table]["rows"] if table else 0
+
+            if rows >= self.large_table_rows:
+                indexed = ", ".join(sorted(tables[table]["indexed"])) or "none"
+                warnings.append(
+                    f"full scan of {table} ({rows} rows); filter or join on an indexed column "
+                    f"({indexed}) or aggregate if the query is slow or cut short"
+                )
+
+        return warnings
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checks": self.checks,
+                "mean_microseconds": round(self.seconds / self.checks * 1e6, 1) if self.checks else 0.0,
+                "rejections": dict(self.rejections),
+                "warnings": self.warnings,
+            }
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import os
+import re
+import threading
+import urllib.parse
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+# sql tokens: comments, string literals, quoted identifiers, numbers, words, and any other single character.
+_SQL_TOKEN = re.compile(
+    r"(?P<comment>--[^\n]*|/\*.*?\*/)"
+    r"|(?P<string>'(?:[^']|'')*')"
+    r"|(?P<identifier>\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\])"
+    r"|(?P<number>(?<![\w.])(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?(?![\w.]))"
+    r"|(?P<word>[^\W\d]\w*)"
+    r"|(?P<space>\s+)"
+    r"|(?P<other>.)",
+    re.DOTALL,
+)
+
+
+# statements that write, or change what later statements see, even inside a WITH (e.g. "WITH d AS (...) DELETE").
+_WRITE_KEYWORDS = frozenset({
+    "insert", "update", "delete", "create", "drop", "alter", "attach", "detach",
+    "pragma", "vacuum", "reindex", "analyze",
+})
+
+# functions whose result differs between calls with the same arguments.
+_VOLATILE_FUNCTIONS = frozenset({"random", "randomblob", "changes", "last_insert_rowid", "total_changes"})
+_VOLATILE_KEYWORDS = frozenset({"current_date", "current_time", "current_timestamp"})
+
+# date functions read the clock when called without arguments or with 'now'.
+_DATE_FUNCTIONS = frozenset({"date", "time", "datetime", "julianday", "strftime", "unixepoch", "timediff"})
+
+
+def is_deterministic_read(sql: str) -> bool:
+    """
+    Whether a statement only reads, and returns the same rows as long as the data does not change.
+
+    Args:
+        sql (str): The statement.
+
+    Returns:
+        bool: False if it writes (anywhere, e.g. after a WITH clause) or reads the clock or a random source.
+    """
+
+    tokens = [
+        (match.lastgroup, match.group())
+        for match in _SQL_TOKEN.finditer(sql)
+        if match.lastgroup not in ("comment", "space")
+    ]
+
+    for i, (kind, token) in enumerate(tokens):
+        following = tokens[i + 1][1] if i + 1 < len(tokens) else None
+
+        if kind == "string" and token[1:-1].strip().casefold() == "now":
+            return False
+        if kind != "word":
+            continue
+
+        word = token.casefold()
+
+        # replace() is also a string function; only "replace into" writes.
+        if word in _WRITE_KEYWORDS or (word == "replace" and following != "("):
+            return False
+        if word in _VOLATILE_KEYWORDS or (word in _VOLATILE_FUNCTIONS and following == "("):
+            return False
+        if word in _DATE_FUNCTIONS and following == "(" and i + 2 < len(tokens) and tokens[i + 2][1] == ")":
+            return False
+
+    return True
+
+
+def normalize_sql(sql: str) -> tuple:
+    """
+    Reduce a statement to a template and its literals.
+
+    Comments are dropped, whitespace is collapsed, keywords and identifiers are
+    case folded (SQLite compares identifiers without case) and every string or
+    number literal is replaced by "?". String literals keep their case, since
+    'Rock' and 'rock' select different rows, and number literals keep their
+    source text, since 10 and 10.0 give different results (10 / 4 is 2 while
+    10.0 / 4 is 2.5) even though they compare equal in Python.
+
+    Args:
+        sql (str): The statement.
+
+    Returns:
+        tuple: The template (str) and the literals (tuple), in order: strings as their value,
+        numbers as ("num", source text).
+    """
+
+    parts, literals = [], []
+
+    for match in _SQL_TOKEN.finditer(sql):
+        kind, token = match.lastgroup, match.group()
+
+        if kind in ("comment", "space"):
+            continue
+        if kind == "string":
+            literals.append(token[1:-1].replace("''", "'"))
+            token = "?"
+        elif kind == "number":
+            literals.append(("num", token))
+            token = "?"
+        else:
+            token = token.casefold()
+
+        parts.append(token)
+
+    while parts and parts[-1] == ";":
+        parts.pop()
+
+    return " ".join(parts), tuple(literals)
+
+
+def database_file(engine) -> Optional[str]:
+    """
+    Path of the file behind a SQLAlchemy engine, if it is a SQLite file.
+
+    Args:
+        engine (Engine): The engine.
+
+    Returns:
+        str: The path, or None for other dialects and in-memory databases.
+    """
+
+    database = engine.url.database if engine.dialect.name == "sqlite" else None
+
+    # uri filenames, e.g. the read-only "file:/path/Chinook.db?mode=ro".
+    if database and database.startswith("file:"):
+        database = None if engine.url.query.get("mode") == "memory" else urllib.parse.unquote(database[len("file:"):])
+
+    if not database or database == ":memory:":
+        return None
+
+    return database
+
+
+def file_stamp(path: Optional[str]) -> Optional[tuple]:
+    """
+    Modification time and size of a SQLite file and its WAL; changes on every committed write.
+
+    Args:
+        path (str): The database file, or None.
+
+    Returns:
+        tuple: The stamp, or None when there is no file to watch.
+    """
+
+    if path is None:
+        return None
+
+    stamp = []
+    for name in (path, path + "-wal"):
+        try:
+            stat = os.stat(name)
+            stamp.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            stamp.append(None)
+
+    return tuple(stamp)
+
+
+class QueryResultCache:
+    """
+    Thread-safe LRU cache of query results, bounded by their total size in bytes.
+
+    Results are keyed on the normalized statement, so equivalent SELECTs
+    written with different spacing, case or comments share one entry. The
+    cache is emptied whenever `stamp()` changes, e.g. when the database file
+    is written to. One cache serves every session of the process.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, stamp: Callable[[], Hashable] = lambda: None):
+        """
+        Args:
+            max_bytes (int): Upper bound on the summed size of the cached results.
+            stamp (Callable): Returns a value that changes whenever the data may have changed.
+        """
+
+        self.max_bytes = max_bytes
+        self.stamp = stamp
+
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._stamp = stamp()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+
+    @staticmethod
+    def key(command: str, *options) -> Optional[tuple]:
+        """
+        Cache key of a statement, or None if its result must not be cached.
+
+        Args:
+            command (str): The statement.
+            *options: Anything else the result depends on (fetch mode, column names, ...).
+
+        Returns:
+            tuple: The key, or None for statements that are not read-only queries or whose
+            result changes between runs (e.g. date('now') or random()).
+        """
+
+        template, literals = normalize_sql(command)
+
+        if template.split(" ", 1)[0] not in ("select", "with", "values"):
+            return None
+        if not is_deterministic_read(command):
+            return None
+
+        return (template, literals, *options)
+
+
+    @staticmethod
+    def _size(value) -> int:
+        return len(value.encode("utf-8")) if isinstance(value, str) else len(repr(value))
+
+
+    def _check_stamp(self) -> Hashable:
+        """Empty the cache if the data changed; the caller holds the lock."""
+
+        stamp = self.stamp()
+
+        if stamp != self._stamp:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._stamp = stamp
+
+        return stamp
+
+
+    def get(self, key: tuple) -> tuple:
+        """
+        Look a result up.
+
+        Args:
+            key (tuple): The key from `key()`.
+
+        Returns:
+            tuple: Whether it was found, the result, and the data stamp to pass to `put()`.
+        """
+
+        with self._lock:
+            stamp = self._check_stamp()
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key][0], stamp
+
+            self.misses += 1
+            return False, None, stamp
+
+
+    def put(self, key: tuple, value, stamp: Hashable) -> None:
+        """
+        Store a result, evicting the least recently used ones to stay within `max_bytes`.
+
+        Args:
+            key (tuple): The key from `key()`.
+            value: The result.
+            stamp (Hashable): The stamp `get()` returned before the query ran; if the
+                data changed since, the result may be stale and is not stored.
+        """
+
+        size = self._size(value)
+
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if self._check_stamp() != stamp:
+                return
+
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+import re
+import threading
+from collections import deque
+from typing import Iterable, List, Optional
+from sqlalchemy import inspect, text
+from langchain_community.utilities import SQLDatabase
+from query_cache import database_file, file_stamp
+
+
+# identifier parts: "InvoiceLine" -> "Invoice", "Line"; "MediaTypeId" -> "Media", "Type", "Id".
+_NAME_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+# parts too common in column names to say anything about a table.
+_IGNORED_PARTS = {"id", "key", "the", "of", "and", "in", "on", "by", "for", "with", "to", "is", "are", "what", "which", "how", "many"}
+
+
+def _stem(word: str) -> str:
+    """Reduce a plural to its singular, crudely ("tracks" -> "track", "countries" -> "country")."""
+
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def name_tokens(text_: str) -> set:
+    """
+    Split identifiers or free text into lowercase, singular keywords.
+
+    Args:
+        text_ (str): A table or column name, or a question.
+
+    Returns:
+        set: The keywords, without the ignored filler parts.
+    """
+
+    tokens = {_stem(part.lower()) for part in _NAME_PART.findall(text_)}
+    return tokens - _IGNORED_PARTS
+
+
+def _truncate(value, length: int):
+    if isinstance(value, str) and len(value) > length:
+        return value[:length] + "..."
+    return value
+
+
+class SchemaCatalog:
+    """
+    Schema of a database, read once and kept in memory for the agent.
+
+    For every usable table the catalog holds its columns (type, primary key),
+    foreign keys, indexed columns, row count and a few sample rows, so the agent no longer spends
+    list-tables and schema tool calls on answers that never change. Tables are
+    picked for a question through a keyword index over table and column names.
+
+    For SQLite files the catalog rebuilds itself when the schema changes: the
+    database (and WAL) modification time is checked on every lookup, and only
+    when it moved is `PRAGMA schema_version` read. Data-only writes therefore
+    do not trigger a rebuild; row counts are as of the last build.
+    """
+
+    def __init__(self, db: SQLDatabase, sample_rows: int = 2, max_tables: int = 4, max_value_length: int = 24):
+        """
+        Args:
+            db (SQLDatabase): The database the agent queries.
+            sample_rows (int): Example rows shown per table.
+            max_tables (int): Most tables picked by keyword for one question (joining tables come on top).
+            max_value_length (int): Longest string shown in a sample row.
+        """
+
+        self.db = db
+        self.sample_rows = sample_rows
+        self.max_tables = max_tables
+        self.max_value_length = max_value_length
+
+        self.path = database_file(db._engine)
+
+        self.tables: dict = {}
+        self.builds = 0
+
+        self._descriptions: dict = {}
+        self._file_stamp = None
+        self._schema_version = None
+        self._lock = threading.Lock()
+
+        self.refresh()
+
+
+    def _read_schema_version(self, connection) -> Optional[int]:
+        if self.db.dialect != "sqlite":
+            return None
+        return connection.exec_driver_sql("PRAGMA schema_version").scalar()
+
+
+    def _usable_table_names(self, inspector) -> set:
+        """Current tables (and views) of the database, filtered like SQLDatabase filters them."""
+
+        # SQLDatabase lists the tables once, at construction; ask again so new tables appear.
+        db = self.db
+        names = set(inspector.get_table_names(schema=db._schema))
+
+        if db._view_support:
+            names |= set(inspector.get_view_names(schema=db._schema))
+        if db._include_tables:
+            names &= db._include_tables
+
+        return names - db._ignore_tables
+
+
+    def refresh(self) -> None:
+        """Read the schema, row counts and sample rows of every usable table."""
+
+        engine = self.db._engine
+        quote = engine.dialect.identifier_preparer.quote
+        inspector = inspect(engine)
+        tables = {}
+
+        with engine.connect() as connection:
+            version = self._read_schema_version(connection)
+
+            for name in sorted(self._usable_table_names(inspector)):
+                primary_key = inspector.get_pk_constraint(name, schema=self.db._schema).get("constrained_columns") or []
+                foreign_keys = [
+                    (tuple(key["constrained_columns"]), key["referred_table"], tuple(key["referred_columns"]))
+                    for key in inspector.get_foreign_keys(name, schema=self.db._schema)
+                ]
+                columns = [
+                    (column["name"], str(column["type"]), column["name"] in primary_key)
+                    for column in inspector.get_columns(name, schema=self.db._schema)
+                ]
+
+                # columns a lookup can seek on: the primary key and the leading column of every index.
+                indexed = set(primary_key[:1]) | {
+                    index["column_names"][0] for index in inspector.get_indexes(name, schema=self.db._schema) if index["column_names"]
+                }
+
+                rows = connection.execute(text(f"SELECT count(*) FROM {quote(name)}")).scalar()
+                sample = connection.execute(text(f"SELECT * FROM {quote(name)} LIMIT {int(self.sample_rows)}")).fetchall()
+
+                tables[name] = {
+                    "columns": columns,
+                    "foreign_keys": foreign_keys,
+                    "indexed": indexed,
+                    "rows": rows,
+                    "sample": [tuple(_truncate(value, self.max_value_length) for value in row) for row in sample],
+                    "table_tokens": name_tokens(name),
+                    "column_tokens": set().union(*(name_tokens(column[0]) for column in columns)) if columns else set(),
+                }
+
+        with self._lock:
+            self.tables = tables
+            self._descriptions = {}
+            self._schema_version = version
+            self._file_stamp = file_stamp(self.path)
+            self.builds += 1
+
+
+    def refresh_if_stale(self) -> bool:
+        """
+        Rebuild the catalog if the database schema changed since the last build.
+
+        Returns:
+            bool: Whether the catalog was rebuilt.
+        """
+
+        stamp = file_stamp(self.path)
+
+        if stamp is None or stamp == self._file_stamp:
+            return False
+
+        with self.db._engine.connect() as connection:
+            version = self._read_schema_version(connection)
+
+        if version is not None and version == self._schema_version:
+            # data changed, the schema did not.
+            self._file_stamp = stamp
+            return False
+
+        self.refresh()
+        return True
+
+
+    def _join_path(self, start: str, targets: set) -> List[str]:
+        """Shortest chain of tables linked by foreign keys from `start` to any of `targets`."""
+
+        neighbours = {name: set() for name in self.tables}
+        for name, table in self.tables.items():
+            for _, referred, _ in table["foreign_keys"]:
+                if referred in neighbours:
+                    neighbours[name].add(referred)
+                    neighbours[referred].add(name)
+
+        previous = {start: None}
+        queue = deque([start])
+
+        while queue:
+            name = queue.popleft()
+
+            if name in targets:
+                path = []
+                while name is not None:
+                    path.append(name)
+                    name = previous[name]
+                return path
+
+            for neighbour in sorted(neighbours[name]):
+                if neighbour not in previous:
+                    previous[neighbour] = name
+                    queue.append(neighbour)
+
+        return [start]
+
+
+    def relevant_tables(self, question: str) -> List[str]:
+        """
+        Pick the tables a question is most likely about.
+
+        Tables whose name matches a keyword of the question come first (ranked
+        by how many of their columns match too); when no table name matches,
+        tables are ranked by matching column names alone. The tables needed to
+        join the picked ones are added.
+
+        Args:
+            question (str): The user's question.
+
+        Returns:
+            List[str]: Table names, best match first; empty when nothing matches.
+        """
+
+        self.refresh_if_stale()
+        keywords = name_tokens(question)
+
+        scores = {}
+        for name, table in self.tables.items():
+            table_hits = len(keywords & table["table_tokens"])
+            column_hits = len(keywords & (table["column_tokens"] - table["table_tokens"]))
+            if table_hits or column_hits:
+                scores[name] = (table_hits, column_hits)
+
+        if any(table_hits for table_hits, _ in scores.values()):
+            scores = {name: score for name, score in scores.items() if score[0]}
+
+        picked = sorted(scores, key=lambda name: scores[name], reverse=True)[:self.max_tables]
+
+        # connect the picked tables through the tables that join them.
+        selected = picked[:1]
+        for name in picked[1:]:
+            for table in self._join_path(name, set(selected)):
+                if table not in selected:
+                    selected.append(table)
+
+        return selected
+
+
+    def _describe_table(self, name: str) -> str:
+        table = self.tables[name]
+        references = {column: f"{referred}.{referred_column}"
+                      for columns, referred, referred_columns in table["foreign_keys"]
+                      for column, referred_column in zip(columns, referred_columns)}
+
+        columns = []
+        for column, type_, primary_key in table["columns"]:
+            rendered = f"{column} {type_}"
+            if primary_key:
+                rendered += " PK"
+            if column in references:
+                rendered += f" -> {references[column]}"
+            columns.append(rendered)
+
+        description = f"{name}({', '.join(columns)}) {table['rows']} rows"
+
+        if table["sample"]:
+            description += "\n  e.g. " + ", ".join(repr(row) for row in table["sample"])
+
+        return description
+
+
+    def describe(self, tables: Optional[Iterable[str]] = None) -> str:
+        """
+        Render tables compactly, one line of columns plus a line of sample rows each.
+
+        Args:
+            tables (Iterable[str]): Table names (all tables when omitted). Unknown names are skipped.
+
+        Returns:
+            str: The rendered schema.
+        """
+
+        self.refresh_if_stale()
+        key = tuple(name for name in (self.tables if tables is None else tables) if name in self.tables)
+
+        description = self._descriptions.get(key)
+
+        if description is None:
+            description = "\n".join(self._describe_table(name) for name in key)
+            with self._lock:
+                self._descriptions[key] = description
+
+        return description
+
+
+    def prompt_section(self, question: str) -> str:
+        """
+        Schema text to put in the system prompt for a question.
+
+        Args:
+            question (str): The user's question.
+
+        Returns:
+            str: The relevant tables in full and the names of all other tables.
+        """
+
+        relevant = self.relevant_tables(question)
+
+        # with no keyword match the whole schema is cheaper than a wrong guess, as long as it is small.
+        if not relevant and len(self.tables) <= 2 * self.max_tables:
+            relevant = list(self.tables)
+
+        section = "Relevant tables:\n" + (self.describe(relevant) if relevant else "(no table matched the question)")
+        others = [name for name in self.tables if name not in relevant]
+
+        if others:
+            section += f"\nOther tables: {', '.join(others)}"
+
+        return section
+
+
+    def schema_tool(self):
+        """
+        Build a cached drop-in for the toolkit's "sql_db_schema" tool.
+
+        Returns:
+            BaseTool: A tool taking a comma-separated list of table names.
+        """
+
+        from langchain_core.tools import tool
+
+        catalog = self
+
+        @tool("sql_db_schema")
+        def sql_db_schema(table_names: str) -> str:
+            """Input is a comma-separated list of tables, output is the columns, foreign keys, row count and sample rows of those tables."""
+
+            names = [name.strip().strip("\"'`[]") for name in table_names.split(",") if name.strip()]
+            missing = [name for name in names if name not in catalog.tables]
+
+            if missing:
+                return f"Error: table(s) {', '.join(missing)} not found. Available tables: {', '.join(catalog.tables)}"
+
+            return catalog.describe(names)
+
+        return sql_db_schema
@@ -1,14 +1,7 @@
 import os
 import getpass
-import pathlib
-import requests
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.utilities import SQLDatabase
-from langchain_community.agent_toolkits import SQLDatabaseToolkit
-from langchain.agents import create_agent
-from langchain.agents.middleware import HumanInTheLoopMiddleware
-from langgraph.checkpoint.memory import InMemorySaver
-from langgraph.types import Command
+import argparse
+from sql_service import SqlAgentService
 
 
 
@@ -31,106 +24,63 @@ def _set_env(key: str):
         print(f"{key} is in environment")
 
 
-# calls for google and langsmith api keys.
-_set_env("GOOGLE_API_KEY")
-_set_env("LANGSMITH_API_KEY")
-
-
-# initialize a google gemini chat model to be used as the LLM.
-model = ChatGoogleGenerativeAI(model="gemini-3-flash-preview")
-
-# model = ChatGoogleGenerativeAI(model="gemini-3-pro-preview")
-
-
-# url of the Chinook SQLite database to download.
-url = "https://storage.googleapis.com/benchmarks-artifacts/chinook/Chinook.db"
-
-# local path where the database will be saved.
-local_path = pathlib.Path("Chinook.db")
-
-# check if the file already exists locally.
-if local_path.exists():
-    print("chinook database already exists! skip downloading.")
-
-else:
-    # download the file from the url.
-    response = requests.get(url)
-
-    # if the download is successful, save the binary file locally.
-    if response.status_code == 200:
-        local_path.write_bytes(response.content)
-        print(f"file downloaded and saved as {local_path}")
-
-    else:
-        # print an error message if the download failed.
-        print(f"failed to download the file. Status code: {response.status_code}")
-
-
-# create a connection to the SQLite database using its uri.
-db = SQLDatabase.from_uri("sqlite:///Chinook.db")
-
-# print the SQL dialect used by the connected database.
-print(f"dialect: {db.dialect}")
-
-# retrieve and display the list of usable tables in the chinook database.
-print(f"available tables: {db.get_usable_table_names()}")
-
-# execute a sample SQL query to fetch a few rows from the Artist table, and print the output to verify database access.
-print(f"sample Output: {db.run('SELECT * FROM Artist LIMIT 5;')}")
+def review(approval: dict) -> dict:
+    """
+    ask on the console whether the agent may run its queries.
 
+    Args:
+        approval (dict): A pending approval from the service.
 
-# initialize the SQL database toolkit by combining the connected database with the LLM that will reason about SQL queries.
-toolkit = SQLDatabaseToolkit(db=db, llm=model)
+    Returns:
+        dict: The decision, and the replacement query or the rejection reason.
+    """
+    for action in approval["actions"]:
+        print(f"\nthe agent wants to run:\n  {action['args'].get('query')}")
 
-# Extract the list of SQL-related tools provided by the toolkit. these tools define the actions the agent can perform on the database.
-tools = toolkit.get_tools()
+    answer = input("run it? [y]es / [e]dit / [n]o: ").strip().lower()
 
-# iterate through each tool and display its name and description for inspection and understanding of the agent's available capabilities.
-for tool in tools:
-    print(f"{tool.name}: {tool.description}\n")
+    # an edit gives a replacement for each query, in order.
+    if answer.startswith("e"):
+        return {"decision": "edit", "query": [input("query to run instead: ") for _ in approval["actions"]]}
+    if answer.startswith("n"):
+        return {"decision": "reject", "message": input("reason (optional): ") or None}
 
+    return {"decision": "approve"}
 
-# set the maximum number of results to return unless the user specifies otherwise.
-top_k=5
 
-# define the system prompt to customize the agent's behavior and instructs it on how to interact with the SQL database.
-system_prompt = f"""
-You are an agent designed to interact with a SQL database.
-Given an input question, create a syntactically correct {db.dialect} query to run, then look at the results of the query and return the answer.
-Unless the user specifies a specific number of examples they wish to obtain, always limit your query to at most {top_k} results.
+if __name__ == "__main__":
 
-You can order the results by a relevant column to return the most interesting examples in the database. Never query for all the columns from a specific table,
-only ask for the relevant columns given the question.
+    parser = argparse.ArgumentParser(description="SQL agent demo over the Chinook database.")
+    parser.add_argument("questions", nargs="*", default=["Which genre on average has the longest tracks?"])
+    parser.add_argument("--session", default=None, help="Session to continue (needs --checkpoint).")
+    parser.add_argument("--checkpoint", default=None, help="SQLite file keeping sessions across runs.")
+    parser.add_argument("--no-approval", action="store_true", help="Run queries without asking first.")
+    args = parser.parse_args()
 
-You MUST double check your query before executing it. If you get an error while executing a query, rewrite the query and try again.
+    # calls for google and langsmith api keys.
+    _set_env("GOOGLE_API_KEY")
+    _set_env("LANGSMITH_API_KEY")
 
-DO NOT make any DML statements (INSERT, UPDATE, DELETE, DROP etc.) to the
-database.
+    # the chinook database is downloaded on first use; queries run read-only, checked, limited and cached.
+    service = SqlAgentService(checkpoint_path=args.checkpoint, require_approval=not args.no_approval)
 
-To start you should ALWAYS look at the tables in the database to see what you
-can query. Do NOT skip this step.
+    print(f"warm start: {service.warm_start()}")
+    print(f"available tables: {list(service.catalog.tables)}")
 
-Then you should query the schema of the most relevant tables.
+    session_id = args.session
 
-Once the query executes successfully, **use the results to generate a clear, concise, and conversational response** to the user.
-Make sure your response reflects only the information obtained from the executed query.
-"""
+    for question in args.questions:
+        result = service.ask(question, session_id)
+        session_id = result["session_id"]
 
-# create the ai agent with the specified model, tools, and system prompt.
-agent = create_agent(
-    model,
-    tools,
-    system_prompt=system_prompt
-)
+        # each query the agent wants to run is shown for review before it runs.
+        while result["status"] == "pending_approval":
+            approval = result["approvals"][0]
+            result = service.decide(approval["id"], **review(approval))
 
-# define the user question to ask the agent.
-question = "Which genre on average has the longest tracks?"
+        print(f"\n{question}\n{result['response']}")
 
-# stream the agent's responses step by step.
-for step in agent.stream(
-    {"messages": [{"role": "user", "content": question}]},
-    stream_mode="values",
-):
+    print(f"\nsession: {session_id}")
+    print(f"stats: {service.stats()}")
 
-    # print the latest message from the agent in a readable format.
-    step["messages"][-1].pretty_print()
+    service.close()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+# multi-session http front end for the sql agent, with a review queue for its queries.
+#
+# usage:
+#   export GOOGLE_API_KEY=... SQL_CHECKPOINT_PATH=./sql_sessions.db
+#   uvicorn sql_server:app --port 8002
+#
+# a turn that wants to run a query returns "pending_approval" right away; a reviewer lists
+# GET /approvals and answers POST /approvals/{id}, which resumes the run from its checkpoint.
+
+
+# import all the necessary libraries, modules or packages.
+import os
+import uuid
+import asyncio
+import logging
+from typing import Annotated, Literal, Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+from sql_service import SqlAgentService, SessionBusy, ApprovalNotFound
+from sessions import SessionLocks
+
+
+logger = logging.getLogger(__name__)
+
+# sessions and approvals are only useful if they outlive the process, so a checkpoint file is always used.
+os.environ.setdefault("SQL_CHECKPOINT_PATH", "./sql_sessions.db")
+
+# maximum number of agent turns running at once, across all sessions.
+MAX_CONCURRENT_TURNS = int(os.getenv("SQL_MAX_CONCURRENT_TURNS", "8"))
+
+
+class MessageRequest(BaseModel):
+    message: str = Field(..., min_length=1, max_length=8000)
+
+
+class ApprovalAction(BaseModel):
+    name: str
+    args: dict
+    description: Optional[str] = None
+
+
+class Approval(BaseModel):
+    id: str
+    session_id: str
+    actions: list[ApprovalAction]
+    status: str
+    created_at: float
+    decided_at: Optional[float] = None
+
+
+class TurnResponse(BaseModel):
+    session_id: str
+    status: Literal["done", "pending_approval"]
+    response: Optional[str] = None
+    approvals: list[Approval] = []
+
+
+class DecisionRequest(BaseModel):
+    decision: Literal["approve", "edit", "reject"]
+    # the replacement query, for "edit" of an approval with a single query.
+    query: Optional[str] = Field(None, max_length=8000)
+    # one replacement query per action, in order, for "edit" of an approval with several queries.
+    queries: Optional[list[Annotated[str, Field(min_length=1, max_length=8000)]]] = None
+    # why the query was rejected, passed on to the agent, for "reject".
+    message: Optional[str] = Field(None, max_length=2000)
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+
+
+class HistoryMessage(BaseModel):
+    role: str
+    content: str
+
+
+class HistoryResponse(BaseModel):
+    session_id: str
+    messages: list[HistoryMessage]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+
+    service = SqlAgentService.from_env()
+
+    # open the database, read the schema and build the agent before the first request arrives.
+    warm_start = await run_in_threadpool(service.warm_start)
+    logger.info("sql agent warm start: %s", warm_start)
+
+    app.state.service = service
+    app.state.turns = asyncio.Semaphore(MAX_CONCURRENT_TURNS)
+    app.state.session_locks = SessionLocks()
+
+    yield
+
+    service.close()
+
+
+app = FastAPI(title="SQL Agent", lifespan=lifespan)
+
+
+async def _run_turn(request: Request, session_id: str, function, *args) -> TurnResponse:
+    """Run a service call that advances a session, one turn per session at a time."""
+
+    state = request.app.state
+
+    async with state.session_locks.get(session_id), state.turns:
+        try:
+            result = await run_in_threadpool(function, *args)
+        except SessionBusy as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ApprovalNotFound:
+            raise HTTPException(status_code=409, detail="approval was already decided")
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    return TurnResponse(**result)
+
+
+@app.get("/health")
+async def health(request: Request):
+    return {"status": "ok", **await run_in_threadpool(request.app.state.service.stats)}
+
+
+@app.post("/sessions", response_model=SessionResponse, status_code=201)
+async def create_session():
+    return SessionResponse(session_id=uuid.uuid4().hex)
+
+
+@app.get("/sessions/{session_id}/messages", response_model=HistoryResponse)
+async def get_history(session_id: str, request: Request):
+
+    messages = await run_in_threadpool(request.app.state.service.history, session_id)
+
+    return HistoryResponse(
+        session_id=session_id,
+        messages=[
+            HistoryMessage(role=message.type, content=message.text)
+            for message in messages if message.type in ("human", "ai") and message.text
+        ],
+    )
+
+
+@app.post("/sessions/{session_id}/messages", response_model=TurnResponse)
+async def send_message(session_id: str, body: MessageRequest, request: Request):
+    return await _run_turn(request, session_id, request.app.state.service.ask, body.message, session_id)
+
+
+@app.post("/sessions/{session_id}/resume", response_model=TurnResponse)
+async def resume_session(session_id: str, request: Request):
+    """Finish a run that stopped midway, e.g. when the server was restarted during a turn."""
+    return await _run_turn(request, session_id, request.app.state.service.resume, session_id)
+
+
+@app.get("/approvals", response_model=list[Approval])
+async def list_approvals(request: Request, limit: int = 100):
+    return await run_in_threadpool(request.app.state.service.pending_approvals, limit)
+
+
+@app.get("/approvals/{approval_id}", response_model=Approval)
+async def get_approval(approval_id: str, request: Request):
+
+    approval = await run_in_threadpool(request.app.state.service.approvals.get, approval_id)
+
+    if approval is None:
+        raise HTTPException(status_code=404, detail="approval not found")
+
+    return approval
+
+
+@app.post("/approvals/{approval_id}", response_model=TurnResponse)
+async def decide_approval(approval_id: str, body: DecisionRequest, request: Request):
+
+    service = request.app.state.service
+    approval = await run_in_threadpool(service.approvals.get, approval_id)
+
+    if approval is None:
+        raise HTTPException(status_code=404, detail="approval not found")
+    query = body.queries or body.query
+
+    if body.decision == "edit" and not query:
+        raise HTTPException(status_code=422, detail="an edit needs the replacement query")
+
+    return await _run_turn(
+        request, approval["session_id"], service.decide, approval_id, body.decision, query, body.message,
+    )
@@ -0,0 +1,514 @@
+# -*- coding: utf-8 -*-
+
+
+# import all the necessary libraries, modules or packages.
+# the langchain client libraries are imported inside the builders below, on first use,
+# so that importing this module (e.g. when a web worker boots) has no side effects.
+import os
+import time
+import uuid
+import pathlib
+import logging
+import sqlite3
+import threading
+from typing import List, Optional, Union
+from prompts import SYSTEM_PROMPT
+from approvals import ApprovalQueue
+from database import AgentDatabase
+from schema_catalog import SchemaCatalog
+from sessions import history_window
+
+
+logger = logging.getLogger(__name__)
+
+# url of the Chinook SQLite database to download.
+CHINOOK_URL = "https://storage.googleapis.com/benchmarks-artifacts/chinook/Chinook.db"
+
+
+class SessionBusy(Exception):
+    """Raised when a message is sent to a session that waits for an approval."""
+
+
+class ApprovalNotFound(LookupError):
+    """Raised when an approval does not exist or was decided already."""
+
+
+def download_database(path: str, url: str = CHINOOK_URL) -> None:
+    """
+    Download the database file, unless it already exists.
+
+    Args:
+        path (str): Where the database is saved.
+        url (str): Where it is downloaded from.
+    """
+
+    local_path = pathlib.Path(path)
+
+    # check if the file already exists locally.
+    if local_path.exists():
+        return
+
+    import requests
+
+    # download the file from the url, and save the binary file locally.
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+
+    local_path.write_bytes(response.content)
+    logger.info("database downloaded and saved as %s", local_path)
+
+
+class SqlAgentService:
+    """
+    The SQL agent as a reusable service for many concurrent sessions.
+
+    Nothing is built when the service is created: the database, the schema
+    catalog, the chat model and the agent are each constructed on first use
+    (thread-safely, once) and their construction times are kept in `timings`.
+    The GOOGLE_API_KEY is read from the environment by the client.
+
+    Each session is a LangGraph thread. With `checkpoint_path` set, threads
+    are kept in a SQLite checkpoint file, so conversations and interrupted
+    runs survive a restart; only the last `keep_checkpoints` checkpoints of a
+    thread are kept, and its messages are trimmed to the last
+    `max_history_messages` before every model call, so checkpoint size and
+    per-turn latency stay flat however long a session runs.
+
+    With `require_approval`, every sql_db_query call pauses the run for a
+    human decision. The pause is recorded in an `ApprovalQueue` and the turn
+    returns right away; `decide()` resumes the run from its checkpoint.
+    """
+
+    def __init__(
+        self,
+        database_path: str = "Chinook.db",
+        database_url: Optional[str] = CHINOOK_URL,
+        chat_model: str = "gemini-3-flash-preview",
+        top_k: int = 5,
+        pool_size: int = 8,
+        query_timeout_seconds: float = 10.0,
+        max_rows: int = 500,
+        max_bytes: int = 256 * 1024,
+        result_cache_bytes: int = 32 * 1024 * 1024,
+        large_table_rows: int = 100_000,
+        checkpoint_path: Optional[str] = None,
+        keep_checkpoints: Optional[int] = 10,
+        max_history_messages: Optional[int] = 20,
+        require_approval: bool = True,
+    ):
+        self.database_path = database_path
+        self.database_url = database_url
+        self.chat_model = chat_model
+        self.top_k = top_k
+        self.pool_size = pool_size
+        self.query_timeout_seconds = query_timeout_seconds
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.result_cache_bytes = result_cache_bytes
+        self.large_table_rows = large_table_rows
+        self.checkpoint_path = checkpoint_path
+        self.keep_checkpoints = keep_checkpoints
+        self.max_history_messages = max_history_messages
+        self.require_approval = require_approval
+
+        # seconds spent building each component (including the components it needed).
+        self.timings = {}
+
+        self._components = {}
+        self._lock = threading.RLock()
+
+
+    @classmethod
+    def from_env(cls) -> "SqlAgentService":
+        """
+        Build the service from environment variables.
+
+        SQL_DATABASE_PATH: the SQLite database (default ./Chinook.db, downloaded if missing).
+        SQL_CHAT_MODEL: the gemini model (default gemini-3-flash-preview).
+        SQL_POOL_SIZE: read-only connections, i.e. queries running at once (default 8).
+        SQL_QUERY_TIMEOUT_SECONDS: wall-clock limit of one query (default 10).
+        SQL_CHECKPOINT_PATH: sqlite file for sessions and approvals (default: in memory).
+        SQL_MAX_HISTORY_MESSAGES: messages kept per session (default 20, 0 keeps everything).
+        SQL_REQUIRE_APPROVAL: "0" runs queries without human review (default "1").
+        """
+
+        return cls(
+            database_path=os.getenv("SQL_DATABASE_PATH", "Chinook.db"),
+            chat_model=os.getenv("SQL_CHAT_MODEL", "gemini-3-flash-preview"),
+            pool_size=int(os.getenv("SQL_POOL_SIZE", "8")),
+            query_timeout_seconds=float(os.getenv("SQL_QUERY_TIMEOUT_SECONDS", "10")),
+            checkpoint_path=os.getenv("SQL_CHECKPOINT_PATH") or None,
+            max_history_messages=int(os.getenv("SQL_MAX_HISTORY_MESSAGES", "20")) or None,
+            require_approval=os.getenv("SQL_REQUIRE_APPROVAL", "1") != "0",
+        )
+
+
+    def _get(self, name: str):
+        """Return a component, building it with `_build_<name>` the first time it is needed."""
+
+        if name not in self._components:
+            with self._lock:
+                if name not in self._components:
+                    start = time.perf_counter()
+                    component = getattr(self, f"_build_{name}")()
+                    self.timings[name] = round(time.perf_counter() - start, 3)
+                    self._components[name] = component
+
+        return self._components[name]
+
+
+    @property
+    def db(self) -> AgentDatabase:
+        return self._get("db")
+
+
+    @property
+    def catalog(self) -> SchemaCatalog:
+        return self._get("catalog")
+
+
+    @property
+    def model(self):
+        return self._get("model")
+
+
+    @property
+    def checkpointer(self):
+        return self._get("checkpointer")
+
+
+    @property
+    def approvals(self) -> ApprovalQueue:
+        return self._get("approvals")
+
+
+    @property
+    def agent(self):
+        return self._get("agent")
+
+
+    def _build_db(self) -> AgentDatabase:
+
+        if self.database_url:
+            download_database(self.database_path, self.database_url)
+
+        return AgentDatabase.from_file(
+            self.database_path,
+            pool_size=self.pool_size,
+            timeout_seconds=self.query_timeout_seconds,
+            max_rows=self.max_rows,
+            max_bytes=self.max_bytes,
+            result_cache_bytes=self.result_cache_bytes,
+        )
+
+
+    def _build_catalog(self) -> SchemaCatalog:
+        catalog = SchemaCatalog(self.db)
+        self.db.enable_preflight(catalog, self.large_table_rows)
+        return catalog
+
+
+    def _build_model(self):
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        return ChatGoogleGenerativeAI(model=self.chat_model)
+
+
+    def _build_checkpointer(self):
+
+        if not self.checkpoint_path:
+            from langgraph.checkpoint.memory import InMemorySaver
+
+            return InMemorySaver()
+
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        # the saver serializes access to the connection itself.
+        conn = sqlite3.connect(self.checkpoint_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        return SqliteSaver(conn)
+
+
+    def _build_approvals(self) -> ApprovalQueue:
+        return ApprovalQueue(self.checkpoint_path or ":memory:")
+
+
+    def _tools(self) -> list:
+        from langchain_community.agent_toolkits import SQLDatabaseToolkit
+
+        toolkit = SQLDatabaseToolkit(db=self.db, llm=self.model)
+
+        # the schema comes with the prompt and queries are checked by the pre-flight stage, so listing
+        # tables and the LLM-based query checker are dropped and schema lookups are served from the catalog.
+        tools = [
+            tool for tool in toolkit.get_tools()
+            if tool.name not in ("sql_db_list_tables", "sql_db_schema", "sql_db_query_checker")
+        ]
+
+        return [*tools, self.catalog.schema_tool()]
+
+
+    def _build_agent(self):
+        from langchain.agents import create_agent
+        from langchain.agents.middleware import HumanInTheLoopMiddleware, dynamic_prompt, ModelRequest
+
+        catalog = self.catalog
+        system_prompt = SYSTEM_PROMPT.format(dialect=self.db.dialect, top_k=self.top_k)
+
+        @dynamic_prompt
+        def prompt_with_schema(request: ModelRequest) -> str:
+            """Append the schema of the tables relevant to the latest question to the system prompt."""
+            question = next((message.text for message in reversed(request.state["messages"]) if message.type == "human"), "")
+            return f"{system_prompt}\n{catalog.prompt_section(question)}"
+
+        middleware = [prompt_with_schema]
+
+        if self.max_history_messages:
+            middleware.insert(0, history_window(self.max_history_messages))
+
+        if self.require_approval:
+            middleware.append(HumanInTheLoopMiddleware(
+                interrupt_on={"sql_db_query": {"allowed_decisions": ["approve", "edit", "reject"]}},
+                description_prefix="Query awaiting approval",
+            ))
+
+        return create_agent(
+            self.model,
+            self._tools(),
+            middleware=middleware,
+            checkpointer=self.checkpointer,
+        )
+
+
+    def warm_start(self) -> dict:
+        """
+        Open the database, read the schema and build the agent before the first request.
+
+        Returns:
+            dict: Seconds spent building each component.
+        """
+
+        self.agent
+        self.approvals
+
+        return dict(self.timings)
+
+
+    @staticmethod
+    def _config(session_id: str) -> dict:
+        return {"configurable": {"thread_id": session_id}}
+
+
+    def _prune_checkpoints(self, session_id: str) -> None:
+        """Delete all but the last `keep_checkpoints` checkpoints of a session (and their writes)."""
+
+        if not self.keep_checkpoints or not self.checkpoint_path:
+            return
+
+        # checkpoint ids are time ordered, so the newest sort last.
+        with self.checkpointer.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id NOT IN "
+                "(SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? ORDER BY checkpoint_id DESC LIMIT ?)",
+                (session_id, session_id, self.keep_checkpoints),
+            )
+            cursor.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_id NOT IN "
+                "(SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?)",
+                (session_id, session_id),
+            )
+
+
+    def _queue_interrupts(self, session_id: str, interrupts) -> None:
+        """Queue the interrupts a run is paused on, reopening any claimed by a decision that never resumed it."""
+
+        for interrupt in interrupts:
+            self.approvals.add(interrupt.id, session_id, interrupt.value["action_requests"])
+
+
+    def _finish_turn(self, session_id: str) -> dict:
+        """Record the pause of a run for approval, or return its answer."""
+
+        config = self._config(session_id)
+        state = self.agent.get_state(config)
+        self._prune_checkpoints(session_id)
+
+        if state.interrupts:
+            self._queue_interrupts(session_id, state.interrupts)
+
+            return {
+                "session_id": session_id,
+                "status": "pending_approval",
+                "response": None,
+                "approvals": self.approvals.pending(session_id),
+            }
+
+        messages = state.values.get("messages", [])
+
+        return {
+            "session_id": session_id,
+            "status": "done",
+            "response": messages[-1].text if messages else "",
+            "approvals": [],
+        }
+
+
+    def ask(self, query: str, session_id: Optional[str] = None) -> dict:
+        """
+        Run one turn of a session.
+
+        Args:
+            query (str): The user's message.
+            session_id (str): Conversation to continue (a new one when omitted).
+
+        Returns:
+            dict: session_id, status ("done" or "pending_approval"), the response, and the pending approvals.
+
+        Raises:
+            SessionBusy: If the session waits for an approval.
+        """
+
+        session_id = session_id or uuid.uuid4().hex
+        config = self._config(session_id)
+
+        # the checkpoint, not the queue, tells whether the run is paused: an approval can be
+        # claimed by a decision whose process stopped before resuming the run.
+        interrupts = self.agent.get_state(config).interrupts
+
+        if interrupts:
+            self._queue_interrupts(session_id, interrupts)
+            raise SessionBusy(f"session {session_id} is waiting for an approval")
+
+        self.agent.invoke({"messages": [{"role": "user", "content": query}]}, config)
+
+        return self._finish_turn(session_id)
+
+
+    def decide(
+        self,
+        approval_id: str,
+        decision: str,
+        query: Optional[Union[str, List[str]]] = None,
+        message: Optional[str] = None,
+    ) -> dict:
+        """
+        Answer a pending approval and resume its run.
+
+        Args:
+            approval_id (str): The approval.
+            decision (str): "approve", "edit" (run `query` instead) or "reject" (with an optional `message` for the agent).
+            query (str | List[str]): The replacement query, for "edit"; one per action when the approval has several.
+            message (str): Why the query was rejected, for "reject".
+
+        Returns:
+            dict: The turn result, as for `ask` (the run may pause again on its next query).
+
+        Raises:
+            ApprovalNotFound: If the approval does not exist or was decided already.
+            ValueError: For an unknown decision, or an "edit" without one query per action.
+        """
+
+        if decision not in ("approve", "edit", "reject"):
+            raise ValueError(f"unknown decision {decision!r}")
+
+        from langgraph.types import Command
+
+        approval = self.approvals.get(approval_id)
+
+        if approval is None:
+            raise ApprovalNotFound(approval_id)
+
+        actions = approval["actions"]
+
+        # an edit replaces each reviewed query; a single query is only unambiguous for a single action.
+        if decision == "edit":
+            queries = [query] if isinstance(query, str) else list(query or [])
+
+            if len(queries) != len(actions) or not all(queries):
+                raise ValueError(f"an edit needs one replacement query per action ({len(actions)})")
+
+        if not self.approvals.claim(approval_id, decision):
+            raise ApprovalNotFound(approval_id)
+
+        # one decision per reviewed tool call, in the order of the request.
+        decisions = []
+        for i, action in enumerate(actions):
+            if decision == "edit":
+                decisions.append({"type": "edit", "edited_action": {"name": action["name"], "args": {**action["args"], "query": queries[i]}}})
+            elif decision == "reject":
+                decisions.append({"type": "reject", **({"message": message} if message else {})})
+            else:
+                decisions.append({"type": "approve"})
+
+        try:
+            self.agent.invoke(Command(resume={approval_id: {"decisions": decisions}}), self._config(approval["session_id"]))
+        except Exception:
+            self.approvals.release(approval_id)
+            raise
+
+        return self._finish_turn(approval["session_id"])
+
+
+    def resume(self, session_id: str) -> dict:
+        """
+        Finish a run that stopped midway, e.g. because the process was restarted.
+
+        Args:
+            session_id (str): The conversation.
+
+        Returns:
+            dict: The turn result, as for `ask`.
+        """
+
+        state = self.agent.get_state(self._config(session_id))
+
+        if state.next and not state.interrupts:
+            self.agent.invoke(None, self._config(session_id))
+
+        return self._finish_turn(session_id)
+
+
+    def history(self, session_id: str) -> list:
+        """
+        Return the messages kept for a session (at most `max_history_messages`).
+
+        Args:
+            session_id (str): The conversation.
+
+        Returns:
+            list: LangChain messages, oldest first (empty for unknown sessions).
+        """
+
+        state = self.agent.get_state(self._config(session_id))
+        return list(state.values.get("messages", []))
+
+
+    def pending_approvals(self, limit: int = 100) -> List[dict]:
+        return self.approvals.pending(limit=limit)
+
+
+    def stats(self) -> dict:
+        db = self.db
+        return {
+            "timings": self.timings,
+            "pending_approvals": self.approvals.count(),
+            "result_cache": db.result_cache.stats() if db.result_cache else None,
+            "executor": db.executor.stats(),
+            "preflight": db.preflight.stats() if db.preflight else None,
+            "catalog_builds": self.catalog.builds,
+        }
+
+
+    def close(self) -> None:
+        """Close the checkpoint and approval databases and the query connections, if opened."""
+
+        checkpointer = self._components.get("checkpointer")
+        if checkpointer is not None and hasattr(checkpointer, "conn"):
+            checkpointer.conn.close()
+
+        if "approvals" in self._components:
+            self._components["approvals"].close()
+
+        if "db" in self._components:
+            self._components["db"].executor.close()
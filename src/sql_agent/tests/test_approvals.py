@@ -0,0 +1,81 @@
+import sqlite3
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from approvals import ApprovalQueue
+from sql_service import SqlAgentService, SessionBusy
+
+
+ACTIONS = [{"name": "sql_db_query", "args": {"query": "SELECT 1"}, "description": ""}]
+
+
+def test_an_approval_is_decided_once():
+
+    queue = ApprovalQueue()
+    queue.add("a1", "s1", ACTIONS)
+
+    assert queue.claim("a1", "approve") is True
+    assert queue.claim("a1", "reject") is False
+    assert queue.pending() == []
+
+
+def test_adding_a_claimed_approval_again_reopens_it():
+
+    queue = ApprovalQueue()
+    queue.add("a1", "s1", ACTIONS)
+    queue.claim("a1", "approve")
+
+    queue.add("a1", "s1", ACTIONS)
+
+    assert [approval["id"] for approval in queue.pending("s1")] == ["a1"]
+    assert queue.get("a1")["decided_at"] is None
+
+
+class ScriptedModel(GenericFakeChatModel):
+    """Queries the database once per question, then answers with the tool result."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def script():
+    n = 0
+    while True:
+        n += 1
+        yield AIMessage(content="", tool_calls=[{"name": "sql_db_query", "args": {"query": "SELECT Name FROM Genre"}, "id": f"call{n}"}])
+        yield AIMessage(content=f"answer {n}")
+
+
+@pytest.fixture
+def service(tmp_path):
+
+    path = tmp_path / "music.db"
+
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE Genre (GenreId INTEGER PRIMARY KEY, Name TEXT)")
+        connection.executemany("INSERT INTO Genre (Name) VALUES (?)", [("Rock",), ("Jazz",)])
+    connection.close()
+
+    service = SqlAgentService(database_path=str(path), database_url=None, checkpoint_path=str(tmp_path / "sessions.db"))
+    service._build_model = lambda: ScriptedModel(messages=script())
+    yield service
+    service.close()
+
+
+def test_a_claim_that_never_resumed_the_run_is_reopened(service):
+
+    approval_id = service.ask("Which genres are there?", "s1")["approvals"][0]["id"]
+
+    # the process stops right after claiming the approval, before resuming the run.
+    assert service.approvals.claim(approval_id, "approve")
+    assert service.pending_approvals() == []
+
+    with pytest.raises(SessionBusy):
+        service.ask("Any news?", "s1")
+
+    assert [approval["id"] for approval in service.pending_approvals()] == [approval_id]
+
+    result = service.decide(approval_id, "approve")
+
+    assert result["status"] == "done"
+    assert result["response"] == "answer 1"
@@ -0,0 +1,97 @@
+import sqlite3
+import pytest
+from engine import QueryTimeout, ReadOnlyEngine
+
+
+@pytest.fixture
+def engine(tmp_path):
+
+    path = tmp_path / "music.db"
+
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE Artist (ArtistId INTEGER PRIMARY KEY, Name TEXT)")
+        connection.executemany("INSERT INTO Artist (Name) VALUES (?)", [(f"artist {i}",) for i in range(50)])
+    connection.close()
+
+    # one connection, so every statement below runs on the same one.
+    engine = ReadOnlyEngine(str(path), pool_size=1, max_rows=20, max_bytes=1000, fetch_size=7)
+    yield engine
+    engine.close()
+
+
+def test_reads_run(engine):
+
+    result = engine.execute("SELECT ArtistId, Name FROM Artist WHERE ArtistId = ?", (3,))
+
+    assert result == (["ArtistId", "Name"], [(3, "artist 2")], None)
+
+
+@pytest.mark.parametrize("sql", [
+    "PRAGMA query_only = 0",
+    "PRAGMA table_info(Artist)",
+    "SELECT * FROM pragma_table_info('Artist')",
+    "ATTACH DATABASE '{new}' AS z",
+    "ATTACH DATABASE ':memory:' AS z",
+    "CREATE TEMP TABLE t (x)",
+    "INSERT INTO Artist (Name) VALUES ('x')",
+    "DELETE FROM Artist",
+    "BEGIN",
+])
+def test_statements_beyond_reads_are_denied(engine, tmp_path, sql):
+
+    new = tmp_path / "new.db"
+
+    with pytest.raises(sqlite3.DatabaseError):
+        engine.execute(sql.format(new=new))
+
+    assert not new.exists()
+
+
+def test_switching_query_only_off_does_not_open_a_way_to_write(engine, tmp_path):
+
+    new = tmp_path / "new.db"
+
+    for sql in ("PRAGMA query_only = 0", f"ATTACH '{new}' AS z", "CREATE TABLE z.t (x)", "INSERT INTO z.t VALUES (1)"):
+        with pytest.raises(sqlite3.DatabaseError):
+            engine.execute(sql)
+
+    assert not new.exists()
+    assert engine.execute("SELECT count(*) FROM Artist").rows == [(50,)]
+
+
+def test_a_borrowers_authorizer_is_replaced_on_return(engine):
+
+    with engine.connection() as connection:
+        connection.set_authorizer(None)
+
+    with pytest.raises(sqlite3.DatabaseError):
+        engine.execute("PRAGMA query_only = 0")
+
+
+def test_rows_are_capped(engine):
+
+    result = engine.execute("SELECT * FROM Artist")
+
+    assert len(result.rows) == 20
+    assert result.truncated == "rows"
+
+
+def test_bytes_are_capped(engine):
+
+    result = engine.execute("SELECT printf('%.200c', 'x') FROM Artist")
+
+    # five rows of 200 bytes reach the 1000 byte cap exactly; the sixth would pass it.
+    assert len(result.rows) == 5
+    assert result.truncated == "bytes"
+
+
+def test_long_queries_are_cancelled(engine):
+
+    engine.timeout_seconds = 0.2
+    endless = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n"
+
+    with pytest.raises(QueryTimeout):
+        engine.execute(endless)
+
+    assert engine.stats()["timeouts"] == 1
+    assert engine.execute("SELECT count(*) FROM Artist").rows == [(50,)]
@@ -0,0 +1,105 @@
+import json
+import sqlite3
+import pytest
+from database import AgentDatabase
+from schema_catalog import SchemaCatalog
+from preflight import PreflightError, _SCAN
+
+
+@pytest.fixture(scope="module")
+def preflight(tmp_path_factory):
+
+    path = tmp_path_factory.mktemp("db") / "music.db"
+
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE Genre (GenreId INTEGER PRIMARY KEY, Name TEXT)")
+        connection.execute("CREATE TABLE Track (TrackId INTEGER PRIMARY KEY, Name TEXT, GenreId INTEGER REFERENCES Genre)")
+        connection.execute("CREATE INDEX IFK_TrackGenreId ON Track (GenreId)")
+        connection.executemany("INSERT INTO Genre (Name) VALUES (?)", [("Rock",), ("Jazz",)])
+        connection.executemany("INSERT INTO Track (Name, GenreId) VALUES (?, ?)", [(f"track {i}", i % 2 + 1) for i in range(200)])
+    connection.close()
+
+    db = AgentDatabase.from_file(str(path))
+    yield db.enable_preflight(SchemaCatalog(db), large_table_rows=100)
+    db.executor.close()
+
+
+def rejection(preflight, sql) -> dict:
+
+    with pytest.raises(PreflightError) as info:
+        preflight.check(sql)
+
+    return json.loads(str(info.value))
+
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM Track",
+    "PRAGMA table_info(Track)",
+    "ATTACH DATABASE 'x.db' AS x",
+])
+def test_only_selects_pass(preflight, sql):
+    assert rejection(preflight, sql)["error"] == "not_select"
+
+
+def test_one_statement_at_a_time(preflight):
+    assert rejection(preflight, "SELECT 1; DROP TABLE Track")["error"] == "multiple_statements"
+
+
+def test_writes_behind_a_with_clause_are_denied(preflight):
+
+    error = rejection(preflight, "WITH d AS (SELECT 1) DELETE FROM Track WHERE TrackId IN d")
+
+    assert error["error"] == "not_allowed"
+    assert "delete" in error["message"]
+
+
+def test_table_valued_functions_are_named(preflight):
+
+    error = rejection(preflight, "SELECT * FROM pragma_table_info('Track')")
+
+    assert error["error"] == "table_function"
+    assert "pragma_table_info" in error["message"]
+
+
+def test_unknown_tables_get_close_matches(preflight):
+
+    error = rejection(preflight, "SELECT * FROM Tracks")
+
+    assert error["error"] == "unknown_table"
+    assert error["hint"].startswith("Did you mean Track?")
+
+
+def test_unknown_columns_get_close_matches(preflight):
+
+    error = rejection(preflight, "SELECT t.Nmae FROM Track t")
+
+    assert error["error"] == "unknown_column"
+    assert "Track.Name" in error["hint"]
+
+
+def test_full_scans_of_large_tables_are_flagged(preflight):
+
+    warnings = preflight.check("SELECT t.Name FROM Track AS t WHERE t.Name LIKE '%1%'")
+
+    assert len(warnings) == 1
+    assert warnings[0].startswith("full scan of Track (200 rows)")
+    assert "GenreId" in warnings[0]
+
+
+@pytest.mark.parametrize("detail", ["SCAN Track", "SCAN t", "SCAN TABLE Track", "SCAN TABLE Track AS t"])
+def test_scans_are_read_from_old_and_new_plan_formats(detail):
+    assert _SCAN.match(detail).group(1) in ("Track", "t")
+
+
+def test_indexed_lookups_and_small_tables_are_not_flagged(preflight):
+
+    assert preflight.check("SELECT Name FROM Track WHERE GenreId = 1") == []
+    assert preflight.check("SELECT Name FROM Genre") == []
+
+
+def test_checks_do_not_lift_the_engines_authorizer(preflight):
+
+    preflight.check("SELECT Name FROM Genre")
+
+    with pytest.raises(sqlite3.DatabaseError):
+        preflight.catalog.db.executor.execute("PRAGMA query_only = 0")
@@ -0,0 +1,94 @@
+import pytest
+from query_cache import QueryResultCache, normalize_sql
+
+
+def test_equivalent_statements_share_a_template():
+
+    first = normalize_sql("SELECT  Name FROM Artist -- all of them\n WHERE ArtistId = 1;")
+    second = normalize_sql("select name\nfrom artist /* same */ where artistid=1")
+
+    assert first == second
+    assert first == ("select name from artist where artistid = ?", (("num", "1"),))
+
+
+def test_literals_keep_their_case_and_source_text():
+
+    assert normalize_sql("SELECT 'Rock'")[1] != normalize_sql("SELECT 'rock'")[1]
+    assert normalize_sql("SELECT 10 / 4")[1] != normalize_sql("SELECT 10.0 / 4")[1]
+    assert normalize_sql("SELECT 'it''s'")[1] == ("it's",)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT Name FROM Artist",
+    "WITH t AS (SELECT 1) SELECT * FROM t",
+    "SELECT replace(Name, 'a', 'b') FROM Artist",
+    "SELECT date(InvoiceDate) FROM Invoice",
+    'SELECT random FROM "table"',
+])
+def test_reads_are_cached(sql):
+    assert QueryResultCache.key(sql) is not None
+
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM Artist",
+    "PRAGMA table_info(Artist)",
+    "WITH d AS (SELECT 1) DELETE FROM Artist WHERE ArtistId IN d",
+    "WITH d AS (SELECT 1) REPLACE INTO Artist SELECT * FROM d",
+    "SELECT date('now')",
+    "SELECT * FROM Invoice WHERE InvoiceDate > datetime('NOW', '-1 day')",
+    "SELECT date()",
+    "SELECT current_timestamp",
+    "SELECT * FROM Track ORDER BY random() LIMIT 5",
+    "SELECT last_insert_rowid()",
+])
+def test_writes_and_volatile_queries_are_not_cached(sql):
+    assert QueryResultCache.key(sql) is None
+
+
+def test_least_recently_used_results_are_evicted_by_size():
+
+    cache = QueryResultCache(max_bytes=10)
+    a, b, c = (QueryResultCache.key(f"SELECT {n}") for n in (1, 2, 3))
+
+    _, _, stamp = cache.get(a)
+    cache.put(a, "aaaa", stamp)
+    cache.put(b, "bbbb", stamp)
+    cache.get(a)
+    cache.put(c, "cccc", stamp)
+
+    assert cache.get(a)[:2] == (True, "aaaa")
+    assert cache.get(b)[0] is False
+    assert cache.stats()["evictions"] == 1
+
+    # a result bigger than the whole cache is not stored at all.
+    cache.put(b, "x" * 11, stamp)
+    assert cache.get(b)[0] is False
+
+
+def test_a_new_stamp_empties_the_cache():
+
+    version = [1]
+    cache = QueryResultCache(stamp=lambda: version[0])
+    key = QueryResultCache.key("SELECT 1")
+
+    _, _, stamp = cache.get(key)
+    cache.put(key, "[(1,)]", stamp)
+    assert cache.get(key)[0] is True
+
+    version[0] = 2
+
+    assert cache.get(key)[0] is False
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_results_read_before_a_write_are_not_stored():
+
+    version = [1]
+    cache = QueryResultCache(stamp=lambda: version[0])
+    key = QueryResultCache.key("SELECT 1")
+
+    _, _, stamp = cache.get(key)
+    version[0] = 2
+    cache.put(key, "[(1,)]", stamp)
+
+    assert cache.get(key)[0] is False